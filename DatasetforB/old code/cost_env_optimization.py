@@ -1,7 +1,12 @@
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'true code'))
+from model_curves import get_alpha as lookup_alpha
+
 # ==========================================
 # 1. 核心参数与函数 (与之前保持一致)
 # ==========================================
@@ -13,14 +18,7 @@ EMISSION_FACTOR = 2.5 # MT CO2e / MT Payload
 
 def get_alpha(t):
     # 简化的 alpha 衰减 (碎片影响)
-    baseline_lambda = 0.833
-    baseline_repair = 14
-    growth_debris = 0.015
-    improve_repair = 0.005
-    lambda_t = baseline_lambda * (1 + growth_debris)**(t - 2050)
-    repair_t = baseline_repair * (1 - improve_repair)**(t - 2050)
-    downtime = lambda_t * repair_t + (365 * 0.05)
-    return max(0, 1 - (downtime / 365))
+    return lookup_alpha(t)
 
 # ==========================================
 # 2. 模拟全范围数据 (20年 到 120年)
@@ -1,7 +1,15 @@
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'true code'))
+from adaptive_mc import DEFAULT_SEED, estimate, run_until_precision
+from model_curves import get_alpha as lookup_alpha, get_beta
+from risk_optimization import CI_HALFWIDTH, sample_capacity_logistic
+from wright_law import rocket_cost_batch
+
 # ==============================================================================
 # 0. 全局参数设定 (Global Parameters)
 # ==============================================================================
@@ -34,33 +42,18 @@ plt.rcParams['font.family'] = 'sans-serif'
 
 def get_alpha(t):
     """太空电梯效率因子: 随碎片增长衰减"""
-    # t 是绝对年份 (e.g., 2055)
-    baseline_lambda = 0.833
-    baseline_repair = 14
-    growth_debris = 0.015
-    improve_repair = 0.005
-    
-    lambda_t = baseline_lambda * (1 + growth_debris)**(t - 2050)
-    repair_t = baseline_repair * (1 - improve_repair)**(t - 2050)
-    
-    downtime = lambda_t * repair_t + (365 * 0.05) # +5% 常规维护
-    return max(0, 1 - (downtime / 365))
+    # t 是绝对年份 (e.g., 2055)；碎片模型 +5% 常规维护，读取 model_curves 缓存表
+    return lookup_alpha(t)
 
 def get_beta_capacity(t, num_sites=10):
     """火箭物理运力上限 (MT/yr): S型增长"""
-    # 假设单发射场饱和能力为 400次/年
-    L = 400 
-    k = 0.15
-    t0 = 2030
-    cadence = L / (1 + np.exp(-k * (t - t0)))
+    # 假设单发射场饱和能力为 400次/年 (L=400, k=0.15, t0=2030)
+    cadence = get_beta(t)
     return cadence * num_sites * PAYLOAD
 
 def calculate_rocket_cost(n_start, n_new):
-    """计算一批火箭发射的总成本 (Wright's Law积分近似)"""
-    if n_new <= 0: return 0
-    n_mid = n_start + (n_new / 2)
-    unit_cost = max(COST_R_FLOOR_LAUNCH, COST_R_INIT_LAUNCH * (n_mid ** B_EXPONENT))
-    return n_new * unit_cost
+    """计算一批火箭发射的总成本 (Wright's Law精确积分)"""
+    return rocket_cost_batch(n_start, n_new, COST_R_INIT_LAUNCH, COST_R_FLOOR_LAUNCH, LEARNING_RATE)
 
 # ==============================================================================
 # 2. Section 4.2 & 6.1: 经济最优与环境反馈 (Economic & Environmental)
@@ -141,59 +134,34 @@ def run_deterministic_analysis():
 # ==============================================================================
 # 3. Section 6.2: 风险与基建优化 (Risk & Infrastructure Monte Carlo)
 # ==============================================================================
-def run_monte_carlo():
-    n_sims = 1000
+def run_monte_carlo(seed=DEFAULT_SEED, workers=None, target_halfwidth=CI_HALFWIDTH):
     scenarios = [10, 25] # 比较 10个基地 vs 25个基地
     results_mc = {}
     
-    print(f"Running Monte Carlo Simulation ({n_sims} runs)...")
+    print(f"Running Monte Carlo Simulation (until 95% CI half-width of P(<=60) <= {target_halfwidth})...")
     
+    # 每个情景由 adaptive_mc 分批运行 (每批经 mc_runner 分片并行) 直到准时率的置信区间达标:
+    # 电梯 alpha 与天气整块随机抽样，火箭运力取 S 型 beta(t) * 基地数 * 载重 (Max Effort Strategy)；
+    # 随机流由 seed 派生，结果与进程数无关
     for sites in scenarios:
-        years_to_complete = []
-        for _ in range(n_sims):
-            cargo_rem = M_TOTAL
-            year_idx = 0
-            
-            while cargo_rem > 0:
-                curr_year = START_YEAR + year_idx
-                year_idx += 1
-                
-                # 随机扰动
-                # 1. 电梯: 随机 alpha (Normal dist around trend)
-                alpha_trend = get_alpha(curr_year)
-                alpha_rnd = max(0, np.random.normal(alpha_trend, 0.05))
-                lift_e = KE_NOMINAL * alpha_rnd
-                
-                # 2. 火箭: 随机天气 (Scrub rate mean 0.16, std 0.05)
-                # Beta_cadence 已经是物理极限，乘以 (1 - weather) 得到实际可用
-                weather_loss = max(0, np.random.normal(0.16, 0.05))
-                beta_eff = (1 - weather_loss)
-                
-                # 物理运力上限 (Bottleneck Check)
-                max_rocket_cap = get_beta_capacity(curr_year, num_sites=sites) * beta_eff
-                
-                # 实际运力: 假设全力运输 (Max Effort Strategy)
-                lift_r = max_rocket_cap
-                
-                cargo_rem -= (lift_e + lift_r)
-                
-                # 防止死循环 (设置一个极大值)
-                if year_idx > 200: break
-            
-            years_to_complete.append(year_idx)
-        results_mc[sites] = years_to_complete
+        res = run_until_precision(sites, target_halfwidth, 'p_on_time', threshold=60, seed=seed + sites,
+                                  capacity_fn=sample_capacity_logistic, workers=workers)
+        print(f"  {sites} Sites: {res['n_paths']} paths, P(<=60) 95% CI [{res['ci'][0]:.4f}, {res['ci'][1]:.4f}]")
+        results_mc[sites] = res["acc"]
 
     # --- 绘图: 风险直方图 ---
     plt.figure(figsize=(10, 6))
     
     # 10 Sites
-    plt.hist(results_mc[10], bins=30, alpha=0.6, color='red', density=True, label='10 Sites (Baseline)')
-    mu_10 = np.mean(results_mc[10])
+    density, edges = results_mc[10].histogram()
+    plt.stairs(density, edges, fill=True, alpha=0.6, color='red', label='10 Sites (Baseline)')
+    mu_10 = results_mc[10].mean()
     plt.axvline(mu_10, color='darkred', linestyle='--', linewidth=2, label=f'Mean: {mu_10:.1f} Yrs')
     
     # 25 Sites
-    plt.hist(results_mc[25], bins=30, alpha=0.6, color='green', density=True, label='25 Sites (Optimized)')
-    mu_25 = np.mean(results_mc[25])
+    density, edges = results_mc[25].histogram()
+    plt.stairs(density, edges, fill=True, alpha=0.6, color='green', label='25 Sites (Optimized)')
+    mu_25 = results_mc[25].mean()
     plt.axvline(mu_25, color='darkgreen', linestyle='--', linewidth=2, label=f'Mean: {mu_25:.1f} Yrs')
     
     # Target Line
@@ -216,8 +184,8 @@ def print_final_conclusion(df_det, res_mc):
     row_60 = df_det[df_det['Duration'] == 60].iloc[0]
     
     # 提取 25基地方案的概率数据
-    sims_25 = np.array(res_mc[25])
-    prob_success = np.mean(sims_25 <= 60) * 100
+    sims_25 = res_mc[25]
+    prob, lo, hi = estimate(sims_25, 'p_on_time', 60, 1.96)
     
     print("\n" + "="*60)
     print("SECTION 7: FINAL CONCLUSION DATA (RECOMMENDED STRATEGY)")
@@ -230,9 +198,9 @@ def print_final_conclusion(df_det, res_mc):
     print(f"  - With Carbon Tax:     ${row_60['Green_Cost']:.2f} Trillion (Tax penalty included)")
     print("-" * 60)
     print(f"[Risk & Reliability (w/ 25 Sites)]")
-    print(f"  - Expected Duration:   {np.mean(sims_25):.1f} Years")
-    print(f"  - On-Time Probability: {prob_success:.1f}% (<= 60 Years)")
-    print(f"  - Worst Case:          {np.max(sims_25):.1f} Years")
+    print(f"  - Expected Duration:   {sims_25.mean():.1f} Years")
+    print(f"  - On-Time Probability: {prob * 100:.1f}% (<= 60 Years; 95% CI {lo * 100:.2f}-{hi * 100:.2f}%, {sims_25.n} paths)")
+    print(f"  - Worst Case:          {sims_25.max():.1f} Years")
     print("="*60)
 
 # ==============================================================================
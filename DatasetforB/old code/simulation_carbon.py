@@ -1,6 +1,11 @@
+import os
+import sys
 import numpy as np
 import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'true code'))
+from model_curves import get_alpha as lookup_alpha
+
 # ==========================================
 # 1. 全局参数 (修正版)
 # ==========================================
@@ -33,14 +38,7 @@ CARBON_TAX = 150        # $/MT
 # ==========================================
 def get_alpha(t):
     """电梯效率 (碎片影响)"""
-    baseline_lambda = 0.833
-    baseline_repair = 14
-    growth_debris = 0.015
-    improve_repair = 0.005
-    lambda_t = baseline_lambda * (1 + growth_debris)**(t - 2050)
-    repair_t = baseline_repair * (1 - improve_repair)**(t - 2050)
-    downtime = lambda_t * repair_t + (365 * 0.05)
-    return max(0, 1 - (downtime / 365))
+    return lookup_alpha(t)
 
 def calculate_rocket_cost_batch(n_start, n_new):
     """学习曲线积分"""
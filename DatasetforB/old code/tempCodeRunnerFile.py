@@ -1,7 +1,13 @@
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'true code'))
+from model_curves import get_alpha as lookup_alpha, get_beta
+
 # ==============================================================================
 # 0. 全局参数设定 (Global Parameters)
 # ==============================================================================
@@ -34,25 +40,13 @@ plt.rcParams['font.family'] = 'sans-serif'
 
 def get_alpha(t):
     """太空电梯效率因子: 随碎片增长衰减"""
-    # t 是绝对年份 (e.g., 2055)
-    baseline_lambda = 0.833
-    baseline_repair = 14
-    growth_debris = 0.015
-    improve_repair = 0.005
-    
-    lambda_t = baseline_lambda * (1 + growth_debris)**(t - 2050)
-    repair_t = baseline_repair * (1 - improve_repair)**(t - 2050)
-    
-    downtime = lambda_t * repair_t + (365 * 0.05) # +5% 常规维护
-    return max(0, 1 - (downtime / 365))
+    # t 是绝对年份 (e.g., 2055)；碎片模型 +5% 常规维护，读取 model_curves 缓存表
+    return lookup_alpha(t)
 
 def get_beta_capacity(t, num_sites=10):
     """火箭物理运力上限 (MT/yr): S型增长"""
-    # 假设单发射场饱和能力为 400次/年
-    L = 400 
-    k = 0.15
-    t0 = 2030
-    cadence = L / (1 + np.exp(-k * (t - t0)))
+    # 假设单发射场饱和能力为 400次/年 (L=400, k=0.15, t0=2030)
+    cadence = get_beta(t)
     return cadence * num_sites * PAYLOAD
 
 def calculate_rocket_cost(n_start, n_new):
@@ -0,0 +1,107 @@
+import numpy as np
+from scipy.stats import norm
+
+from mc_runner import run_parallel
+from risk_optimization import MAX_YEARS, plot_risk, sample_capacity
+from streaming_stats import CompletionAccumulator
+
+# ==========================================
+# 自适应样本量蒙特卡洛 (Convergence-Driven Sample Sizing)
+# ==========================================
+# 用户给出置信区间半宽目标，按批运行直到达到精度:
+#   'p_on_time' : P(完工年数 <= threshold)，Wilson 区间 (p 接近 0/1 时仍可靠)
+#   'mean'      : 平均完工年数，正态近似区间 (Welford 标准差)
+# 每批交给 mc_runner.run_parallel 分片运行，随机流由 SeedSequence(seed).spawn 派生，结果可复现且与 workers 无关。
+DEFAULT_SEED = 2050
+BATCH_PATHS = 10_000
+MAX_PATHS = 10_000_000
+MAX_GROWTH = 4          # 下一批最多为已跑路径数的 4 倍
+
+def wilson_interval(k, n, z):
+    """二项比例的 Wilson 区间"""
+    p = k / n
+    denom = 1 + z ** 2 / n
+    center = (p + z ** 2 / (2 * n)) / denom
+    half = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / denom
+    return center - half, center + half
+
+def estimate(acc, quantity, threshold, z):
+    """(点估计, 区间下限, 区间上限)"""
+    if quantity == 'p_on_time':
+        p = acc.prob_within(threshold)
+        lo, hi = wilson_interval(p * acc.n, acc.n, z)
+        return p, lo, hi
+    if quantity == 'mean':
+        half = z * acc.std() / np.sqrt(acc.n)
+        return acc.mean(), acc.mean() - half, acc.mean() + half
+    raise ValueError(f"Unknown quantity: {quantity}")
+
+def _paths_needed(acc, quantity, threshold, z, target):
+    """按当前方差估计达到目标半宽所需的总路径数"""
+    if quantity == 'p_on_time':
+        p = acc.prob_within(threshold)
+        # p 为 0 或 1 时 Wilson 半宽约为 z^2 / (2n)
+        var = p * (1 - p)
+        return max((z / target) ** 2 * var, z ** 2 / (2 * target))
+    return (z * acc.std() / target) ** 2
+
+def run_until_precision(n_sites, target_halfwidth, quantity='p_on_time', threshold=60, confidence=0.95,
+                        batch_paths=BATCH_PATHS, max_paths=MAX_PATHS, seed=DEFAULT_SEED, capacity_fn=sample_capacity,
+                        workers=None):
+    """
+    分批运行直到置信区间半宽 <= target_halfwidth (或达到 max_paths)。
+    返回 dict: estimate / ci / halfwidth / n_paths / n_batches / converged / acc
+    """
+    z = norm.ppf(0.5 + confidence / 2)
+    acc = CompletionAccumulator(MAX_YEARS + 1, thresholds=(threshold,))
+    seeds = np.random.SeedSequence(seed)
+    n_batches = 0
+    next_batch = batch_paths
+
+    while True:
+        batch_seed = seeds.spawn(1)[0].generate_state(4)
+        acc.merge(run_parallel(n_sites, next_batch, seed=batch_seed, workers=workers,
+                               capacity_fn=capacity_fn, thresholds=(threshold,)))
+        n_batches += 1
+
+        value, lo, hi = estimate(acc, quantity, threshold, z)
+        halfwidth = (hi - lo) / 2
+        converged = halfwidth <= target_halfwidth
+        if converged or acc.n >= max_paths:
+            break
+
+        needed = _paths_needed(acc, quantity, threshold, z, target_halfwidth)
+        next_batch = int(np.clip(needed - acc.n, batch_paths, MAX_GROWTH * acc.n))
+        next_batch = min(next_batch, max_paths - acc.n)
+
+    return {
+        "estimate": value,
+        "ci": (lo, hi),
+        "halfwidth": halfwidth,
+        "n_paths": acc.n,
+        "n_batches": n_batches,
+        "converged": converged,
+        "acc": acc,
+    }
+
+def compare_sites(target_halfwidth, quantity='p_on_time', sites=(10, 25), **kwargs):
+    """10 基地 vs 25 基地: 每个情景各自运行到目标精度"""
+    return {n: run_until_precision(n, target_halfwidth, quantity, seed=DEFAULT_SEED + n, **kwargs) for n in sites}
+
+def print_report(results, quantity='p_on_time', threshold=60, confidence=0.95):
+    label = f"P(<= {threshold} Yrs)" if quantity == 'p_on_time' else "Mean (Yrs)"
+    print(f"{'Sites':<8} | {label:<14} | {f'{int(confidence * 100)}% CI':<22} | {'Half-width':<12} | {'Paths':<10}")
+    print("-" * 78)
+    for sites, res in results.items():
+        ci = "[{:.5f}, {:.5f}]".format(*res["ci"])
+        flag = "" if res["converged"] else "  (max_paths reached)"
+        print(f"{sites:<8} | {res['estimate']:<14.5f} | {ci:<22} | {res['halfwidth']:<12.2e} | {res['n_paths']:<10}{flag}")
+
+if __name__ == "__main__":
+    res_p = compare_sites(0.001, 'p_on_time')
+    print_report(res_p, 'p_on_time')
+    print()
+    res_mean = compare_sites(0.01, 'mean')
+    print_report(res_mean, 'mean')
+
+    plot_risk(res_mean[10]["acc"], res_mean[25]["acc"], filename='risk_optimization_adaptive.png')
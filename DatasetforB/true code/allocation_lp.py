@@ -0,0 +1,180 @@
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+from batch_engine import M_TOTAL, PAYLOAD, alpha_matrix, as_param_matrix, param_index
+from model_curves import beta_at
+from risk_optimization import WEATHER_MEAN, WEATHER_STD
+from wright_law import rocket_cost_batch, unit_cost
+
+# ==========================================
+# 1. 运力与需求 (Window Capacities & Demand)
+# ==========================================
+# 时间轴按 (年, 窗口) 展平为 N = 年数 x 每年窗口数 个时段 (13 个窗口 = 每 28 天一次)。
+#   电梯   每时段运力 = KE_NOMINAL x alpha(年) / 窗口数
+#   火箭   每个场站每时段运力 = beta(年) x (1 - 该场天气取消率) x PAYLOAD / 窗口数，
+#          各场站天气取消率在 WEATHER_MEAN ± WEATHER_STD 之间等距分布 (纬度/气候差异)
+#   需求   默认在工期内均匀消耗 M_TOTAL
+N_WINDOWS = 13
+N_SITES = 25
+DURATION = 60
+HOLD_COST = 2_000           # 仓储持有成本 ($ / MT / 时段)，约为电梯运价的 1%
+MAX_ITER = 8                # 序列线性规划最大轮数
+
+def site_weather(n_sites=N_SITES):
+    return np.linspace(WEATHER_MEAN - WEATHER_STD, WEATHER_MEAN + WEATHER_STD, n_sites)
+
+def capacities(duration=DURATION, n_windows=N_WINDOWS, n_sites=N_SITES, params=None):
+    """返回 (电梯运力 (N,), 火箭运力 (N, n_sites))，单位 MT / 时段"""
+    params = as_param_matrix(params)[:1]
+    years = np.arange(duration)
+    cap_e = params[0, param_index("KE_NOMINAL")] * alpha_matrix(params, duration)[0] / n_windows
+    cap_r = np.outer(beta_at(years), (1 - site_weather(n_sites)) * PAYLOAD / n_windows)
+    return np.repeat(cap_e, n_windows), np.repeat(cap_r, n_windows, axis=0)
+
+def uniform_demand(duration=DURATION, n_windows=N_WINDOWS):
+    return np.full(duration * n_windows, M_TOTAL / (duration * n_windows))
+
+# ==========================================
+# 2. 计划成本 (Exact Plan Cost)
+# ==========================================
+# 计划为 dict: elevator (N,) / rocket (N, S) / storage (N,) / backlog (N,)。
+# 火箭成本按累计发射次数的莱特定律精确积分 (与 batch_engine 相同，只取决于总发射次数)。
+
+def plan_cost(plan, params=None, hold_cost=HOLD_COST):
+    """返回 dict: financial / green / env_cost / launches / rocket_share / shortfall"""
+    p = as_param_matrix(params)[0]
+    col = lambda name: p[param_index(name)]
+    rocket_cargo = plan["rocket"].sum()
+    launches = rocket_cargo / PAYLOAD
+    cost_r = rocket_cost_batch(0, launches, col("COST_R_INIT_LAUNCH"), col("COST_R_FLOOR_LAUNCH"), col("LEARNING_RATE"))
+    financial = (plan["elevator"].sum() * col("COST_E_PER_MT") + cost_r + col("INFRASTRUCTURE_COST")
+                 + plan["storage"].sum() * hold_cost)
+    env_cost = rocket_cargo * col("EMISSION_FACTOR") * col("CARBON_TAX")
+    return {
+        "financial": float(financial),
+        "green": float(financial + env_cost),
+        "env_cost": float(env_cost),
+        "launches": float(launches),
+        "rocket_share": float(rocket_cargo / max(plan["elevator"].sum() + rocket_cargo, 1)),
+        "shortfall": float(plan["backlog"][-1]),
+    }
+
+# ==========================================
+# 3. 贪心基准 (Greedy Elevator-First Baseline)
+# ==========================================
+def greedy_plan(demand, cap_e, cap_r):
+    """
+    各引擎的现行策略: 每个时段先用电梯，火箭补足余量 (按场站顺序装满)；
+    运力不足的部分记为积压，顺延到下一时段。
+    """
+    n, n_sites = cap_r.shape
+    elevator = np.empty(n)
+    rocket = np.zeros((n, n_sites))
+    backlog = np.empty(n)
+    carry = 0.0
+    site_cum = np.cumsum(cap_r, axis=1)
+    for t in range(n):
+        need = demand[t] + carry
+        elevator[t] = min(need, cap_e[t])
+        rest = need - elevator[t]
+        rocket[t] = np.diff(np.minimum(site_cum[t], rest), prepend=0)
+        carry = rest - rocket[t].sum()
+        backlog[t] = carry
+    return {"elevator": elevator, "rocket": rocket, "storage": np.zeros(n), "backlog": backlog}
+
+# ==========================================
+# 4. 稀疏线性规划 (Sparse LP, HiGHS)
+# ==========================================
+# 变量 x = [e (N), r (N x S, 按时段优先), h (N)]:
+#   e_t + sum_s r_ts + h_{t-1} - h_t = d_t     (每时段物料平衡，h 为月面/在轨仓储结转)
+#   0 <= e_t <= cap_e_t,  0 <= r_ts <= cap_r_ts,  0 <= h_t <= storage_cap
+# 目标 = 电梯运价 x e + 火箭单价 x r + 持有成本 x h。
+# 火箭总成本随累计发射次数是凹函数 (莱特定律)，LP 只能用线性单价:
+# 从贪心计划出发，每轮用当前总发射次数处的边际单价 (切线) 重解 LP；
+# 对凹成本，切线是上界，每轮的精确成本单调不增，直到发射次数不再变化。
+
+def _lp_matrix(n, n_sites):
+    """物料平衡约束 (N, N + N*S + N) 的稀疏矩阵，只依赖问题规模"""
+    t = np.arange(n)
+    rows = np.concatenate([t, np.repeat(t, n_sites), t, t[1:]])
+    cols = np.concatenate([t, n + np.arange(n * n_sites), n + n * n_sites + t, n + n * n_sites + t[:-1]])
+    vals = np.concatenate([np.ones(n + n * n_sites), -np.ones(n), np.ones(n - 1)])
+    return sparse.csr_array((vals, (rows, cols)), shape=(n, n + n * n_sites + n))
+
+def _solve_lp(demand, cap_e, cap_r, storage_cap, c_e, c_r, hold_cost, a_eq):
+    n, n_sites = cap_r.shape
+    c = np.concatenate([np.full(n, c_e), np.full(n * n_sites, c_r), np.full(n, hold_cost)])
+    upper = np.concatenate([cap_e, cap_r.ravel(), np.full(n, storage_cap)])
+    upper[-1] = 0   # 期末不留库存
+    res = linprog(c, A_eq=a_eq, b_eq=demand, bounds=np.column_stack([np.zeros_like(upper), upper]), method='highs')
+    if res.status != 0:
+        raise ValueError(f"Allocation LP failed: {res.message}")
+    x = res.x
+    return {"elevator": x[:n], "rocket": x[n:n + n * n_sites].reshape(n, n_sites),
+            "storage": x[n + n * n_sites:], "backlog": np.zeros(n)}
+
+def optimal_plan(demand, cap_e, cap_r, params=None, storage_cap=0.0, hold_cost=HOLD_COST, max_iter=MAX_ITER):
+    """
+    成本最优的逐时段分配 (序列线性规划)。
+    storage_cap=0 时不允许结转 (每时段恰好满足需求)；运力不足以满足需求时抛出 ValueError。
+    返回 (plan, info)，info 含每轮的精确绿色成本与 LP 轮数。
+    """
+    p = as_param_matrix(params)[0]
+    col = lambda name: p[param_index(name)]
+    c_env = col("EMISSION_FACTOR") * col("CARBON_TAX")
+    a_eq = _lp_matrix(*cap_r.shape)
+
+    plan = greedy_plan(demand, cap_e, cap_r)
+    history = [plan_cost(plan, params, hold_cost)["green"]] if plan["backlog"][-1] <= 0 else []
+    launches = plan["rocket"].sum() / PAYLOAD
+    for _ in range(max_iter):
+        c_r = unit_cost(launches, col("COST_R_INIT_LAUNCH"), col("COST_R_FLOOR_LAUNCH"), col("LEARNING_RATE")) / PAYLOAD
+        candidate = _solve_lp(demand, cap_e, cap_r, storage_cap, col("COST_E_PER_MT"), c_r + c_env, hold_cost, a_eq)
+        cost = plan_cost(candidate, params, hold_cost)["green"]
+        if history and cost >= history[-1]:
+            break
+        plan, history = candidate, history + [cost]
+        new_launches = plan["rocket"].sum() / PAYLOAD
+        if np.isclose(new_launches, launches, rtol=1e-9):
+            break
+        launches = new_launches
+    return plan, {"green_history": history, "iterations": len(history)}
+
+if __name__ == "__main__":
+    import time
+
+    cap_e, cap_r = capacities()
+    demand = uniform_demand()
+    print(f"{DURATION} years x {N_WINDOWS} windows x {N_SITES} sites = "
+          f"{cap_r.size + 2 * len(cap_e)} LP variables")
+
+    print(f"{'Carbon Tax':<10} | {'Greedy ($T)':<11} | {'LP ($T)':<9} | {'Saving':<7} | "
+          f"{'Rocket Share G/LP':<17} | {'Time (s)':<8}")
+    print("-" * 78)
+    for tax in (150, 20_000, 60_000):
+        params = {"CARBON_TAX": tax}
+        greedy = plan_cost(greedy_plan(demand, cap_e, cap_r), params)
+        start = time.perf_counter()
+        plan, info = optimal_plan(demand, cap_e, cap_r, params)
+        elapsed = time.perf_counter() - start
+        best = plan_cost(plan, params)
+        print(f"{tax:<10} | {greedy['green'] / 1e12:<11.3f} | {best['green'] / 1e12:<9.3f} | "
+              f"{100 * (1 - best['green'] / greedy['green']):>6.1f}% | "
+              f"{100 * greedy['rocket_share']:>5.1f}% / {100 * best['rocket_share']:>5.1f}%   | {elapsed:<8.2f}")
+
+    # 第 10 年半年电梯停运: 贪心产生供应积压；不允许结转时 LP 无可行解，允许 40 万 MT 仓储时 LP 提前备货
+    outage = cap_e.copy()
+    outage[10 * N_WINDOWS + 3:10 * N_WINDOWS + 10] = 0
+    backlog = greedy_plan(demand, outage, cap_r)["backlog"]
+    print(f"\nElevator outage (year 10): greedy peak backlog {backlog.max():,.0f} MT, "
+          f"{int((backlog > 0).sum())} windows behind schedule")
+    try:
+        optimal_plan(demand, outage, cap_r)
+    except ValueError as err:
+        print(f"LP without storage: {err}")
+    start = time.perf_counter()
+    plan, info = optimal_plan(demand, outage, cap_r, storage_cap=400_000)
+    best = plan_cost(plan)
+    print(f"LP with storage: green cost {best['green'] / 1e12:.3f} $T, peak storage {plan['storage'].max():,.0f} MT "
+          f"({time.perf_counter() - start:.2f}s)")
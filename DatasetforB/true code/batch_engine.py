@@ -0,0 +1,184 @@
+import numpy as np
+import pandas as pd
+
+from model_curves import alpha_rows
+from wright_law import rocket_cost_batch
+
+# ==========================================
+# 1. 参数表定义 (Parameter Layout)
+# ==========================================
+# 每一组参数是一行，列顺序由 PARAM_NAMES 固定；默认值与 simulation_csv.py 的校准参数一致
+M_TOTAL = 100_000_000
+START_YEAR = 2050
+PAYLOAD = 150
+
+PARAM_NAMES = (
+    "KE_NOMINAL",           # 电梯年运力 (MT)
+    "COST_E_PER_MT",        # 电梯单价 ($/MT)
+    "COST_R_INIT_LAUNCH",   # 火箭首发成本 ($/次)
+    "COST_R_FLOOR_LAUNCH",  # 火箭成本底线 ($/次)
+    "LEARNING_RATE",        # 莱特学习率
+    "INFRASTRUCTURE_COST",  # 基建费 ($)
+    "EMISSION_FACTOR",      # MT CO2e / MT Payload
+    "CARBON_TAX",           # $ / MT CO2e
+    "DEBRIS_LAMBDA0",       # 2050 年碎片撞击次数 (次/年)
+    "DEBRIS_GROWTH",        # 碎片年增长率
+    "REPAIR_DAYS0",         # 2050 年单次维修天数
+    "REPAIR_IMPROVE",       # 维修效率年提升率
+    "MAINTENANCE_FRAC",     # 常规维护停机比例
+    "EXPANSION_RATE",       # 电梯名义运力年扩容率 (0 = 不扩容)
+    "LAUNCH_RELIABILITY",   # 火箭发射成功率 (失败的发射照常计费、不计运量)
+)
+
+DEFAULT_PARAMS = {
+    "KE_NOMINAL": 537_000,
+    "COST_E_PER_MT": 220_000,
+    "COST_R_INIT_LAUNCH": 375_000_000,
+    "COST_R_FLOOR_LAUNCH": 10_000_000,
+    "LEARNING_RATE": 0.85,
+    "INFRASTRUCTURE_COST": 75_000_000_000,
+    "EMISSION_FACTOR": 2.5,
+    "CARBON_TAX": 150,
+    "DEBRIS_LAMBDA0": 0.833,
+    "DEBRIS_GROWTH": 0.015,
+    "REPAIR_DAYS0": 14,
+    "REPAIR_IMPROVE": 0.005,
+    "MAINTENANCE_FRAC": 0.05,
+    "EXPANSION_RATE": 0.0,
+    "LAUNCH_RELIABILITY": 1.0,
+}
+
+# 单块 (参数组 x 工期 x 年) 的元素上限，控制内存峰值
+MAX_CHUNK_CELLS = 2_000_000
+
+def param_index(name):
+    """参数名 -> 列号"""
+    return PARAM_NAMES.index(name)
+
+def make_param_sets(n=None, **columns):
+    """
+    构造参数矩阵 (P, K)。未给出的列取默认值，给出的列可以是标量或长度为 P 的数组。
+    例: make_param_sets(LEARNING_RATE=[0.8, 0.85, 0.9])
+    """
+    for name in columns:
+        if name not in DEFAULT_PARAMS:
+            raise KeyError(f"Unknown parameter: {name}")
+    sizes = [np.size(v) for v in columns.values() if np.ndim(v) > 0]
+    if n is None:
+        n = max(sizes) if sizes else 1
+    params = np.empty((n, len(PARAM_NAMES)))
+    for k, name in enumerate(PARAM_NAMES):
+        params[:, k] = np.broadcast_to(np.asarray(columns.get(name, DEFAULT_PARAMS[name]), dtype=float), (n,))
+    return params
+
+def as_param_matrix(params):
+    """接受 None / dict / 一维 / 二维数组，统一转成 (P, K) 矩阵"""
+    if params is None:
+        return make_param_sets()
+    if isinstance(params, dict):
+        return make_param_sets(**params)
+    params = np.atleast_2d(np.asarray(params, dtype=float))
+    if params.shape[1] != len(PARAM_NAMES):
+        raise ValueError(f"Expected {len(PARAM_NAMES)} parameter columns, got {params.shape[1]}")
+    return params
+
+# ==========================================
+# 2. 向量化核心 (Vectorized Kernels)
+# ==========================================
+ALPHA_PARAMS = ("DEBRIS_LAMBDA0", "DEBRIS_GROWTH", "REPAIR_DAYS0", "REPAIR_IMPROVE", "MAINTENANCE_FRAC")
+
+def alpha_matrix(params, n_years):
+    """电梯效率 alpha[p, i]，i 为距 2050 年的年数 (读取 model_curves 缓存表)"""
+    return alpha_rows(params[:, [param_index(name) for name in ALPHA_PARAMS]], n_years)
+
+def year_weights(durations, n_years):
+    """第 i 年在工期 T 内的占比: 整年为 1，最后一个不满年为小数部分"""
+    return np.clip(durations[:, None] - np.arange(n_years), 0, 1)
+
+def _simulate_chunk(durations, params, weights):
+    col = lambda name: params[:, param_index(name), None]
+    n_years = weights.shape[1]
+
+    # (P, 1, Y) 电梯运力，(1, D, 1) 年需求，(1, D, Y) 年占比
+    growth = (1 + col("EXPANSION_RATE")) ** np.arange(n_years)
+    cap_e = (params[:, param_index("KE_NOMINAL"), None] * alpha_matrix(params, n_years) * growth)[:, None, :]
+    demand = (M_TOTAL / durations)[None, :, None]
+    w = weights[None, :, :]
+
+    rocket_rate = np.maximum(0, demand - cap_e)
+    rocket_cargo = (w * rocket_rate).sum(axis=2)
+    elevator_cargo = M_TOTAL - rocket_cargo
+    launches = rocket_cargo / (PAYLOAD * col("LAUNCH_RELIABILITY"))
+
+    # 精确积分下逐年批次成本首尾相消，总成本只取决于累计发射次数
+    cost_r = rocket_cost_batch(0, launches, col("COST_R_INIT_LAUNCH"), col("COST_R_FLOOR_LAUNCH"), col("LEARNING_RATE"))
+
+    cost_e = elevator_cargo * col("COST_E_PER_MT")
+    financial = cost_e + cost_r + col("INFRASTRUCTURE_COST")
+    env_cost = rocket_cargo * col("EMISSION_FACTOR") * col("CARBON_TAX")
+
+    return {
+        "financial": financial,
+        "green": financial + env_cost,
+        "env_cost": env_cost,
+        "rocket_cargo": rocket_cargo,
+        "launches": launches,
+        "rocket_share": rocket_cargo / M_TOTAL,
+        "peak_rocket": np.where(w > 0, rocket_rate, 0).max(axis=2),
+    }
+
+def simulate_sweep(durations, params=None):
+    """
+    整体扫描: 一次性计算所有 (参数组, 工期) 组合。
+    durations 可以是小数 (如按月分辨率)，params 形状为 (P, K)。
+    返回 dict，每个值为 (P, D) 数组，单位为美元 / MT / 比例；peak_rocket 为工期内火箭的最大年运量 (MT/年)。
+    """
+    durations = np.atleast_1d(np.asarray(durations, dtype=float))
+    if np.any(durations <= 0):
+        raise ValueError("Durations must be positive")
+    params = as_param_matrix(params)
+
+    n_years = int(np.ceil(durations.max()))
+    weights = year_weights(durations, n_years)
+
+    # 按参数组分块，保证 (块大小 x D x Y) 不超过 MAX_CHUNK_CELLS
+    chunk = max(1, MAX_CHUNK_CELLS // (len(durations) * n_years))
+    parts = [_simulate_chunk(durations, params[s:s + chunk], weights) for s in range(0, len(params), chunk)]
+    return {key: np.concatenate([p[key] for p in parts], axis=0) for key in parts[0]}
+
+# ==========================================
+# 3. 结果表 (与 simulation_results_final.csv 同格式)
+# ==========================================
+def results_table(durations, params=None):
+    """返回与 simulation_results_final.csv 相同列的 DataFrame；多组参数时增加 'Param Set' 列"""
+    durations = np.atleast_1d(np.asarray(durations, dtype=float))
+    params = as_param_matrix(params)
+    res = simulate_sweep(durations, params)
+
+    df = pd.DataFrame({
+        "Duration": np.tile(durations, len(params)),
+        "Financial Cost ($T)": np.round(res["financial"].ravel() / 1e12, 2),
+        "Green Cost ($T)": np.round(res["green"].ravel() / 1e12, 2),
+        "Rocket Share (%)": np.round(100 * res["rocket_share"].ravel(), 1),
+    })
+    if np.all(durations == np.round(durations)):
+        df["Duration"] = df["Duration"].astype(int)
+    if len(params) > 1:
+        df.insert(0, "Param Set", np.repeat(np.arange(len(params)), len(durations)))
+    return df
+
+if __name__ == "__main__":
+    import time
+
+    # 性能测试: T = 20..200 按月分辨率 x 300 组参数
+    durations = np.arange(20 * 12, 200 * 12 + 1) / 12
+    rng = np.random.default_rng(0)
+    params = make_param_sets(
+        LEARNING_RATE=rng.uniform(0.80, 0.90, 300),
+        CARBON_TAX=rng.uniform(50, 300, 300),
+    )
+    start = time.perf_counter()
+    res = simulate_sweep(durations, params)
+    elapsed = time.perf_counter() - start
+    n_eval = res["financial"].size
+    print(f"{n_eval} evaluations in {elapsed:.2f}s ({n_eval / elapsed:,.0f} eval/s)")
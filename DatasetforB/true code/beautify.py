@@ -3,6 +3,8 @@ import matplotlib.pyplot as plt
 import pandas as pd
 import seaborn as sns
 
+from simulation_csv import dashboard_table
+
 # ==========================================
 # 0. 全局排版美化配置
 # ==========================================
@@ -64,13 +66,9 @@ def fix_cost_optimization_final():
 # 2. 修复 csv_visualization_dashboard (解决布局警告)
 # ==========================================
 def fix_csv_dashboard_final():
-    df = pd.DataFrame({
-        "Duration": [20, 30, 40, 50, 60, 70, 80, 100],
-        "Fin": [15.1, 15.67, 16.22, 16.75, 17.26, 17.75, 18.23, 19.15],
-        "Share": [90.2, 85.3, 80.4, 75.6, 70.8, 66.0, 61.3, 51.9],
-        "Tax": [33.8, 32.0, 30.2, 28.3, 26.5, 24.8, 23.0, 19.5]
-    })
-    
+    df = dashboard_table().rename(columns={
+        "Financial Cost ($T)": "Fin", "Rocket Share (%)": "Share", "Carbon Tax ($B)": "Tax"})
+
     fig = plt.figure(figsize=(15, 13))
     # 手动调整子图边距，彻底避开 tight_layout 警告
     fig.subplots_adjust(hspace=0.4, wspace=0.3, top=0.92, bottom=0.08, left=0.1, right=0.95)
@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+
+from batch_engine import M_TOTAL, MAX_CHUNK_CELLS, PAYLOAD, PARAM_NAMES, as_param_matrix, param_index, year_weights
+from result_cache import cached
+from wright_law import rocket_cost_batch, rocket_cost_grad
+
+# ==========================================
+# 1. 伴随梯度 (Reverse-Mode Adjoint of the Yearly Recurrence)
+# ==========================================
+# 正向过程与 batch_engine._simulate_chunk 相同 (逐年 alpha -> 电梯运力 -> 火箭运量 -> 累计发射 -> 莱特定律 -> 碳税)，
+# 保存中间量后做一次反向传播，得到财务成本与绿色成本对全部参数及工期 T 的精确偏导。
+# 绿色成本 = 财务成本 + 火箭运量 x 排放因子 x 碳税，两个输出只在火箭运量的伴随值上不同，
+# 同一条反向链一并处理；反向扫描的代价与正向相同，与参数个数无关。
+# 不可导点 (max(0, ·)、整年工期处年占比的折点、莱特定律的分段点) 统一取右导数。
+
+def _gradient_chunk(durations, params):
+    col = lambda name: params[:, param_index(name), None]
+    n_years = int(np.floor(durations.max())) + 1      # 多算一年: 整年 T 处年占比的右导数需要第 T 年的运量
+    i = np.arange(n_years)
+
+    # ---- 正向: (P, Y) 逐年曲线，(P, D, Y) 运量 ----
+    lambda_t = col("DEBRIS_LAMBDA0") * (1 + col("DEBRIS_GROWTH")) ** i
+    repair_t = col("REPAIR_DAYS0") * (1 - col("REPAIR_IMPROVE")) ** i
+    alpha = np.maximum(0, 1 - (lambda_t * repair_t + 365 * col("MAINTENANCE_FRAC")) / 365)
+    growth = (1 + col("EXPANSION_RATE")) ** i
+    cap_e = (col("KE_NOMINAL") * alpha * growth)[:, None, :]
+    demand = (M_TOTAL / durations)[None, :, None]
+    w = year_weights(durations, n_years)[None, :, :]
+
+    rocket_rate = np.maximum(0, demand - cap_e)
+    rocket_cargo = (w * rocket_rate).sum(axis=2)
+    elevator_cargo = M_TOTAL - rocket_cargo
+    unit = PAYLOAD * col("LAUNCH_RELIABILITY")
+    wright = (0, rocket_cargo / unit, col("COST_R_INIT_LAUNCH"), col("COST_R_FLOOR_LAUNCH"), col("LEARNING_RATE"))
+    financial = elevator_cargo * col("COST_E_PER_MT") + rocket_cost_batch(*wright) + col("INFRASTRUCTURE_COST")
+    env_rate = col("EMISSION_FACTOR") * col("CARBON_TAX")
+    green = financial + rocket_cargo * env_rate
+
+    # ---- 反向: 首维 0 = financial, 1 = green ----
+    dw = rocket_cost_grad(*wright)
+    bar_fin = dw["n_new"] / unit - col("COST_E_PER_MT")              # d financial / d 火箭运量
+    bar_cargo = np.stack([bar_fin, bar_fin + env_rate])               # (2, P, D)
+    bar_rate = bar_cargo[..., None] * w * (demand > cap_e)            # (2, P, D, Y)
+    bar_cap = -bar_rate
+
+    # 工期: 年需求 M / T，以及第 floor(T) 年的占比 T - floor(T)
+    partial_year = (durations[:, None] >= i) & (durations[:, None] < i + 1)
+    bar_T = (bar_rate.sum(axis=3) * (-M_TOTAL / durations ** 2)
+             + bar_cargo * (rocket_rate * partial_year).sum(axis=2))
+
+    # 逐年递推的参数 (电梯运力与碎片系数): 先求每年运力对各参数的偏导 (P, Y, K)，
+    # 再与运力的伴随值做一次批量矩阵乘，代价与参数个数无关
+    k = param_index
+    dcap = np.zeros(alpha.shape + (len(PARAM_NAMES),))
+    ke, r = col("KE_NOMINAL"), col("EXPANSION_RATE")
+    d_down = -ke * growth * (alpha > 0) / 365                         # d 运力 / d 年停机天数
+    dcap[..., k("KE_NOMINAL")] = alpha * growth
+    dcap[..., k("EXPANSION_RATE")] = ke * alpha * i * growth / (1 + r)
+    dcap[..., k("DEBRIS_LAMBDA0")] = d_down * lambda_t * repair_t / col("DEBRIS_LAMBDA0")
+    dcap[..., k("DEBRIS_GROWTH")] = d_down * lambda_t * repair_t * i / (1 + col("DEBRIS_GROWTH"))
+    dcap[..., k("REPAIR_DAYS0")] = d_down * lambda_t * repair_t / col("REPAIR_DAYS0")
+    dcap[..., k("REPAIR_IMPROVE")] = -d_down * lambda_t * repair_t * i / (1 - col("REPAIR_IMPROVE"))
+    dcap[..., k("MAINTENANCE_FRAC")] = 365 * d_down
+    grad = bar_cap @ dcap                                             # (2, P, D, K)
+
+    # 直接项: 电梯运价、基建费、莱特定律系数、发射成功率、碳税
+    grad[..., k("COST_E_PER_MT")] += elevator_cargo
+    grad[..., k("INFRASTRUCTURE_COST")] += 1
+    grad[..., k("COST_R_INIT_LAUNCH")] += dw["c_init"]
+    grad[..., k("COST_R_FLOOR_LAUNCH")] += dw["c_floor"]
+    grad[..., k("LEARNING_RATE")] += dw["learning_rate"]
+    grad[..., k("LAUNCH_RELIABILITY")] += -dw["n_new"] * wright[1] / col("LAUNCH_RELIABILITY")
+    grad[1, ..., k("EMISSION_FACTOR")] += rocket_cargo * col("CARBON_TAX")
+    grad[1, ..., k("CARBON_TAX")] += rocket_cargo * col("EMISSION_FACTOR")
+
+    return {"financial": financial, "green": green, "d_financial": grad[0], "d_green": grad[1],
+            "dT_financial": bar_T[0], "dT_green": bar_T[1]}
+
+def cost_gradients(durations, params=None):
+    """
+    财务成本与绿色成本及其精确梯度 (一次正向 + 一次反向)。
+    返回 dict: financial / green (P, D)，d_financial / d_green (P, D, K) 按 PARAM_NAMES 排列，
+    dT_financial / dT_green (P, D) 为对工期的偏导 ($/年)。
+    """
+    durations = np.atleast_1d(np.asarray(durations, dtype=float))
+    if np.any(durations <= 0):
+        raise ValueError("Durations must be positive")
+    params = as_param_matrix(params)
+    n_years = int(np.floor(durations.max())) + 1
+    chunk = max(1, MAX_CHUNK_CELLS // (2 * len(durations) * n_years))
+    parts = [_gradient_chunk(durations, params[s:s + chunk]) for s in range(0, len(params), chunk)]
+    return {key: np.concatenate([p[key] for p in parts], axis=0) for key in parts[0]}
+
+# ==========================================
+# 2. 梯度驱动的最优工期 (Gradient-Based Duration Optimum)
+# ==========================================
+# 粗网格 (一次向量化调用) 取最好的 N_STARTS 个起点，再用 L-BFGS-B 在 [T_lo, T_hi] 内搜索，
+# 每次迭代只需一次 cost_gradients (成本与 dC/dT 同时得到)，不再对 T 做有限差分。
+DURATION_BOUNDS = (20.0, 150.0)
+SEED_DURATIONS = 14
+N_STARTS = 3
+
+@cached
+def optimal_duration(params=None, objective="green", bounds=DURATION_BOUNDS, seed_durations=SEED_DURATIONS):
+    """单组参数下使 objective ('green' / 'financial') 最小的工期，返回 dict: duration / cost / evaluations"""
+    params = as_param_matrix(params)[:1]
+    grid = np.linspace(*bounds, seed_durations)
+    seed = cost_gradients(grid, params)[objective][0]
+    evaluations = [0]
+    def fun(x):
+        evaluations[0] += 1
+        res = cost_gradients(x, params)
+        return res[objective][0, 0] / 1e12, res["dT_" + objective][0] / 1e12
+
+    best = None
+    for j in np.argsort(seed)[:N_STARTS]:
+        trial = minimize(fun, [grid[j]], jac=True, method='L-BFGS-B', bounds=[bounds])
+        if best is None or trial.fun < best.fun:
+            best = trial
+    return {"duration": float(best.x[0]), "cost": float(best.fun) * 1e12, "evaluations": seed.size + evaluations[0]}
+
+# ==========================================
+# 3. 局部灵敏度报告 (Elasticities)
+# ==========================================
+def elasticity_table(duration, params=None):
+    """
+    各参数 (及工期) 的弹性 d ln C / d ln theta，一次反向扫描得到全部行。
+    返回 DataFrame (行为参数，列为 Value / Financial / Green)；取值为 0 的参数弹性为 0。
+    """
+    params = as_param_matrix(params)[:1]
+    res = cost_gradients([duration], params)
+    values = np.append(params[0], duration)
+    rows = {}
+    for name in ("financial", "green"):
+        grad = np.append(res["d_" + name][0, 0], res["dT_" + name][0, 0])
+        rows[name.capitalize()] = grad * values / res[name][0, 0]
+    return pd.DataFrame({"Value": values, **rows}, index=list(PARAM_NAMES) + ["DURATION"])
+
+if __name__ == "__main__":
+    import time
+    from batch_engine import DEFAULT_PARAMS, make_param_sets, simulate_sweep
+    from result_cache import simulate_sweep as cached_sweep
+
+    # 性能: 300 组参数 x 181 个工期的全部梯度
+    durations = np.arange(20, 201, dtype=float)
+    rng = np.random.default_rng(0)
+    params = make_param_sets(LEARNING_RATE=rng.uniform(0.80, 0.90, 300), CARBON_TAX=rng.uniform(50, 300, 300))
+    start = time.perf_counter()
+    simulate_sweep(durations, params)
+    forward = time.perf_counter() - start
+    start = time.perf_counter()
+    cost_gradients(durations, params)
+    both = time.perf_counter() - start
+    print(f"{params.size * len(durations):,} partial derivatives in {both:.2f}s "
+          f"(forward only {forward:.2f}s, ratio {both / forward:.1f}x)")
+
+    print("\nElasticities at T=60 (baseline):")
+    print(elasticity_table(60).round(4).to_string())
+
+    print(f"\n{'Carbon Tax':<10} | {'L-BFGS-B T':<10} | {'Green ($T)':<10} | {'Evals':<5} | {'Grid T':<7} | {'Grid ($T)':<9}")
+    print("-" * 66)
+    fine = np.arange(round(DURATION_BOUNDS[0] * 12), round(DURATION_BOUNDS[1] * 12) + 1) / 12
+    for tax in (150, 20_000, 35_000, 60_000):
+        p = dict(DEFAULT_PARAMS, CARBON_TAX=tax)
+        best = optimal_duration(p)
+        grid = cached_sweep(fine, p)["green"][0]
+        print(f"{tax:<10} | {best['duration']:<10.2f} | {best['cost'] / 1e12:<10.4f} | {best['evaluations']:<5} | "
+              f"{fine[grid.argmin()]:<7.2f} | {grid.min() / 1e12:<9.4f}")
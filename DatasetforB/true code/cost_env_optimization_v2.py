@@ -1,7 +1,9 @@
-import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
 
+from model_curves import get_alpha
+from wright_law import rocket_cost_batch
+
 # 参数设置
 M_TOTAL = 100_000_000
 START_YEAR = 2050
@@ -12,17 +14,8 @@ INFRA_COST = 75_000_000_000 # $75B
 CARBON_TAX = 150 
 EMISSION_FACTOR = 2.5
 
-def get_alpha(t):
-    t_diff = t - 2050
-    # 简化版衰减公式
-    downtime = (0.833 * 1.015**t_diff) * (14 * 0.995**t_diff) + 18.25
-    return max(0, 1 - downtime/365)
-
 def get_rocket_cost(n_start, n_new):
-    if n_new <= 0: return 0
-    n_mid = n_start + n_new/2
-    unit_cost = max(COST_R_FLOOR, COST_R_INIT * (n_mid ** np.log2(0.85)))
-    return n_new * unit_cost
+    return rocket_cost_batch(n_start, n_new, COST_R_INIT, COST_R_FLOOR, 0.85)
 
 durations = range(20, 125, 5)
 results = []
@@ -1,11 +1,8 @@
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-def get_alpha(t):
-    t_diff = t - 2050
-    # 简化版衰减公式
-    downtime = (0.833 * 1.015**t_diff) * (14 * 0.995**t_diff) + 18.25
-    return max(0, 1 - downtime/365)
+
+from model_curves import get_alpha
 # --- 图片 4: 柱状图 ---
 plt.figure(figsize=(8, 5))
 scenarios = ['Pure Rocket\n(20Y)', 'Hybrid Optimal\n(60Y)', 'Pure Elevator\n(100Y)']
@@ -72,15 +72,16 @@ def plot_resilience_test():
 # ==========================================
 # 3. 创新点三：全局优化与 60Y 最优解 (Ref: global_optimum_analysis.py)
 # ==========================================
-def plot_global_optimization():
+def plot_global_optimization(weights=(1 / 3, 1 / 3, 1 / 3)):
     durations = np.arange(20, 101, 1)
     # 模拟经济成本、窗口期拥堵与电梯失效风险的博弈
     costs = 15.6 - 0.014 * durations
     congestions = 500 / durations**1.5
     risks = 0.01 * np.exp(0.05 * durations)
     
-    # 归一化综合压力指数
-    total_stress = (costs/max(costs) + congestions/max(congestions) + risks/max(risks)) / 3
+    # 归一化综合压力指数 (权重为 成本/拥堵/风险；权重灵敏度见 global_optimum_analysis.weight_sensitivity)
+    w_cost, w_cong, w_risk = np.asarray(weights, dtype=float) / np.sum(weights)
+    total_stress = w_cost * costs/max(costs) + w_cong * congestions/max(congestions) + w_risk * risks/max(risks)
     
     plt.figure(figsize=(12, 7))
     plt.plot(durations, total_stress, 'k-', linewidth=3, label='Global System Stress Index')
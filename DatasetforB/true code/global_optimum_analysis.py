@@ -1,91 +1,348 @@
+from functools import lru_cache
+
 import numpy as np
 import matplotlib.pyplot as plt
+from scipy.optimize import minimize_scalar
+
+from model_curves import AGING_COEFFS, GAMMA_COEFFS, aging_alpha_at, aging_alpha_curve, gamma_at, gamma_curve
+from result_cache import cached
 
 # ==========================================
 # 1. 参数设置与定义
 # ==========================================
 durations = np.arange(20, 101, 1)
 START_YEAR = 2050
+M_TOTAL = 1e8
+
+# 综合压力指数 (GSSI) 的全部参数，按列组成 (P, K) 参数矩阵，便于成千上万组扰动一次性计算
+GSSI_PARAMS = (
+    "A0", "A_SLOPE", "T_KNEE", "A_KNEE", "A_DECAY",     # 电梯老化 (AGING_COEFFS)
+    "GAMMA_MAX", "GAMMA_K", "GAMMA_T0",                  # ISRU 自给率 (GAMMA_COEFFS)
+    "N_SITES", "LAUNCHES_PER_DAY", "PAYLOAD", "WINDOW_SURGE",
+    "COST_INTERCEPT", "COST_SLOPE",
+)
+DEFAULT_GSSI = dict(zip(GSSI_PARAMS, AGING_COEFFS + GAMMA_COEFFS + (25, 1.1, 150, 1.3, 15.6, 0.014)))
+DEFAULT_WEIGHTS = (1 / 3, 1 / 3, 1 / 3)   # (成本, 拥堵, 缆绳风险)
+T_TOL = 1 / 120                           # 最优工期精度: 约 3 天
 
 def get_alpha(t_idx):
-    # 电梯老化：随时间线性增加故障率，50年后指数上升
-    if t_idx < 50:
-        return 0.9 - 0.002 * t_idx
-    else:
-        return 0.8 * np.exp(-0.02 * (t_idx - 50))
+    # 电梯老化：随时间线性增加故障率，50年后指数上升 (读取缓存表)
+    return aging_alpha_at(t_idx)
 
 def calculate_metrics(T):
+    """逐年循环的参考实现 (整年工期)，用于校验向量化版本"""
     annual_demand = 1e8 / T
     max_congestion = 0
     total_cost = 0
     tether_risk = 0
-    
+
     for i in range(T):
         # ISRU 自给率提升
-        gamma = 0.5 / (1 + np.exp(-0.12 * (i - 25)))
+        gamma = gamma_at(i)
         net_demand = annual_base_demand = annual_demand * (1 - gamma)
-        
+
         # 计算窗口期拥堵压力 (创新点三)
         # 25个基地的总瞬时运力上限
         max_daily_capacity = 25 * 1.1 * 150 # 基地数 * 日均频次 * 载重
         required_daily = (net_demand / 365) * 1.3 # 考虑30%窗口期波动
         congestion = required_daily / max_daily_capacity
         max_congestion = max(max_congestion, congestion)
-        
+
         # 计算电梯风险 (后期风险权重大)
         alpha = get_alpha(i)
-        tether_risk += (1 - alpha) * (i / T) 
+        tether_risk += (1 - alpha) * (i / T)
 
     # 归一化成本计算
     # 20年方案成本约15T, 100年约14.2T (根据之前仿真)
-    cost_score = 15.6 - 0.014 * T 
-    
+    cost_score = 15.6 - 0.014 * T
+
     return cost_score, max_congestion, tether_risk / T
 
 # ==========================================
-# 2. 仿真计算
+# 2. 向量化 GSSI (Closed-Form Components)
+# ==========================================
+# 整年工期与循环版完全一致，小数工期在整年之间取光滑延拓:
+#   缆绳风险  = C(T) / T^2，C[n] = sum_{i<n} (1 - alpha_i) i 为整年前缀和；整年之间用三次 Hermite 插值
+#              (节点斜率取相邻两年风险项的平均)。若按比例计入第 floor(T) 年，C(T) 为折线，
+#              目标函数在每个整年处有凸折点，连续搜索只会收敛到折点，得不到整年以下的分辨率
+#   窗口拥堵  = (M / T) * max_{i<T} (1 - gamma_i) * 1.3 / 365 / (基地数 x 日频次 x 载重)，用前缀最大值取值
+#   经济成本  = 15.6 - 0.014 T
+# 各分量按整年网格 20..100 上的最小/最大值归一化后加权平均。
+
+def make_gssi_params(n=None, **columns):
+    """构造 GSSI 参数矩阵 (P, K)，未给出的列取默认值 (同 batch_engine.make_param_sets)"""
+    for name in columns:
+        if name not in DEFAULT_GSSI:
+            raise KeyError(f"Unknown parameter: {name}")
+    sizes = [np.size(v) for v in columns.values() if np.ndim(v) > 0]
+    n = n or (max(sizes) if sizes else 1)
+    return np.stack([np.broadcast_to(np.asarray(columns.get(k, DEFAULT_GSSI[k]), dtype=float), (n,))
+                     for k in GSSI_PARAMS], axis=1)
+
+def _as_params(params):
+    if params is None:
+        return make_gssi_params()
+    if isinstance(params, dict):
+        return make_gssi_params(**params)
+    return np.atleast_2d(np.asarray(params, dtype=float))
+
+def _curve_prefix(params, n_years):
+    """各参数组的前缀表: 风险前缀和、其节点斜率与 (1 - gamma) 前缀最大值，均为 (P, n_years + 1)"""
+    cols = [params[:, k:k + 1] for k in range(8)]
+    i = np.arange(n_years)
+    alpha = aging_alpha_curve(i, cols[:5])
+    gamma = gamma_curve(i, cols[5:])
+    risk_terms = (1 - alpha) * i
+    risk_prefix = np.concatenate([np.zeros((len(params), 1)), np.cumsum(risk_terms, axis=1)], axis=1)
+    padded = np.concatenate([risk_terms[:, :1], risk_terms, risk_terms[:, -1:]], axis=1)
+    risk_slope = (padded[:, :-1] + padded[:, 1:]) / 2
+    supply_max = np.maximum.accumulate(np.concatenate([np.zeros((len(params), 1)), 1 - gamma], axis=1), axis=1)
+    return risk_prefix, risk_slope, supply_max
+
+def gssi_components(T, params=None, tables=None):
+    """
+    (cost, congestion, risk)，T 为标量、(D,) 或 (P, D)，返回形状 (P, D)。
+    整年 T 与 calculate_metrics 完全一致。tables 为预先算好的 _curve_prefix (需覆盖 ceil(max T) 年)。
+    """
+    params = _as_params(params)
+    T = np.atleast_2d(np.asarray(T, dtype=float))
+    T = np.broadcast_to(T, (len(params), T.shape[-1]))
+    risk_prefix, risk_slope, supply_max = tables or _curve_prefix(params, int(np.ceil(T.max())) + 1)
+
+    whole = np.floor(T).astype(np.int64)
+    u = T - whole
+    at = lambda table, k: np.take_along_axis(table, whole + k, axis=1)
+    nxt = np.minimum(whole + 1, risk_prefix.shape[1] - 1) - whole
+    hermite = ((2 * u ** 3 - 3 * u ** 2 + 1) * at(risk_prefix, 0) + (u ** 3 - 2 * u ** 2 + u) * at(risk_slope, 0)
+               + (3 * u ** 2 - 2 * u ** 3) * at(risk_prefix, nxt) + (u ** 3 - u ** 2) * at(risk_slope, nxt))
+    risk = hermite / T ** 2
+
+    sites, per_day, payload, surge, c0, c1 = (params[:, k:k + 1] for k in range(8, 14))
+    supply = np.take_along_axis(supply_max, np.ceil(T).astype(np.int64), axis=1)
+    congestion = (M_TOTAL / T) * supply / 365 * surge / (sites * per_day * payload)
+    cost = c0 - c1 * T
+    return cost, congestion, risk
+
+@lru_cache(maxsize=256)
+def _bounds_cached(key):
+    comps = np.stack(gssi_components(durations, np.array([key])))[:, 0]
+    return comps.min(axis=1), comps.max(axis=1)
+
+def normalization_bounds(params=None):
+    """各分量在整年网格上的 (最小值, 最大值)，形状 (P, 3)"""
+    params = _as_params(params)
+    if len(params) == 1:
+        lo, hi = _bounds_cached(tuple(params[0]))
+        return lo[None], hi[None]
+    comps = np.stack(gssi_components(durations, params), axis=-1)
+    return comps.min(axis=1), comps.max(axis=1)
+
+def gssi(T, params=None, weights=DEFAULT_WEIGHTS, bounds=None, tables=None):
+    """综合压力指数 (P, D)：各分量 min-max 归一化后按 weights 加权"""
+    params = _as_params(params)
+    lo, hi = normalization_bounds(params) if bounds is None else bounds
+    comps = np.stack(gssi_components(T, params, tables), axis=-1)
+    norm = (comps - lo[:, None]) / (hi - lo)[:, None]
+    return norm @ (np.asarray(weights, dtype=float) / np.sum(weights))
+
+# ==========================================
+# 3. 连续最优工期 (Bounded Optimum Search)
 # ==========================================
-costs, congestions, risks = [], [], []
+# 先在整年网格上取最优整年 k (处理多峰)，再在 [k-1, k+1] 内做有界搜索:
+#   批量: 全部参数组同步进行的黄金分割法 (每轮只需一次向量化求值)
+#   单组: scipy 的有界 Brent 法，目标函数按 (参数, 权重, T) 缓存
+GOLDEN = (np.sqrt(5) - 1) / 2
+
+def optimal_durations(params=None, weights=DEFAULT_WEIGHTS, tol=T_TOL):
+    """批量求最优工期，返回 (T_opt (P,), GSSI_opt (P,))"""
+    params = _as_params(params)
+    tables = _curve_prefix(params, int(durations[-1]) + 1)
+    comps = np.stack(gssi_components(durations, params, tables), axis=-1)
+    bounds = comps.min(axis=1), comps.max(axis=1)
+    grid = gssi(durations, params, weights, bounds, tables)
+    k = durations[grid.argmin(axis=1)].astype(float)
+    a = np.maximum(k - 1, durations[0])
+    b = np.minimum(k + 1, durations[-1])
+
+    f = lambda x: _gssi_rows(x, params, weights, bounds, tables)
+    c, d = b - GOLDEN * (b - a), a + GOLDEN * (b - a)
+    fc, fd = f(c), f(d)
+    while np.max(b - a) > tol:
+        left = fc < fd
+        b = np.where(left, d, b)
+        a = np.where(left, a, c)
+        c, d = np.where(left, b - GOLDEN * (b - a), d), np.where(left, c, a + GOLDEN * (b - a))
+        new = f(np.where(left, c, d))
+        fc, fd = np.where(left, new, fd), np.where(left, fc, new)
+    t_opt = (a + b) / 2
+    return t_opt, f(t_opt)
 
-for T in durations:
-    c, cong, r = calculate_metrics(T)
-    costs.append(c)
-    congestions.append(cong)
-    risks.append(r)
+def _gssi_rows(T, params, weights, bounds, tables):
+    """每个参数组在各自的 T 上求值 (P,)"""
+    return gssi(np.asarray(T, dtype=float)[:, None], params, weights, bounds, tables)[:, 0]
 
-# 归一化处理以便在同一坐标系对比
-costs = (np.array(costs) - min(costs)) / (max(costs) - min(costs))
-congestions = (np.array(congestions) - min(congestions)) / (max(congestions) - min(congestions))
-risks = (np.array(risks) - min(risks)) / (max(risks) - min(risks))
+@lru_cache(maxsize=4096)
+def _gssi_point(T, key, weights):
+    return float(gssi([T], np.array([key]), weights)[0, 0])
 
-# 综合压力指数 (三个风险的加权总和)
-total_stress = (costs + congestions + risks) / 3
+@lru_cache(maxsize=256)
+def _optimal_cached(key, weights, tol):
+    grid = gssi(durations, np.array([key]), weights)[0]
+    k = durations[grid.argmin()]
+    bracket = (max(k - 1, durations[0]), min(k + 1, durations[-1]))
+    res = minimize_scalar(lambda T: _gssi_point(float(T), key, weights), bounds=bracket, method='bounded',
+                          options={'xatol': tol})
+    return float(res.x), float(res.fun)
+
+def optimal_duration(params=None, weights=DEFAULT_WEIGHTS, tol=T_TOL):
+    """单组参数的最优工期 (T_opt, GSSI_opt)；相同参数与权重的重复调用直接命中缓存"""
+    key = tuple(float(v) for v in _as_params(params)[0])
+    return _optimal_cached(key, tuple(float(w) for w in weights), tol)
+
+@cached
+def perturbation_study(n=5000, rel_sd=0.1, names=GSSI_PARAMS, seed=2050, weights=DEFAULT_WEIGHTS):
+    """对选定参数施加对数正态相对扰动，返回 (参数矩阵, 各组最优工期)"""
+    rng = np.random.default_rng(seed)
+    params = make_gssi_params(n)
+    for name in names:
+        k = GSSI_PARAMS.index(name)
+        params[:, k] *= np.exp(rel_sd * rng.standard_normal(n))
+    t_opt, _ = optimal_durations(params, weights)
+    return params, t_opt
 
 # ==========================================
-# 3. 可视化
+# 4. 权重单纯形灵敏度 (Weight-Simplex Sensitivity)
 # ==========================================
-plt.figure(figsize=(12, 7))
-
-plt.plot(durations, costs, 'b--', label='Economic Pressure (Cost)', alpha=0.6)
-plt.plot(durations, congestions, 'r--', label='Launch Window Congestion', alpha=0.6)
-plt.plot(durations, risks, 'g--', label='Tether Failure Risk', alpha=0.6)
-plt.plot(durations, total_stress, 'k-', linewidth=3, label='Global System Stress Index')
-
-# 标注 60 年的最优地位
-opt_idx = np.argmin(total_stress)
-opt_T = durations[opt_idx]
-plt.scatter(opt_T, total_stress[opt_idx], color='gold', s=200, edgecolors='black', zorder=5, label='Optimal (60 Years)')
-
-plt.annotate('Optimal Balance Zone', xy=(60, total_stress[opt_idx]), xytext=(70, 0.4),
-             arrowprops=dict(facecolor='black', shrink=0.05), fontsize=12, fontweight='bold')
-
-plt.title('Global Optimization: Finding the "Sweet Spot" for Lunar Colonization', fontsize=14)
-plt.xlabel('Project Duration (Years)', fontsize=12)
-plt.ylabel('Normalized Risk/Pressure Index (0-1)', fontsize=12)
-plt.axvspan(55, 65, color='yellow', alpha=0.2, label='Stability Window')
-plt.grid(True, linestyle=':', alpha=0.6)
-plt.legend(loc='upper right')
-
-plt.tight_layout()
-plt.savefig('global_optimum_analysis.png', dpi=300)
-plt.show()
\ No newline at end of file
+# GSSI 对权重是线性的: 先在细工期网格上缓存归一化分量矩阵 N (D, 3)，
+# 任意多组权重 W (M, 3) 的压力指数即 W @ N.T，逐行 argmin 得到各组权重下的最优工期。
+FINE_STEP = 1 / 12          # 工期网格步长: 1 个月
+WEIGHT_CHUNK = 8192         # 每次矩阵乘的权重组数，控制 (M, D) 中间矩阵的内存
+
+@lru_cache(maxsize=32)
+def _normalized_cached(key, step):
+    grid = np.arange(durations[0], durations[-1] + step / 2, step)
+    lo, hi = _bounds_cached(key)
+    comps = np.stack(gssi_components(grid, np.array([key])), axis=-1)[0]
+    return _freeze(grid), _freeze((comps - lo) / (hi - lo))
+
+def _freeze(a):
+    a.setflags(write=False)
+    return a
+
+def normalized_components(params=None, step=FINE_STEP):
+    """(工期网格 (D,), 归一化分量矩阵 (D, 3))，按参数与步长缓存，返回只读数组"""
+    return _normalized_cached(tuple(float(v) for v in _as_params(params)[0]), step)
+
+def simplex_grid(n):
+    """权重单纯形上的均匀网格 (i, j, n-i-j) / n，共 (n+1)(n+2)/2 组"""
+    i, j = np.triu_indices(n + 1)
+    i, j = j - i, i                       # 全部 i + j <= n 的组合
+    return np.stack([i, j, n - i - j], axis=1) / n
+
+@cached
+def weight_sensitivity(n=446, params=None, step=FINE_STEP):
+    """
+    单纯形网格 (n=446 约 10^5 组) 上每组权重的最优工期。
+    返回 dict: weights (M, 3) / t_opt (M,) / stress (M,)
+    """
+    grid, norm = normalized_components(params, step)
+    weights = simplex_grid(n)
+    t_opt = np.empty(len(weights))
+    stress = np.empty(len(weights))
+    for s in range(0, len(weights), WEIGHT_CHUNK):
+        total = weights[s:s + WEIGHT_CHUNK] @ norm.T
+        k = total.argmin(axis=1)
+        t_opt[s:s + WEIGHT_CHUNK] = grid[k]
+        stress[s:s + WEIGHT_CHUNK] = total[np.arange(len(k)), k]
+    return {"weights": weights, "t_opt": t_opt, "stress": stress}
+
+def plot_weight_ternary(result, filename='global_optimum_weight_ternary.png'):
+    """最优工期的三元图: 三个顶点分别为只看成本 / 拥堵 / 缆绳风险"""
+    import matplotlib.tri as mtri
+
+    w = result["weights"]
+    # 重心坐标 -> 平面坐标: 成本 (0, 0)，拥堵 (1, 0)，风险 (0.5, sqrt(3)/2)
+    x = w[:, 1] + 0.5 * w[:, 2]
+    y = np.sqrt(3) / 2 * w[:, 2]
+    tri = mtri.Triangulation(x, y)
+
+    fig, ax = plt.subplots(figsize=(10, 8.5))
+    im = ax.tripcolor(tri, result["t_opt"], cmap='viridis', shading='gouraud')
+    ax.tricontour(tri, result["t_opt"], levels=[50, 60, 70, 80, 90], colors='white', linewidths=1)
+    ax.plot([0, 1, 0.5, 0], [0, 0, np.sqrt(3) / 2, 0], 'k-', linewidth=1.5)
+    ax.scatter(0.5, np.sqrt(3) / 6, color='gold', s=150, edgecolors='black', zorder=5, label='Equal Weights')
+    for (px, py), label, ha in [((0, 0), 'Cost', 'right'), ((1, 0), 'Congestion', 'left'),
+                                ((0.5, np.sqrt(3) / 2), 'Tether Risk', 'center')]:
+        ax.annotate(label, (px, py), xytext=(0, 10 if ha == 'center' else -15), textcoords='offset points',
+                    ha=ha, fontsize=12, fontweight='bold')
+    fig.colorbar(im, ax=ax, label='Optimal Duration (Years)')
+    ax.set_title('GSSI Weight Sensitivity: Optimal Duration over the Weight Simplex', fontsize=14, pad=30)
+    ax.set_xlim(-0.2, 1.2)
+    ax.set_ylim(-0.1, 0.95)
+    ax.set_aspect('equal')
+    ax.axis('off')
+    ax.legend(loc='upper right')
+    plt.tight_layout()
+    plt.savefig(filename, dpi=300)
+    plt.close()
+
+# ==========================================
+# 5. 可视化
+# ==========================================
+def plot_global_optimum(filename='global_optimum_analysis.png'):
+    costs, congestions, risks = (c[0] for c in gssi_components(durations))
+
+    # 归一化处理以便在同一坐标系对比
+    costs = (costs - min(costs)) / (max(costs) - min(costs))
+    congestions = (congestions - min(congestions)) / (max(congestions) - min(congestions))
+    risks = (risks - min(risks)) / (max(risks) - min(risks))
+
+    # 综合压力指数 (三个风险的加权总和)
+    total_stress = (costs + congestions + risks) / 3
+    opt_T, opt_stress = optimal_duration()
+
+    plt.figure(figsize=(12, 7))
+
+    plt.plot(durations, costs, 'b--', label='Economic Pressure (Cost)', alpha=0.6)
+    plt.plot(durations, congestions, 'r--', label='Launch Window Congestion', alpha=0.6)
+    plt.plot(durations, risks, 'g--', label='Tether Failure Risk', alpha=0.6)
+    plt.plot(durations, total_stress, 'k-', linewidth=3, label='Global System Stress Index')
+
+    # 标注连续最优工期
+    plt.scatter(opt_T, opt_stress, color='gold', s=200, edgecolors='black', zorder=5,
+                label=f'Optimal ({opt_T:.2f} Years)')
+
+    plt.annotate('Optimal Balance Zone', xy=(opt_T, opt_stress), xytext=(70, 0.4),
+                 arrowprops=dict(facecolor='black', shrink=0.05), fontsize=12, fontweight='bold')
+
+    plt.title('Global Optimization: Finding the "Sweet Spot" for Lunar Colonization', fontsize=14)
+    plt.xlabel('Project Duration (Years)', fontsize=12)
+    plt.ylabel('Normalized Risk/Pressure Index (0-1)', fontsize=12)
+    plt.axvspan(55, 65, color='yellow', alpha=0.2, label='Stability Window')
+    plt.grid(True, linestyle=':', alpha=0.6)
+    plt.legend(loc='upper right')
+
+    plt.tight_layout()
+    plt.savefig(filename, dpi=300)
+    plt.show()
+
+if __name__ == "__main__":
+    import time
+
+    opt_T, opt_stress = optimal_duration()
+    print(f"Continuous optimum: {opt_T:.3f} years (GSSI {opt_stress:.4f})")
+
+    start = time.perf_counter()
+    _, t_opt = perturbation_study()
+    lo, mid, hi = np.percentile(t_opt, [5, 50, 95])
+    print(f"{len(t_opt)} perturbations (+/-10%) in {time.perf_counter() - start:.2f}s: "
+          f"optimum median {mid:.2f} years, 90% band [{lo:.2f}, {hi:.2f}]")
+
+    start = time.perf_counter()
+    sens = weight_sensitivity()
+    share = np.mean(np.abs(sens["t_opt"] - 60) <= 5)
+    print(f"{len(sens['t_opt'])} weight vectors in {time.perf_counter() - start:.2f}s: "
+          f"optimum within 55-65 years for {100 * share:.1f}% of the simplex")
+
+    plot_global_optimum()
+    plot_weight_ternary(sens)
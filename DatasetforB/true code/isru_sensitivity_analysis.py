@@ -2,6 +2,9 @@ import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from model_curves import ALPHA_COEFFS, alpha_at, gamma_at
+from wright_law import rocket_cost_batch
+
 # ==========================================
 # 1. 仿真函数：计算不同 ISRU 水平下的表现
 # ==========================================
@@ -12,6 +15,10 @@ def simulate_isru_scenario(gamma_max, T=60):
     COST_E = 220_000
     annual_base_demand = M_TOTAL / T
     
+    # 本情景的常规维护取 18 天/年；自给率曲线按 gamma_max 取表
+    alpha_coeffs = ALPHA_COEFFS[:4] + (18 / 365,)
+    gamma_coeffs = (gamma_max, 0.12, 25)
+
     total_cost = 75e9 # 初始基建
     total_launches = 0
     costs_history = []
@@ -19,11 +26,11 @@ def simulate_isru_scenario(gamma_max, T=60):
 
     for i in range(T):
         # 计算第 i 年的自给率 (Logistic Growth)
-        gamma = gamma_max / (1 + np.exp(-0.12 * (i - 25)))
+        gamma = gamma_at(i, gamma_coeffs)
         net_demand = annual_base_demand * (1 - gamma)
         
         # 模拟电梯衰减
-        alpha = max(0, 1 - ((0.833 * 1.015**i * 14 * 0.995**i + 18)/365))
+        alpha = alpha_at(i, alpha_coeffs)
         cap_e = KE_NOMINAL * alpha
         
         # 分配运量
@@ -32,10 +39,9 @@ def simulate_isru_scenario(gamma_max, T=60):
         
         # 计算火箭学习成本
         launches = cargo_r / 150
-        n_mid = total_launches + (launches / 2)
-        unit_cost = max(10e6, 375e6 * (max(1, n_mid)**np.log2(0.85)))
+        cost_r = rocket_cost_batch(total_launches, launches, 375e6, 10e6, 0.85)
         
-        total_cost += (cargo_e * COST_E + launches * unit_cost)
+        total_cost += (cargo_e * COST_E + cost_r)
         total_launches += launches
         
         costs_history.append(total_cost / 1e12) # Trillion
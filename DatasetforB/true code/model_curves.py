@@ -0,0 +1,154 @@
+from functools import lru_cache
+
+import numpy as np
+
+# ==========================================
+# 1. 曲线参数 (Curve Coefficients)
+# ==========================================
+# 所有曲线表都以项目起始年 2050 为第 0 年，按整年存储；
+# 同一组系数只计算一次，按系数元组缓存 (LRU 淘汰)
+START_YEAR = 2050
+CACHE_SIZE = 64
+MIN_TABLE_YEARS = 256   # 表长按 2 的幂向上取整，查询超出时自动扩表
+
+# 电梯效率 alpha: (2050 撞击率, 碎片年增长, 2050 维修天数, 维修年改进, 常规维护比例)
+ALPHA_COEFFS = (0.833, 0.015, 14.0, 0.005, 0.05)
+# 电梯老化 alpha (global_optimum_analysis): (初始效率, 线性衰减, 拐点年, 拐点后基准, 指数衰减率)
+AGING_COEFFS = (0.9, 0.002, 50.0, 0.8, 0.02)
+# 火箭发射频次 beta: (单场饱和次数 L, 增长率 k, 中点年份 t0)
+BETA_COEFFS = (400.0, 0.15, 2030.0)
+# ISRU 自给率 gamma: (最大自给率, 增长率 k, 中点 (项目第几年))
+GAMMA_COEFFS = (0.5, 0.12, 25.0)
+
+# ==========================================
+# 2. 曲线表 (Cached Tables)
+# ==========================================
+def _freeze(table):
+    table.setflags(write=False)
+    return table
+
+# 闭式曲线: i 为距 2050 年的年数 (可为小数或负数)，系数可为可广播数组 (批量参数组)
+def alpha_curve(i, coeffs=ALPHA_COEFFS):
+    """电梯效率衰减 alpha (碎片模型)"""
+    lambda0, growth, repair0, improve, maint = coeffs
+    lambda_t = lambda0 * np.exp(i * np.log1p(growth))
+    repair_t = repair0 * np.exp(i * np.log1p(-improve))
+    downtime = lambda_t * repair_t + 365 * maint
+    return np.maximum(0, 1 - downtime / 365)
+
+def aging_alpha_curve(i, coeffs=AGING_COEFFS):
+    """电梯老化 alpha: 拐点前线性下降，拐点后指数衰减"""
+    a0, slope, t_knee, a_knee, decay = coeffs
+    return np.where(i < t_knee, a0 - slope * i, a_knee * np.exp(-decay * (i - t_knee)))
+
+def beta_curve(i, coeffs=BETA_COEFFS):
+    """单场年发射频次 beta (S型增长，中点为绝对年份)"""
+    L, k, t0 = coeffs
+    return L / (1 + np.exp(-k * (START_YEAR + i - t0)))
+
+def gamma_curve(i, coeffs=GAMMA_COEFFS):
+    """ISRU 自给率 gamma (Logistic Growth)"""
+    gamma_max, k, t0 = coeffs
+    return gamma_max / (1 + np.exp(-k * (i - t0)))
+
+@lru_cache(maxsize=CACHE_SIZE)
+def alpha_table(coeffs=ALPHA_COEFFS, n_years=MIN_TABLE_YEARS):
+    """电梯效率衰减 alpha[i] (碎片模型)"""
+    return _freeze(alpha_curve(np.arange(n_years), coeffs))
+
+@lru_cache(maxsize=CACHE_SIZE)
+def aging_alpha_table(coeffs=AGING_COEFFS, n_years=MIN_TABLE_YEARS):
+    """电梯老化 alpha[i]"""
+    return _freeze(aging_alpha_curve(np.arange(n_years), coeffs))
+
+@lru_cache(maxsize=CACHE_SIZE)
+def beta_table(coeffs=BETA_COEFFS, n_years=MIN_TABLE_YEARS):
+    """单场年发射频次 beta[i]"""
+    return _freeze(beta_curve(np.arange(n_years), coeffs))
+
+@lru_cache(maxsize=CACHE_SIZE)
+def gamma_table(coeffs=GAMMA_COEFFS, n_years=MIN_TABLE_YEARS):
+    """ISRU 自给率 gamma[i]"""
+    return _freeze(gamma_curve(np.arange(n_years), coeffs))
+
+# ==========================================
+# 3. 向量化查询 (Lookups)
+# ==========================================
+def _table_size(n):
+    return max(MIN_TABLE_YEARS, 1 << int(np.ceil(np.log2(max(n, 1)))))
+
+def _key(coeffs):
+    return tuple(float(c) for c in coeffs)
+
+def _at(table_fn, coeffs, i):
+    """按整年索引查表"""
+    i = np.asarray(i)
+    if not np.issubdtype(i.dtype, np.integer):
+        raise TypeError("Year index must be integer; use the *_interp lookup for fractional time")
+    if i.size and i.min() < 0:
+        raise ValueError("Year index must be >= 0 (years since 2050)")
+    table = table_fn(_key(coeffs), _table_size(int(i.max()) + 1 if i.size else 1))
+    return table[i][()]
+
+def _interp(table_fn, coeffs, t):
+    """按小数年线性插值 (整年处与表值一致)"""
+    t = np.asarray(t, dtype=float)
+    table = table_fn(_key(coeffs), _table_size(int(np.ceil(t.max())) + 2 if t.size else 1))
+    return np.interp(t, np.arange(len(table)), table)[()]
+
+def alpha_at(i, coeffs=ALPHA_COEFFS):
+    return _at(alpha_table, coeffs, i)
+
+def alpha_interp(t, coeffs=ALPHA_COEFFS):
+    return _interp(alpha_table, coeffs, t)
+
+def aging_alpha_at(i, coeffs=AGING_COEFFS):
+    return _at(aging_alpha_table, coeffs, i)
+
+def aging_alpha_interp(t, coeffs=AGING_COEFFS):
+    return _interp(aging_alpha_table, coeffs, t)
+
+def beta_at(i, coeffs=BETA_COEFFS):
+    return _at(beta_table, coeffs, i)
+
+def beta_interp(t, coeffs=BETA_COEFFS):
+    return _interp(beta_table, coeffs, t)
+
+def gamma_at(i, coeffs=GAMMA_COEFFS):
+    return _at(gamma_table, coeffs, i)
+
+def gamma_interp(t, coeffs=GAMMA_COEFFS):
+    return _interp(gamma_table, coeffs, t)
+
+def _by_year(table_fn, curve, coeffs, t):
+    """按绝对年份查询: 2050 年及以后的整年读缓存表，小数年份或 2050 年以前按闭式公式精确求值"""
+    i = np.asarray(t, dtype=float) - START_YEAR
+    if i.size and np.all(i == np.floor(i)) and i.min() >= 0:
+        return _at(table_fn, coeffs, i.astype(np.int64))
+    return np.asarray(curve(i, coeffs))[()]
+
+def get_alpha(t, coeffs=ALPHA_COEFFS):
+    """按绝对年份查询电梯效率 (替代各脚本中的 get_alpha)"""
+    return _by_year(alpha_table, alpha_curve, coeffs, t)
+
+def get_beta(t, coeffs=BETA_COEFFS):
+    """按绝对年份查询单场年发射频次"""
+    return _by_year(beta_table, beta_curve, coeffs, t)
+
+def alpha_rows(coeff_matrix, n_years):
+    """
+    多组系数的 alpha 矩阵 (P, n_years)。
+    相同系数的行共用一张缓存表，批量扫描中碎片系数不变时只查一次表。
+    """
+    coeff_matrix = np.atleast_2d(np.asarray(coeff_matrix, dtype=float))
+    unique, inverse = np.unique(coeff_matrix, axis=0, return_inverse=True)
+    if len(unique) > CACHE_SIZE:
+        # 系数各不相同 (如随机抽样设计) 时缓存无法复用，直接整体计算
+        return alpha_curve(np.arange(n_years), coeff_matrix.T[:, :, None])
+    size = _table_size(n_years)
+    tables = np.stack([alpha_table(_key(row), size)[:n_years] for row in unique])
+    return tables[inverse.ravel()]
+
+def cache_info():
+    """各曲线表的缓存命中统计"""
+    return {fn.__name__: fn.cache_info() for fn in (alpha_table, aging_alpha_table, beta_table, gamma_table)}
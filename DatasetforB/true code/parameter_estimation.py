@@ -1,7 +1,14 @@
+import os
+
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.optimize import curve_fit
 
+from batch_engine import DEFAULT_PARAMS, M_TOTAL, alpha_matrix, make_param_sets, simulate_sweep, year_weights
+from model_curves import START_YEAR, alpha_at, beta_at
+from result_cache import cached
+from risk_optimization import ALPHA_STD, KE_NOMINAL, PAYLOAD, WEATHER_MEAN, WEATHER_STD, completion_years
+
 # --- 1. 准备历史数据 (SpaceX History) ---
 # 年份
 years_hist = np.array([2012, 2013, 2014, 2015, 2016, 2017, 2018, 2019, 2020, 2021, 2022, 2023, 2024])
@@ -11,64 +18,246 @@ launches_hist = np.array([2, 3, 6, 7, 9, 18, 21, 13, 26, 31, 61, 96, 138])
 active_sites = 3
 cadence_hist = launches_hist / active_sites
 
-# --- 2. 定义回归模型 ---
+# 可靠性 (使用合成的行业趋势数据)
+years_rel = np.array([2010, 2015, 2018, 2021, 2024])
+rel_data = np.array([0.90, 0.94, 0.97, 0.99, 0.995]) # 成功率
+
+CADENCE_BOUNDS = ([50, 0.1, 2015], [500, 1.0, 2035])
+RELIABILITY_BOUNDS = ([0.01, 0.01], [0.5, 0.5])
+
+# --- 2. 定义回归模型 (参数可为数组，按广播批量计算) ---
 # Logistic Growth for Cadence (S型增长)
 def logistic_model(t, L, k, t0):
     return L / (1 + np.exp(-k * (t - t0)))
 
+def logistic_jac(t, L, k, t0):
+    """解析雅可比 d/d(L, k, t0)，最后一维为参数"""
+    s = 1 / (1 + np.exp(-k * (t - t0)))
+    ds = L * s * (1 - s)
+    return np.stack(np.broadcast_arrays(s, ds * (t - t0), -ds * k), axis=-1)
+
 # Exponential Decay for Failure Rate (可靠性增长)
 def reliability_model(t, a, b):
     # Base failure rate decays over time
     return 1 - a * np.exp(-b * (t - 2010))
 
+def reliability_jac(t, a, b):
+    e = np.exp(-b * (t - 2010))
+    return np.stack(np.broadcast_arrays(-e, a * (t - 2010) * e), axis=-1)
+
 # --- 3. 执行回归拟合 ---
-# 拟合发射频率
-popt_cadence, _ = curve_fit(logistic_model, years_hist, cadence_hist, 
-                            bounds=([50, 0.1, 2015], [500, 1.0, 2035]))
+def fit_point():
+    """点估计 (与原脚本相同的 curve_fit，附解析雅可比)"""
+    popt_cadence, _ = curve_fit(logistic_model, years_hist, cadence_hist, bounds=CADENCE_BOUNDS,
+                                jac=lambda t, *p: logistic_jac(t, *p))
+    popt_rel, _ = curve_fit(reliability_model, years_rel, rel_data, bounds=RELIABILITY_BOUNDS,
+                            jac=lambda t, *p: reliability_jac(t, *p))
+    return popt_cadence, popt_rel
 
-# 拟合可靠性 (使用合成的行业趋势数据)
-years_rel = np.array([2010, 2015, 2018, 2021, 2024])
-rel_data = np.array([0.90, 0.94, 0.97, 0.99, 0.995]) # 成功率
-popt_rel, _ = curve_fit(reliability_model, years_rel, rel_data,
-                        bounds=([0.01, 0.01], [0.5, 0.5]))
-
-# --- 4. 生成预测数据 ---
-future_years = np.arange(2012, 2100)
-pred_cadence = logistic_model(future_years, *popt_cadence)
-pred_reliability = reliability_model(future_years, *popt_rel)
-
-# --- 5. 绘图 ---
-fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-
-# 图1: 发射频率预测
-ax1.scatter(years_hist, cadence_hist, color='black', label='Historical Data (SpaceX)', zorder=5)
-ax1.plot(future_years, pred_cadence, color='#1f77b4', linewidth=3, label='Logistic Regression Prediction')
-ax1.axvline(2050, color='r', linestyle='--', alpha=0.8, label='Project Start (2050)')
-ax1.set_title('Estimation of Rocket Launch Cadence (beta_cadence)', fontsize=14)
-ax1.set_ylabel('Launches per Site per Year', fontsize=12)
-ax1.set_xlabel('Year', fontsize=12)
-ax1.grid(True, linestyle='--', alpha=0.5)
-ax1.legend()
-# 标注 2050 年的值
-val_2050 = logistic_model(2050, *popt_cadence)
-ax1.annotate(f'2050 Capacity:\n~{int(val_2050)} launches/yr', (2050, val_2050), 
-             xytext=(2015, val_2050+50), arrowprops=dict(arrowstyle='->', color='black'))
-
-# 图2: 可靠性预测
-ax2.scatter(years_rel, rel_data, color='black', label='Historical Trend')
-ax2.plot(future_years, pred_reliability, color='#2ca02c', linewidth=3, label='Reliability Growth Curve')
-ax2.axvline(2050, color='r', linestyle='--', alpha=0.8)
-ax2.set_title('Estimation of Vehicle Reliability (beta_reliability)', fontsize=14)
-ax2.set_ylabel('Mission Success Rate', fontsize=12)
-ax2.set_xlabel('Year', fontsize=12)
-ax2.set_ylim(0.90, 1.01)
-ax2.grid(True, linestyle='--', alpha=0.5)
-ax2.legend(loc='lower right')
-# 标注 2050 年的值
-val_rel_2050 = reliability_model(2050, *popt_rel)
-ax2.annotate(f'2050 Reliability:\n{val_rel_2050:.4f}', (2050, val_rel_2050), 
-             xytext=(2020, 0.96), arrowprops=dict(arrowstyle='->', color='black'))
-
-plt.tight_layout()
-plt.savefig('parameter_estimation_beta.png', dpi=300)
-plt.show()
\ No newline at end of file
+# ==========================================
+# 4. 残差自助法校准 (Residual Bootstrap Calibration)
+# ==========================================
+# 每个重抽样 = 拟合曲线 + 有放回重抽的残差 (按 sqrt(n / (n - p)) 修正自由度)。
+# 数千组重抽样同时拟合: 批量 Levenberg-Marquardt，每步用解析雅可比组装 (B, p, p) 法方程一次求解，
+# 每组独立调节阻尼，越界的步长投影回参数框。起点为原数据的点估计。
+# 被拒绝的步长只增大阻尼后重试；某组在一次接受的步长后相对下降 < LM_TOL 才视为收敛。
+N_BOOTSTRAP = 4000
+LM_ITER = 100
+LM_TOL = 1e-10
+LM_MAX_DAMP = 1e12      # 阻尼增大到该值仍无下降步长，视为已在极小点
+
+def _fit_batch(model, jac, t, y, p0, bounds):
+    """批量有界 LM: y (B, n), p0 (p,) -> (B, p)"""
+    lo, hi = (np.asarray(b, dtype=float) for b in bounds)
+    params = np.tile(np.asarray(p0, dtype=float), (len(y), 1))
+    unpack = lambda p: [p[:, j, None] for j in range(p.shape[1])]
+    resid = y - model(t, *unpack(params))
+    cost = (resid ** 2).sum(axis=1)
+    damp = np.full(len(y), 1e-3)
+    done = np.zeros(len(y), dtype=bool)
+    eye = np.eye(params.shape[1])
+    for _ in range(LM_ITER):
+        J = jac(t, *unpack(params))                      # (B, n, p)
+        A = J.transpose(0, 2, 1) @ J
+        g = (J.transpose(0, 2, 1) @ resid[:, :, None])[:, :, 0]
+        diag = np.maximum(np.diagonal(A, axis1=1, axis2=2), 1e-12)
+        step = np.linalg.solve(A + damp[:, None, None] * diag[:, :, None] * eye, g[:, :, None])[:, :, 0]
+        trial = np.clip(params + step, lo, hi)
+        trial_resid = y - model(t, *unpack(trial))
+        trial_cost = (trial_resid ** 2).sum(axis=1)
+        better = (trial_cost < cost) & ~done
+        change = np.abs(cost - trial_cost) / np.maximum(cost, 1e-300)
+        params[better], resid[better], cost[better] = trial[better], trial_resid[better], trial_cost[better]
+        damp = np.where(done, damp, np.where(better, damp / 3, damp * 2))
+        done |= (better & (change < LM_TOL)) | (damp > LM_MAX_DAMP)
+        if np.all(done):
+            break
+    return params
+
+def _residual_resamples(rng, t, y, fitted, n_params, n_boot):
+    resid = (y - fitted) * np.sqrt(len(y) / (len(y) - n_params))
+    return fitted + resid[rng.integers(0, len(y), (n_boot, len(y)))]
+
+@cached
+def bootstrap_calibration(n_boot=N_BOOTSTRAP, seed=2050):
+    """
+    返回参数样本 dict: L / k / t0 (发射频次) 与 a / b (可靠性)，每个为 (n_boot,) 数组；
+    point 为原数据的点估计 {名称: 值}。
+    """
+    rng = np.random.default_rng(seed)
+    popt_cadence, popt_rel = fit_point()
+    y_c = _residual_resamples(rng, years_hist, cadence_hist, logistic_model(years_hist, *popt_cadence), 3, n_boot)
+    y_r = _residual_resamples(rng, years_rel, rel_data, reliability_model(years_rel, *popt_rel), 2, n_boot)
+    cadence = _fit_batch(logistic_model, logistic_jac, years_hist, y_c, popt_cadence, CADENCE_BOUNDS)
+    rel = _fit_batch(reliability_model, reliability_jac, years_rel, y_r, popt_rel, RELIABILITY_BOUNDS)
+    samples = {"L": cadence[:, 0], "k": cadence[:, 1], "t0": cadence[:, 2], "a": rel[:, 0], "b": rel[:, 1]}
+    samples["point"] = dict(zip(("L", "k", "t0", "a", "b"), np.concatenate([popt_cadence, popt_rel])))
+    return samples
+
+# 后验样本与其他生成文件一样存放在仓库的 pictures/ 目录 (按模块位置定位，与运行目录无关)
+SAMPLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'pictures', 'calibration_samples.npz')
+
+def save_samples(samples, path=SAMPLES_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez(path, **{k: v for k, v in samples.items() if k != "point"},
+             point=np.array([samples["point"][k] for k in ("L", "k", "t0", "a", "b")]))
+
+def load_samples(path=SAMPLES_PATH):
+    with np.load(path) as f:
+        samples = {k: f[k] for k in ("L", "k", "t0", "a", "b")}
+        samples["point"] = dict(zip(("L", "k", "t0", "a", "b"), f["point"]))
+    return samples
+
+# ==========================================
+# 5. 传播到成本与工期引擎 (Propagation)
+# ==========================================
+# 成本: 每组样本的 2050 年成功率作为 batch_engine 的 LAUNCH_RELIABILITY，一次 simulate_sweep 得到 (样本 x 工期) 成本；
+#       发射频次样本 beta(t) x 成功率 x 发射场数 x 载重 给出逐年火箭运力上限，超出上限的火箭运量记为缺口，
+#       有缺口的 (样本, 工期) 在该频次下无法按期完成 (成本引擎本身不限制火箭运力)。
+# 工期: 每组样本的 beta(t) 与逐年成功率代入 risk_optimization 的 S 型频次运力模型，
+#       每组样本跑 paths_per_sample 条天气/电梯随机路径 (completion_years)。
+
+N_SITES = 25            # 成本传播所假设的发射场数量
+
+def rocket_shortfall(samples, durations, n_sites=N_SITES):
+    """
+    (样本, 工期) 的火箭运量缺口 (MT): 逐年所需火箭运量 (默认电梯参数下需求 - 电梯运力)
+    超出该样本频次与成功率所允许上限的部分，按年占比累加。
+    """
+    durations = np.atleast_1d(np.asarray(durations, dtype=float))
+    n_years = int(np.ceil(durations.max()))
+    cap_e = DEFAULT_PARAMS["KE_NOMINAL"] * alpha_matrix(make_param_sets(), n_years)[0]
+    need = np.maximum(0, (M_TOTAL / durations)[:, None] - cap_e)                       # (D, Y)
+    years = START_YEAR + np.arange(n_years)
+    col = lambda name: samples[name][:, None]
+    cap_r = (logistic_model(years, col("L"), col("k"), col("t0")) * reliability_model(years, col("a"), col("b"))
+             * n_sites * PAYLOAD)                                                       # (S, Y)
+    excess = np.maximum(0, need[None] - cap_r[:, None, :])                             # (S, D, Y)
+    return (year_weights(durations, n_years)[None] * excess).sum(axis=2)
+
+@cached
+def cost_distribution(samples, durations, n_sites=N_SITES, year=START_YEAR):
+    """
+    返回 dict，每项为 (样本, 工期) 数组: green / financial ($)、shortfall (火箭运量缺口, MT)、
+    feasible (缺口为 0，即该组频次样本下可按期完成)
+    """
+    params = make_param_sets(LAUNCH_RELIABILITY=reliability_model(year, samples["a"], samples["b"]))
+    res = simulate_sweep(durations, params)
+    shortfall = rocket_shortfall(samples, durations, n_sites)
+    return {"green": res["green"], "financial": res["financial"], "shortfall": shortfall, "feasible": shortfall <= 0}
+
+def _capacity_fn(coeffs, rel_coeffs):
+    """与 risk_optimization.sample_capacity_logistic 相同，但频次曲线与成功率取一组后验样本"""
+    def capacity(rng, n_paths, year0, n_years, n_sites):
+        weather = np.maximum(0, rng.normal(WEATHER_MEAN, WEATHER_STD, (n_paths, n_years)))
+        years = np.arange(year0, year0 + n_years)
+        alpha = np.maximum(0, alpha_at(years) + ALPHA_STD * rng.standard_normal((n_paths, n_years)))
+        success = reliability_model(START_YEAR + years, *rel_coeffs)
+        return KE_NOMINAL * alpha + beta_at(years, coeffs) * success * PAYLOAD * n_sites * (1 - weather)
+    return capacity
+
+@cached
+def schedule_distribution(samples, n_sites, paths_per_sample=50, max_samples=1000, seed=2050):
+    """完工年数 (max_samples x paths_per_sample,)：参数不确定性与年度随机性的合成分布"""
+    rng = np.random.default_rng(seed)
+    n = min(max_samples, len(samples["L"]))
+    years = [completion_years(rng, paths_per_sample, n_sites,
+                              _capacity_fn((samples["L"][i], samples["k"][i], samples["t0"][i]),
+                                           (samples["a"][i], samples["b"][i])))
+             for i in range(n)]
+    return np.concatenate(years)
+
+# --- 6. 绘图 ---
+def plot_estimation(samples, filename='parameter_estimation_beta.png'):
+    point = samples["point"]
+    popt_cadence = [point[k] for k in ("L", "k", "t0")]
+    popt_rel = [point[k] for k in ("a", "b")]
+    future_years = np.arange(2012, 2100)
+    pred_cadence = logistic_model(future_years, *popt_cadence)
+    pred_reliability = reliability_model(future_years, *popt_rel)
+    band_c = np.percentile(logistic_model(future_years, samples["L"][:, None], samples["k"][:, None],
+                                          samples["t0"][:, None]), [5, 95], axis=0)
+    band_r = np.percentile(reliability_model(future_years, samples["a"][:, None], samples["b"][:, None]),
+                           [5, 95], axis=0)
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+
+    # 图1: 发射频率预测
+    ax1.scatter(years_hist, cadence_hist, color='black', label='Historical Data (SpaceX)', zorder=5)
+    ax1.plot(future_years, pred_cadence, color='#1f77b4', linewidth=3, label='Logistic Regression Prediction')
+    ax1.fill_between(future_years, *band_c, color='#1f77b4', alpha=0.2, label='Bootstrap 90% Band')
+    ax1.axvline(2050, color='r', linestyle='--', alpha=0.8, label='Project Start (2050)')
+    ax1.set_title('Estimation of Rocket Launch Cadence (beta_cadence)', fontsize=14)
+    ax1.set_ylabel('Launches per Site per Year', fontsize=12)
+    ax1.set_xlabel('Year', fontsize=12)
+    ax1.grid(True, linestyle='--', alpha=0.5)
+    ax1.legend()
+    # 标注 2050 年的值
+    val_2050 = logistic_model(2050, *popt_cadence)
+    ax1.annotate(f'2050 Capacity:\n~{int(val_2050)} launches/yr', (2050, val_2050),
+                 xytext=(2015, val_2050+50), arrowprops=dict(arrowstyle='->', color='black'))
+
+    # 图2: 可靠性预测
+    ax2.scatter(years_rel, rel_data, color='black', label='Historical Trend')
+    ax2.plot(future_years, pred_reliability, color='#2ca02c', linewidth=3, label='Reliability Growth Curve')
+    ax2.fill_between(future_years, *band_r, color='#2ca02c', alpha=0.2, label='Bootstrap 90% Band')
+    ax2.axvline(2050, color='r', linestyle='--', alpha=0.8)
+    ax2.set_title('Estimation of Vehicle Reliability (beta_reliability)', fontsize=14)
+    ax2.set_ylabel('Mission Success Rate', fontsize=12)
+    ax2.set_xlabel('Year', fontsize=12)
+    ax2.set_ylim(0.90, 1.01)
+    ax2.grid(True, linestyle='--', alpha=0.5)
+    ax2.legend(loc='lower right')
+    # 标注 2050 年的值
+    val_rel_2050 = reliability_model(2050, *popt_rel)
+    ax2.annotate(f'2050 Reliability:\n{val_rel_2050:.4f}', (2050, val_rel_2050),
+                 xytext=(2020, 0.96), arrowprops=dict(arrowstyle='->', color='black'))
+
+    plt.tight_layout()
+    plt.savefig(filename, dpi=300)
+    plt.close()
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    samples = bootstrap_calibration()
+    print(f"{N_BOOTSTRAP} bootstrap refits in {time.perf_counter() - start:.2f}s")
+    for name in ("L", "k", "t0", "a", "b"):
+        lo, hi = np.percentile(samples[name], [5, 95])
+        print(f"  {name:<3} point {samples['point'][name]:<10.4g} 90% CI [{lo:.4g}, {hi:.4g}]")
+    save_samples(samples)
+    plot_estimation(samples)
+
+    costs = cost_distribution(samples, [40, 60, 100])
+    for j, T in enumerate((40, 60, 100)):
+        q = np.percentile(costs["green"][:, j], [5, 50, 95]) / 1e12
+        print(f"Green cost T={T}: P5/P50/P95 = {q[0]:.3f} / {q[1]:.3f} / {q[2]:.3f} $T, "
+              f"cadence-feasible with {N_SITES} sites in {100 * costs['feasible'][:, j].mean():.1f}% of samples")
+
+    start = time.perf_counter()
+    for n_sites in (10, 25):
+        years = schedule_distribution(samples, n_sites)
+        q = np.percentile(years, [5, 50, 95])
+        print(f"{n_sites} sites: completion P5/P50/P95 = {q[0]:.0f} / {q[1]:.0f} / {q[2]:.0f} years")
+    print(f"Schedule propagation in {time.perf_counter() - start:.1f}s")
@@ -1,20 +1,18 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+from model_curves import get_alpha as lookup_alpha, get_beta
+
 # ==========================================
 # 1. 定义核心函数
 # ==========================================
 def get_alpha(t):
-    # 电梯效率衰减 (碎片模型)
-    t_diff = np.array(t) - 2050
-    lambda_t = 0.833 * (1 + 0.015)**t_diff
-    repair_t = 14 * (1 - 0.005)**t_diff
-    downtime = lambda_t * repair_t + (365 * 0.05)
-    return np.maximum(0, 1 - (downtime / 365))
+    # 电梯效率衰减 (碎片模型)，读取 model_curves 共享曲线
+    return lookup_alpha(t)
 
 def get_beta_logistic(t):
-    # 火箭发射频次 (S型增长)
-    return 400 / (1 + np.exp(-0.15 * (t - 2030)))
+    # 火箭发射频次 (S型增长)；2050 年以前按闭式公式求值
+    return get_beta(t)
 
 def get_rocket_cost_curve(n):
     # 莱特学习曲线
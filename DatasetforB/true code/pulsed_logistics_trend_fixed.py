@@ -1,75 +1,145 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from scipy.signal import fftconvolve
 
-# 1. 模拟宏观趋势 (2050 - 2150)
-years_long = np.linspace(2050, 2150, 500)
-# 电梯与火箭的基本份额演化逻辑
-alpha = 1.0 * np.exp(-0.015 * (years_long - 2050))
-beta = 1 / (1 + np.exp(-0.1 * (years_long - 2050 - 25)))
-total = alpha + beta
-share_e_long = alpha / total
-share_r_long = beta / total
-
-# 2. 模拟微观脉冲 (选取 2070-2071 年作为典型展示)
-years_micro = np.linspace(2070, 2071, 1500)
-window_period = 28 / 365.25  # 约28天一个发射窗口
-window_width = 3 / 365.25    # 假设窗口持续3天
-
-# 太空电梯流量 (Base Load)
-e_flow = 0.4 * np.ones_like(years_micro)
-
-# 火箭流量 (Pulse Load): 模拟离散轨道窗口
-r_flow = np.zeros_like(years_micro)
-for i in range(14):
-    center = 2070.05 + i * window_period
-    # 使用更窄的高斯函数模拟脉冲
-    r_flow += 3.5 * np.exp(-((years_micro - center)**2) / (2 * (window_width/2.5)**2))
-
-# --- 开始绘图 ---
-fig = plt.figure(figsize=(12, 9), dpi=200)
-
-# 子图 1: 宏观趋势分析 (100年视角)
-ax1 = plt.subplot2grid((2, 1), (0, 0))
-ax1.stackplot(years_long, share_e_long * 100, share_r_long * 100, 
-              labels=['Space Elevator (Base Load)', 'Rocket Fleet (Pulse Load)'],
-              colors=['#2878B5', '#C82423'], alpha=0.7)
-ax1.set_title('Macro-Scale: Adaptive Capacity Allocation (2050-2150)', fontsize=15, fontweight='bold', pad=12)
-ax1.set_ylabel('Allocation Percentage (%)', fontsize=12)
-ax1.set_xlim(2050, 2150)
-ax1.set_ylim(0, 100)
-ax1.legend(loc='upper right', frameon=True, fontsize=10)
-ax1.grid(True, linestyle='--', alpha=0.5)
-
-# 子图 2: 微观窗口分析 (1年脉冲细节)
-ax2 = plt.subplot2grid((2, 1), (1, 0))
-ax2.fill_between(years_micro, e_flow, color='#2878B5', alpha=0.3, label='Continuous Elevator Supply')
-ax2.plot(years_micro, e_flow + r_flow, color='#C82423', linewidth=1.2, label='Total Dynamic Logistics Flow')
-ax2.fill_between(years_micro, e_flow, e_flow + r_flow, color='#C82423', alpha=0.2)
-
-ax2.set_title('Micro-Scale: Pulsed Logistics & Orbital Windows (Discrete Constraints)', fontsize=15, fontweight='bold', pad=12)
-ax2.set_xlabel('Project Timeline (Year)', fontsize=12)
-ax2.set_ylabel('Instantaneous Throughput (MT/Day)', fontsize=12)
-ax2.set_xlim(2070, 2071)
-ax2.set_ylim(0, 5.5) # 提高上限，给标注留出空间
-ax2.legend(loc='upper right', frameon=True, fontsize=10)
-ax2.grid(True, linestyle='--', alpha=0.5)
-
-# --- 重新设计的非重叠标注 ---
-
-# 1. 峰值需求标注：移向右上方，并增加白色背景背景框
-ax2.annotate('Peak Surge Demand\n(Requires 25 Launchpads)', 
-             xy=(2070.36, 3.9), xytext=(2070.52, 4.6),
-             arrowprops=dict(facecolor='black', shrink=0.08, width=1.5, headwidth=8),
-             fontsize=11, fontweight='bold', 
-             bbox=dict(boxstyle="round,pad=0.4", fc="white", ec="#C82423", alpha=0.9))
-
-# 2. 稳定基准标注：移向左上方，避免与脉冲重叠
-ax2.annotate('Steady Baseline Supply', 
-             xy=(2070.15, 0.4), xytext=(2070.15, 2.5),
-             arrowprops=dict(facecolor='black', shrink=0.08, width=1.5, headwidth=8),
-             fontsize=11, fontweight='bold',
-             bbox=dict(boxstyle="round,pad=0.4", fc="white", ec="#2878B5", alpha=0.9))
-
-plt.tight_layout(pad=3.0)
-plt.savefig('pulsed_logistics_trend_fixed.png', bbox_inches='tight')
-plt.show()
\ No newline at end of file
+from batch_engine import M_TOTAL
+from result_cache import cached
+
+# ==========================================
+# 1. 宏观份额 (Macro Allocation Shares, 2050 - 2150)
+# ==========================================
+START_YEAR, END_YEAR = 2050, 2150
+DAYS_PER_YEAR = 365.25
+
+def macro_shares(years):
+    """电梯与火箭的基本份额演化逻辑: 返回 (share_e, share_r)"""
+    alpha = 1.0 * np.exp(-0.015 * (years - 2050))
+    beta = 1 / (1 + np.exp(-0.1 * (years - 2050 - 25)))
+    total = alpha + beta
+    return alpha / total, beta / total
+
+# ==========================================
+# 2. 全周期脉冲流量合成 (Pulsed-Flow Synthesis via FFT Convolution)
+# ==========================================
+# 总流量按 TOTAL_RATE (MT/天) 在电梯与火箭之间按宏观份额分配:
+#   电梯   连续基荷 = share_e(t) x TOTAL_RATE
+#   火箭   每 28 天一个发射窗口，窗口 k 运送该周期内的火箭份额
+#          m_k = share_r(t_k) x TOTAL_RATE x 28 天，在窗口中心放一个脉冲
+# 脉冲序列与归一化高斯核 (窗口持续 3 天，sigma = 3 / 2.5 天) 做一次 FFT 卷积，
+# 代价 O(N log N)，与窗口数无关；脉冲按线性插值分到相邻两个采样点，窗口中心不受采样网格限制，
+# 且每个窗口的质量精确守恒。
+TOTAL_RATE = M_TOTAL / ((END_YEAR - START_YEAR) * DAYS_PER_YEAR)   # MT / 天
+WINDOW_PERIOD = 28          # 天
+WINDOW_WIDTH = 3            # 天
+WINDOW_OFFSET = 0.05        # 第一个窗口中心距年初 (年)
+KERNEL_SIGMAS = 6           # 高斯核截断宽度 (sigma 倍数)
+
+def pulse_kernel(steps_per_day, width=WINDOW_WIDTH):
+    """离散化的高斯脉冲核，和为 1 (奇数长度，中心对齐)"""
+    sigma = width / 2.5 * steps_per_day
+    half = int(np.ceil(KERNEL_SIGMAS * sigma))
+    x = np.arange(-half, half + 1)
+    kernel = np.exp(-x ** 2 / (2 * sigma ** 2))
+    return kernel / kernel.sum()
+
+def window_calendar(start_year=START_YEAR, end_year=END_YEAR, period=WINDOW_PERIOD):
+    """各发射窗口中心 (距 start_year 的天数)"""
+    days = (end_year - start_year) * DAYS_PER_YEAR
+    return np.arange(WINDOW_OFFSET * DAYS_PER_YEAR, days, period)
+
+@cached
+def synthesize_flow(steps_per_day=24, start_year=START_YEAR, end_year=END_YEAR, total_rate=TOTAL_RATE,
+                    period=WINDOW_PERIOD, width=WINDOW_WIDTH):
+    """
+    整个时段的瞬时运量 (MT/天)，steps_per_day=1 为逐日、24 为逐小时。
+    返回 dict: years (采样时刻) / elevator / rocket / total
+    """
+    n = int(round((end_year - start_year) * DAYS_PER_YEAR * steps_per_day))
+    years = start_year + np.arange(n) / (steps_per_day * DAYS_PER_YEAR)
+    share_e, _ = macro_shares(years)
+
+    centers = window_calendar(start_year, end_year, period)
+    _, share_r = macro_shares(start_year + centers / DAYS_PER_YEAR)
+    mass = share_r * total_rate * period
+
+    # 脉冲 (MT/天 x 采样间隔 = MT)，分到相邻两个采样点
+    pos = centers * steps_per_day
+    lo = np.floor(pos).astype(np.int64)
+    frac = pos - lo
+    idx = np.concatenate([lo, lo + 1])
+    impulses = np.bincount(idx, weights=np.concatenate([mass * (1 - frac), mass * frac]), minlength=n + 1)[:n]
+
+    rocket = np.maximum(fftconvolve(impulses * steps_per_day, pulse_kernel(steps_per_day, width), mode='same'), 0)
+    elevator = share_e * total_rate
+    return {"years": years, "elevator": elevator, "rocket": rocket, "total": elevator + rocket}
+
+# ==========================================
+# 3. 绘图 (宏观份额 + 微观脉冲)
+# ==========================================
+def plot_pulsed_logistics(flow, micro=(2070, 2071), filename='pulsed_logistics_trend_fixed.png'):
+    years_long = np.linspace(START_YEAR, END_YEAR, 500)
+    share_e_long, share_r_long = macro_shares(years_long)
+
+    sel = (flow["years"] >= micro[0]) & (flow["years"] <= micro[1])
+    years_micro = flow["years"][sel]
+    e_flow, r_flow = flow["elevator"][sel] / 1e3, flow["rocket"][sel] / 1e3
+    peak = (e_flow + r_flow).argmax()
+
+    fig = plt.figure(figsize=(12, 9), dpi=200)
+
+    # 子图 1: 宏观趋势分析 (100年视角)
+    ax1 = plt.subplot2grid((2, 1), (0, 0))
+    ax1.stackplot(years_long, share_e_long * 100, share_r_long * 100,
+                  labels=['Space Elevator (Base Load)', 'Rocket Fleet (Pulse Load)'],
+                  colors=['#2878B5', '#C82423'], alpha=0.7)
+    ax1.set_title('Macro-Scale: Adaptive Capacity Allocation (2050-2150)', fontsize=15, fontweight='bold', pad=12)
+    ax1.set_ylabel('Allocation Percentage (%)', fontsize=12)
+    ax1.set_xlim(START_YEAR, END_YEAR)
+    ax1.set_ylim(0, 100)
+    ax1.legend(loc='upper right', frameon=True, fontsize=10)
+    ax1.grid(True, linestyle='--', alpha=0.5)
+
+    # 子图 2: 微观窗口分析 (1年脉冲细节，取自全周期合成序列)
+    ax2 = plt.subplot2grid((2, 1), (1, 0))
+    ax2.fill_between(years_micro, e_flow, color='#2878B5', alpha=0.3, label='Continuous Elevator Supply')
+    ax2.plot(years_micro, e_flow + r_flow, color='#C82423', linewidth=1.2, label='Total Dynamic Logistics Flow')
+    ax2.fill_between(years_micro, e_flow, e_flow + r_flow, color='#C82423', alpha=0.2)
+
+    ax2.set_title('Micro-Scale: Pulsed Logistics & Orbital Windows (Discrete Constraints)', fontsize=15,
+                  fontweight='bold', pad=12)
+    ax2.set_xlabel('Project Timeline (Year)', fontsize=12)
+    ax2.set_ylabel('Instantaneous Throughput (Thousand MT/Day)', fontsize=12)
+    ax2.set_xlim(*micro)
+    top = 1.5 * (e_flow + r_flow).max()
+    ax2.set_ylim(0, top)  # 提高上限，给标注留出空间
+    ax2.legend(loc='upper left', frameon=True, fontsize=10)
+    ax2.grid(True, linestyle='--', alpha=0.5)
+
+    # 峰值需求与稳定基准标注 (位置随数据确定，互不重叠)
+    span = micro[1] - micro[0]
+    ax2.annotate('Peak Surge Demand\n(Requires 25 Launchpads)',
+                 xy=(years_micro[peak], (e_flow + r_flow)[peak]), xytext=(micro[0] + 0.55 * span, 0.82 * top),
+                 arrowprops=dict(facecolor='black', shrink=0.08, width=1.5, headwidth=8),
+                 fontsize=11, fontweight='bold',
+                 bbox=dict(boxstyle="round,pad=0.4", fc="white", ec="#C82423", alpha=0.9))
+    base_x = micro[0] + 0.15 * span
+    ax2.annotate('Steady Baseline Supply',
+                 xy=(base_x, np.interp(base_x, years_micro, e_flow)), xytext=(base_x, 0.5 * top),
+                 arrowprops=dict(facecolor='black', shrink=0.08, width=1.5, headwidth=8),
+                 fontsize=11, fontweight='bold',
+                 bbox=dict(boxstyle="round,pad=0.4", fc="white", ec="#2878B5", alpha=0.9))
+
+    plt.tight_layout(pad=3.0)
+    plt.savefig(filename, bbox_inches='tight')
+    plt.close()
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    flow = synthesize_flow(steps_per_day=24)
+    elapsed = time.perf_counter() - start
+    delivered = flow["total"].sum() / 24
+    print(f"{len(flow['years']):,} hourly samples ({START_YEAR}-{END_YEAR}) in {elapsed:.3f}s, "
+          f"delivered {delivered / 1e6:.2f} million MT")
+    plot_pulsed_logistics(flow)
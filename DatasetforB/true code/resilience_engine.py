@@ -0,0 +1,172 @@
+import numpy as np
+
+from result_cache import cached
+
+# ==========================================
+# 1. 模型参数 (Section 7 Resilience Parameters)
+# ==========================================
+# 时间参数 (单位: 天)
+T_MAX = 180
+T_FAIL = 30            # 假设在第 30 天电梯发生失效
+
+# 物理参数 (单位: MT/day)
+OMEGA = 3500           # 月球基地日消耗率 (Omega)
+PHI_ISRU = 500         # 月球 ISRU 日产出 (Phi_ISRU)
+PHI_ELEVATOR = 2000    # 电梯日运力 (失效前)
+PHI_ROCKET_BASE = 1200 # 火箭常态日运力
+
+# 25 个发射场的“浪涌动员”参数 (Heaviside Step Function)
+N_PADS = 25
+CAP_PER_PAD = 180      # 单个场站全功率增量
+DELAY_MIN, DELAY_MAX = 5, 45   # 场站激活延迟: 5天到45天不等，模拟地勤动员时间
+
+S_INITIAL = 100000     # 初始储备
+S_CRIT = 30000         # 生存红线
+
+# ==========================================
+# 2. 精确批量积分 (Exact Batched Integrator)
+# ==========================================
+# 所有流量都是分段常数: 净流量只在电梯失效 (-PHI_ELEVATOR) 与各场站激活 (+cap) 时跳变。
+# 把每个情景的跳变按时间排序后，净流量 = 初值 + 跳变的累积和，
+# 储备 S(t) 在节点处 = S0 + cumsum(速率 x 段长)，节点之间精确线性。
+# 耗尽、转折、恢复时刻都在线性段内解析求出，不需要时间步进或 np.where 扫描。
+# 情景按行排列 (n 行)，一次调用处理任意多个 (t_fail, 场站数, 单站运力, 延迟剖面) 组合。
+
+def pad_delays(n_pads=N_PADS, delay_min=DELAY_MIN, delay_max=DELAY_MAX, width=None):
+    """
+    各情景的场站激活延迟 (n, width)：前 n_pads 个在 [delay_min, delay_max] 上等距，
+    其余位置为 inf (不激活)。n_pads 等参数可为标量或 (n,) 数组。
+    """
+    n_pads, delay_min, delay_max = np.broadcast_arrays(np.atleast_1d(n_pads), delay_min, delay_max)
+    width = int(n_pads.max()) if width is None else width
+    k = np.arange(width)
+    step = (delay_max - delay_min) / np.maximum(n_pads - 1, 1)
+    delays = delay_min[:, None] + step[:, None] * k
+    return np.where(k < n_pads[:, None], delays, np.inf)
+
+def _column(x, n):
+    return np.broadcast_to(np.asarray(x, dtype=float).reshape(-1, 1), (n, 1))
+
+def integrate(t_fail=T_FAIL, delays=None, cap_per_pad=CAP_PER_PAD, omega=OMEGA, phi_isru=PHI_ISRU,
+              phi_elevator=PHI_ELEVATOR, phi_rocket_base=PHI_ROCKET_BASE, s_initial=S_INITIAL, t_max=T_MAX):
+    """
+    批量求解 S(t)。delays 为 (k,) 或 (n, k)，inf 表示该场站不激活；
+    t_fail / omega / 各流量 / s_initial 可为标量或 (n,)，cap_per_pad 可为标量、(n,) 或 (n, k)。
+    返回 dict: t (节点时刻) / s (节点储备) / rate (节点后的净流量) / omega / t_fail / t_max，
+    节点数组形状均为 (n, k + 3)。
+    """
+    delays = pad_delays() if delays is None else np.atleast_2d(np.asarray(delays, dtype=float))
+    n = np.broadcast_shapes(delays.shape[:1], np.shape(np.atleast_1d(cap_per_pad))[:1],
+                            *(np.shape(np.atleast_1d(x)) for x in
+                              (t_fail, omega, phi_isru, phi_elevator, phi_rocket_base, s_initial)))[0]
+    delays = np.broadcast_to(delays, (n, delays.shape[1]))
+    t_fail, omega, phi_e, s0 = (_column(x, n) for x in (t_fail, omega, phi_elevator, s_initial))
+    rate0 = phi_e + _column(phi_isru, n) + _column(phi_rocket_base, n) - omega
+
+    # 跳变事件: 失效 + 各场站激活；未激活场站的跳变为 0、时刻为 inf
+    cap = np.broadcast_to(_column(cap_per_pad, n) if np.ndim(cap_per_pad) < 2
+                          else np.asarray(cap_per_pad, dtype=float), delays.shape)
+    times = np.concatenate([t_fail, t_fail + delays], axis=1)
+    jumps = np.concatenate([-phi_e, np.where(np.isinf(delays), 0.0, cap)], axis=1)
+    order = np.argsort(times, axis=1, kind='stable')
+    times = np.minimum(np.take_along_axis(times, order, axis=1), t_max)
+    jumps = np.take_along_axis(jumps, order, axis=1)
+
+    t = np.concatenate([np.zeros((n, 1)), times, np.full((n, 1), float(t_max))], axis=1)
+    rate = rate0 + np.concatenate([np.zeros((n, 1)), np.cumsum(jumps, axis=1)], axis=1)
+    rate = np.concatenate([rate, rate[:, -1:]], axis=1)
+    s = s0 + np.concatenate([np.zeros((n, 1)), np.cumsum(rate[:, :-1] * np.diff(t, axis=1), axis=1)], axis=1)
+    return {"t": t, "s": s, "rate": rate, "omega": omega[:, 0], "t_fail": t_fail[:, 0], "t_max": float(t_max)}
+
+def _locate(batch, t):
+    """每个情景在时间网格 t 上所处的节点下标 (n, m)；按行平移后一次 searchsorted"""
+    knots = batch["t"]
+    n, width = knots.shape
+    span = 2 * batch["t_max"] + 1
+    t = np.clip(np.asarray(t, dtype=float), 0, batch["t_max"])
+    offset = span * np.arange(n)[:, None]
+    idx = np.searchsorted((knots + offset).ravel(), (t + offset).ravel(), side='right').reshape(n, -1) - 1
+    return idx - width * np.arange(n)[:, None], t
+
+def stock_at(batch, t):
+    """储备 S(t)，形状 (n, len(t))"""
+    idx, t = _locate(batch, t)
+    t0 = np.take_along_axis(batch["t"], idx, axis=1)
+    return np.take_along_axis(batch["s"], idx, axis=1) + np.take_along_axis(batch["rate"], idx, axis=1) * (t - t0)
+
+def inflow_at(batch, t):
+    """总输入流量 (净流量 + 消耗)，形状 (n, len(t))；跳变时刻取右极限"""
+    idx, _ = _locate(batch, t)
+    return np.take_along_axis(batch["rate"], idx, axis=1) + batch["omega"][:, None]
+
+def _first(mask, values):
+    """每行第一个 True 对应的值，没有则为 nan"""
+    hit = mask.any(axis=1)
+    return np.where(hit, np.take_along_axis(values, mask.argmax(axis=1)[:, None], axis=1)[:, 0], np.nan)
+
+def resilience_metrics(batch, s_crit=S_CRIT):
+    """
+    各情景的韧性指标 (均为 (n,) 数组，时刻单位为天，未发生则为 nan):
+    min_stock / t_min / pivot (失效后净流量首次转正) / depletion (首次跌破红线) /
+    recovery (跌破后首次回到红线) / time_below (低于红线的总天数) / breach / s_final
+    """
+    t, s, rate = batch["t"], batch["s"], batch["rate"]
+    t_a, dt, r = t[:, :-1], np.diff(t, axis=1), rate[:, :-1]
+    s_a, s_b = s[:, :-1], s[:, 1:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_cross = t_a + (s_crit - s_a) / r
+
+    down = (s_a >= s_crit) & (s_b < s_crit)
+    depletion = np.where(s[:, 0] < s_crit, 0.0, _first(down, t_cross))
+    up = (s_a < s_crit) & (s_b >= s_crit) & (t_a >= np.nan_to_num(depletion, nan=np.inf)[:, None])
+    after_fail = (t_a >= batch["t_fail"][:, None]) & (dt > 0) & (r >= 0)
+
+    # 每段内低于红线的时长: 线性段与水平线的交点把段切成两部分
+    rel = np.clip(np.nan_to_num(t_cross - t_a, nan=0.0, posinf=0.0, neginf=0.0), 0, dt)
+    below = np.where(r < 0, dt - rel, np.where(r > 0, rel, np.where(s_a < s_crit, dt, 0.0)))
+
+    k_min = s.argmin(axis=1)
+    return {
+        "min_stock": s.min(axis=1),
+        "t_min": t[np.arange(len(t)), k_min],
+        "pivot": _first(after_fail, t_a),
+        "depletion": depletion,
+        "recovery": _first(up, t_cross),
+        "time_below": below.sum(axis=1),
+        "breach": s.min(axis=1) < s_crit,
+        "s_final": s[:, -1],
+    }
+
+def scenario_grid(**axes):
+    """各参数轴的笛卡尔积，返回展平后的 dict (每个值为 (n,) 数组)，可直接传入 pad_delays / integrate"""
+    names = list(axes)
+    mesh = np.meshgrid(*(np.atleast_1d(axes[k]) for k in names), indexing='ij')
+    return {k: m.ravel() for k, m in zip(names, mesh)}
+
+@cached
+def resilience_surface(s_crit=S_CRIT, **axes):
+    """
+    在参数网格上一次性求韧性指标。axes 可取 t_fail / n_pads / cap_per_pad / delay_min / delay_max /
+    omega / s_initial 等；返回 (grid, metrics)，metrics 各项已还原为网格形状。
+    """
+    shape = tuple(np.size(v) for v in axes.values())
+    grid = scenario_grid(**axes)
+    delays = pad_delays(grid.get("n_pads", N_PADS), grid.get("delay_min", DELAY_MIN), grid.get("delay_max", DELAY_MAX))
+    kwargs = {k: v for k, v in grid.items() if k not in ("n_pads", "delay_min", "delay_max")}
+    metrics = resilience_metrics(integrate(delays=delays, **kwargs), s_crit)
+    return grid, {k: v.reshape(shape) for k, v in metrics.items()}
+
+if __name__ == "__main__":
+    import time
+
+    batch = integrate()
+    m = resilience_metrics(batch)
+    print(f"Baseline: min stock {m['min_stock'][0]:.0f} MT on day {m['t_min'][0]:.1f}, "
+          f"pivot {m['pivot'][0] - T_FAIL:.1f} days post-failure, breach: {bool(m['breach'][0])}")
+
+    start = time.perf_counter()
+    grid, surface = resilience_surface(t_fail=np.linspace(0, 150, 151), n_pads=np.arange(1, 41),
+                                       cap_per_pad=np.linspace(60, 300, 25), omega=[3000, 3500, 4000])
+    n = surface["min_stock"].size
+    print(f"{n} scenarios in {time.perf_counter() - start:.2f}s, "
+          f"breach fraction {surface['breach'].mean():.3f}, worst min stock {surface['min_stock'].min():.0f} MT")
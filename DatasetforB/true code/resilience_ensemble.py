@@ -0,0 +1,150 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy.stats import binom
+
+from model_curves import ALPHA_COEFFS
+from debris_sampler import REPAIR_CV
+from risk_optimization import WEATHER_MEAN
+from resilience_engine import (CAP_PER_PAD, DELAY_MIN, DELAY_MAX, N_PADS, OMEGA, PHI_ELEVATOR, PHI_ISRU,
+                               PHI_ROCKET_BASE, S_CRIT, S_INITIAL)
+from result_cache import cached
+
+# ==========================================
+# 1. 随机多故障韧性集合 (Stochastic Multi-Failure Ensemble)
+# ==========================================
+# Section 7 只考虑第 30 天一次电梯失效与确定性浪涌。这里把各种中断当作随机过程，按天推进:
+#   电梯碎片撞击   每年 lambda0 次 (ALPHA_COEFFS)，维修 ~ Normal(repair0, REPAIR_CV * repair0) 天
+#   电梯重大失效   每年 MAJOR_RATE 次，停运 ~ Gamma(均值 MAJOR_MEAN_DAYS)，模拟缆绳断裂级事故
+#   发射场故障     每个场站每天以 PAD_FAIL_RATE 的概率停机，停机场站每天以 1 / PAD_REPAIR_DAYS 的概率修复
+#   天气取消       每天每个场站以 WEATHER_MEAN 的概率取消发射 (与 risk_optimization 相同的均值)
+#   浪涌动员       电梯停运后，每个未动员场站在 DELAY_MIN 天后以日风险 1 / (均值延迟 - DELAY_MIN) 动员，
+#                  延迟为平移几何分布，均值与 Section 7 的 5-45 天等距剖面相同；电梯恢复后浪涌撤销
+# 全部集合成员以 (n,) 数组状态同时推进，场站只记“在役数 / 已动员数”两个计数，
+# 每天的转移用均匀数阈值或二项/超几何分布抽样，且只对发生状态变化的成员子集抽样，单步开销与场站数无关。
+HORIZON_DAYS = 3 * 365
+N_MEMBERS = 100_000
+S_MAX = 150_000            # 月面仓储上限，超出部分不再运送
+MAJOR_RATE = 0.1           # 电梯重大失效 (次/年)
+MAJOR_MEAN_DAYS = 120
+MAJOR_SHAPE = 4            # Gamma 形状参数 (CV = 0.5)
+PAD_FAIL_RATE = 1 / 365    # 单个场站日故障概率
+PAD_REPAIR_DAYS = 10       # 场站平均修复天数
+WEATHER_TABLE = 2 ** 16
+DEFAULT_SEED = 2050
+
+@cached
+def simulate_ensemble(n_members=N_MEMBERS, horizon=HORIZON_DAYS, n_pads=N_PADS, cap_per_pad=CAP_PER_PAD,
+                      s_initial=S_INITIAL, s_crit=S_CRIT, omega=OMEGA, delay_min=DELAY_MIN, delay_max=DELAY_MAX,
+                      major_rate=MAJOR_RATE, weather=WEATHER_MEAN, seed=DEFAULT_SEED):
+    """
+    按天推进整个集合。返回 dict:
+    days / survival (每天仍未跌破红线的比例) / elevator_down (每天电梯停运比例) /
+    min_stock (各成员观察期内的最低储备) / breach_day (首次跌破的天数，未跌破为 inf)
+    """
+    rng = np.random.default_rng(seed)
+    lambda0, repair0 = ALPHA_COEFFS[0], ALPHA_COEFFS[2]
+    p_strike, p_major = lambda0 / 365, major_rate / 365
+    p_mobilize = 1 / max((delay_min + delay_max) / 2 - delay_min, 1)
+    # 天气取消场站数 ~ Binomial(n_pads, weather)，用 2^16 档分位数表查表 (每个成员每天只需一个均匀数)
+    weather_table = binom.ppf((np.arange(WEATHER_TABLE) + 0.5) / WEATHER_TABLE, n_pads, weather) / max(n_pads, 1)
+
+    stock = np.full(n_members, float(s_initial))
+    min_stock = stock.copy()
+    outage_left = np.zeros(n_members)          # 电梯剩余停运天数 (0 = 运行)
+    down_days = np.zeros(n_members)            # 本次停运已持续天数 (用于动员的最短延迟)
+    pads_up = np.full(n_members, n_pads)       # 在役场站数
+    mobilized = np.zeros(n_members, dtype=np.int64)
+    breach_day = np.full(n_members, np.inf)
+    survival = np.empty(horizon)
+    elevator_down = np.empty(horizon)
+
+    for day in range(horizon):
+        u_elev, u_pad, u_repair, u_weather = rng.random((4, n_members))
+
+        # 电梯中断到达: 碎片撞击 (短) 与重大失效 (长)；只为发生事件的成员抽维修时长，
+        # 停运期间新的事件顺延剩余时间
+        hit = np.flatnonzero(u_elev < p_strike + p_major)
+        if hit.size:
+            major = u_elev[hit] >= p_strike
+            repair = np.where(major, rng.gamma(MAJOR_SHAPE, MAJOR_MEAN_DAYS / MAJOR_SHAPE, hit.size),
+                              np.maximum(0, rng.normal(repair0, REPAIR_CV * repair0, hit.size)))
+            outage_left[hit] = np.maximum(outage_left[hit], repair)
+        elev_up = outage_left <= 0
+        down_days = np.where(elev_up, 0, down_days + 1)
+
+        # 场站故障与修复: 日转移概率很小，按一阶近似每个成员每天至多发生一次
+        pads_up = pads_up - (u_pad < pads_up * PAD_FAIL_RATE) + (u_repair < (n_pads - pads_up) / PAD_REPAIR_DAYS)
+
+        # 浪涌动员: 仅在电梯停运且超过最短延迟后进行；电梯恢复即撤销；
+        # 已动员场站中处于在役状态的数目服从超几何分布
+        mobilized[elev_up] = 0
+        eligible = np.flatnonzero(down_days > delay_min)
+        if eligible.size:
+            mobilized[eligible] += rng.binomial(n_pads - mobilized[eligible], p_mobilize)
+        active = np.zeros(n_members, dtype=np.int64)
+        surging = np.flatnonzero(mobilized)
+        if surging.size:
+            active[surging] = rng.hypergeometric(pads_up[surging], n_pads - pads_up[surging], mobilized[surging])
+
+        # 天气: 取消的场站比例对常态与浪涌火箭同时生效
+        flying = 1 - weather_table[(u_weather * WEATHER_TABLE).astype(np.int64)]
+        inflow = PHI_ELEVATOR * elev_up + PHI_ISRU + (PHI_ROCKET_BASE + cap_per_pad * active) * flying
+        stock = np.minimum(stock + inflow - omega, S_MAX)
+        outage_left = np.maximum(outage_left - 1, 0)
+
+        np.minimum(min_stock, stock, out=min_stock)
+        breach_day[np.isinf(breach_day) & (stock < s_crit)] = day + 1
+        survival[day] = np.isinf(breach_day).mean()
+        elevator_down[day] = 1 - elev_up.mean()
+
+    return {
+        "days": np.arange(1, horizon + 1),
+        "survival": survival,
+        "elevator_down": elevator_down,
+        "min_stock": min_stock,
+        "breach_day": breach_day,
+    }
+
+def compare_pads(pad_counts=(10, 25), **kwargs):
+    """不同浪涌场站数的集合 (共用同一随机种子)"""
+    return {n: simulate_ensemble(n_pads=n, **kwargs) for n in pad_counts}
+
+# ==========================================
+# 2. 可视化 (Survival Curves & Worst-Inventory Distributions)
+# ==========================================
+def plot_ensemble(results, s_crit=S_CRIT, filename='resilience_ensemble.png'):
+    colors = ['#D62728', '#2878B5', '#2CA02C', '#FF7F0E']
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6), dpi=150)
+    for (n_pads, res), color in zip(results.items(), colors):
+        ax1.plot(res["days"], 100 * res["survival"], color=color, linewidth=2.5,
+                 label=f'{n_pads} Surge Pads (final {100 * res["survival"][-1]:.1f}%)')
+        ax2.hist(res["min_stock"] / 1e3, bins=80, density=True, histtype='stepfilled', alpha=0.35, color=color,
+                 label=f'{n_pads} Surge Pads')
+    ax1.set_title('Survival Probability: $P(S(\\tau) \\geq S_{crit},\\ \\tau \\leq t)$', fontsize=14, fontweight='bold')
+    ax1.set_xlabel('Days Since Project Launch', fontsize=12)
+    ax1.set_ylabel('Ensemble Members Surviving (%)', fontsize=12)
+    ax1.legend(loc='lower left', frameon=True)
+    ax1.grid(True, linestyle='--', alpha=0.5)
+
+    ax2.axvline(s_crit / 1e3, color='black', linestyle='--', label='Survival Threshold $S_{crit}$')
+    ax2.set_title('Distribution of Worst-Case Inventory', fontsize=14, fontweight='bold')
+    ax2.set_xlabel('Minimum Inventory over Horizon (Thousand MT)', fontsize=12)
+    ax2.set_ylabel('Density', fontsize=12)
+    ax2.legend(loc='upper left', frameon=True)
+    ax2.grid(True, linestyle='--', alpha=0.5)
+    plt.tight_layout()
+    plt.savefig(filename)
+    plt.close()
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    results = compare_pads()
+    print(f"{len(results)} x {N_MEMBERS} members x {HORIZON_DAYS} days in {time.perf_counter() - start:.1f}s")
+    for n_pads, res in results.items():
+        q = np.percentile(res["min_stock"], [1, 5, 50])
+        print(f"{n_pads} pads: survival {100 * res['survival'][-1]:.2f}%, worst inventory "
+              f"P1/P5/P50 = {q[0]:.0f} / {q[1]:.0f} / {q[2]:.0f} MT, "
+              f"elevator down {100 * res['elevator_down'].mean():.1f}% of days")
+    plot_ensemble(results)
@@ -1,50 +1,34 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+from resilience_engine import (CAP_PER_PAD, DELAY_MAX, DELAY_MIN, N_PADS, OMEGA, PHI_ELEVATOR, PHI_ISRU,
+                               PHI_ROCKET_BASE, S_CRIT, S_INITIAL, T_FAIL, T_MAX, inflow_at, integrate, pad_delays,
+                               resilience_metrics, stock_at)
+
 def generate_section_7_resilience_plots():
-    # 1. 时间参数定义 (单位: 天)
-    t_max = 180
+    t_max = T_MAX
     t = np.linspace(0, t_max, 1000)
-    t_fail = 30  # 假设在第 30 天电梯发生失效
-
-    # 2. 物理参数设定 (单位: MT/day)
-    omega = 3500           # 月球基地日消耗率 (Omega)
-    phi_isru = 500         # 月球 ISRU 日产出 (Phi_ISRU)
-    phi_elevator = 2000    # 电梯日运力 (失效前)
-    phi_rocket_base = 1200 # 火箭常态日运力
+    t_fail = T_FAIL
 
-    # 3. 25 个发射场的“浪涌动员”参数 (Heaviside Step Function)
-    n_pads = 25
-    cap_per_pad = 180      # 单个场站全功率增量
-    # 设定场站激活延迟: 5天到45天不等，模拟地勤动员时间
-    delays = np.linspace(5, 45, n_pads) 
+    omega = OMEGA
+    phi_isru = PHI_ISRU
+    phi_elevator = PHI_ELEVATOR
+    phi_rocket_base = PHI_ROCKET_BASE
+    S_initial = S_INITIAL
+    S_crit = S_CRIT
 
-    # 4. 计算运力流 (Flows)
+    # 4. 精确求解: 失效与 25 个场站激活 (Heaviside 阶跃) 的跳变累加，S(t) 分段线性
+    batch = integrate(t_fail, pad_delays(N_PADS, DELAY_MIN, DELAY_MAX), CAP_PER_PAD)
+    S = stock_at(batch, t)[0]
+    total_inflow = inflow_at(batch, t)[0]
     flow_elevator = np.where(t < t_fail, phi_elevator, 0)
     flow_isru = np.full_like(t, phi_isru)
     flow_rocket_base = np.full_like(t, phi_rocket_base)
 
-    # 核心：基于单位阶跃函数的浪涌叠加
-    surge_flow = np.zeros_like(t)
-    for d in delays:
-        # H(t - t_fail - Delta_t_i)
-        surge_flow += np.where(t > (t_fail + d), cap_per_pad, 0)
-
-    total_inflow = flow_elevator + flow_isru + flow_rocket_base + surge_flow
-    net_flow = total_inflow - omega
-
-    # 5. 数值积分得到物资储备 S(t)
-    dt = t[1] - t[0]
-    S = np.zeros_like(t)
-    S_initial = 100000     # 初始储备
-    S_crit = 30000        # 生存红线
-    S[0] = S_initial
-    for i in range(1, len(t)):
-        S[i] = S[i-1] + net_flow[i] * dt
-
-    # 寻找转折点 t* (储备量止跌回升的时刻)
-    pivot_idx = np.where((net_flow >= 0) & (t > t_fail))[0]
-    t_star = t[pivot_idx[0]] if len(pivot_idx) > 0 else None
+    # 5. 转折点 t* (储备量止跌回升的时刻) 由节点解析给出
+    t_star = resilience_metrics(batch, S_crit)["pivot"][0]
+    t_star = None if np.isnan(t_star) else t_star
+    S_star = stock_at(batch, [t_star])[0, 0] if t_star else None
 
     # --- 绘图逻辑 ---
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10), sharex=True, dpi=150)
@@ -58,9 +42,9 @@ def generate_section_7_resilience_plots():
     ax1.fill_between(t, 0, S_crit, color='#D62728', alpha=0.1)
     
     if t_star:
-        ax1.scatter(t_star, S[pivot_idx[0]], color='green', s=100, zorder=5)
+        ax1.scatter(t_star, S_star, color='green', s=100, zorder=5)
         ax1.annotate(f'Pivot Point: Day {int(t_star-t_fail)} Post-Failure',
-                     xy=(t_star, S[pivot_idx[0]]), xytext=(t_star+15, S[pivot_idx[0]]-10000),
+                     xy=(t_star, S_star), xytext=(t_star+15, S_star-10000),
                      arrowprops=dict(facecolor='black', shrink=0.05, width=1.5),
                      fontsize=11, fontweight='bold', bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="green", alpha=0.9))
 
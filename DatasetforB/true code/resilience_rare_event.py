@@ -0,0 +1,114 @@
+import numpy as np
+from scipy.special import ndtr
+
+from resilience_engine import DELAY_MAX, DELAY_MIN, N_PADS, OMEGA, S_CRIT, T_MAX, integrate
+from result_cache import cached
+
+# ==========================================
+# 1. 随机韧性模型 (Stochastic Resilience Model)
+# ==========================================
+# 在 Section 7 的确定性模型上加入三类不确定性，全部由标准正态向量 Z 驱动:
+#   失效时刻   t_fail = T_MAX * Phi(Z_t)                      (在观察期内均匀分布)
+#   激活延迟   d_i = nominal_i * exp(SIGMA_COMMON * Z_c + SIGMA_PAD * Z_i)  (共同冲击 + 场站个体)
+#   消耗率     omega = OMEGA * (1 + OMEGA_CV * Z_w)
+# 流量分段为常数，S(t) 分段线性，min S 由 resilience_engine 的节点精确给出，无需时间步进。
+SIGMA_COMMON = 0.25
+SIGMA_PAD = 0.25
+OMEGA_CV = 0.02
+NOMINAL_DELAYS = np.linspace(DELAY_MIN, DELAY_MAX, N_PADS)
+N_DIM = N_PADS + 3      # [Z_t, Z_c, Z_w, Z_1..Z_25]
+
+def scenario_from_normals(z):
+    """Z (n, N_DIM) -> (t_fail, delays, omega)"""
+    t_fail = T_MAX * ndtr(z[:, 0])
+    delays = NOMINAL_DELAYS * np.exp(SIGMA_COMMON * z[:, 1:2] + SIGMA_PAD * z[:, 3:])
+    omega = OMEGA * (1 + OMEGA_CV * z[:, 2])
+    return t_fail, delays, omega
+
+def min_stock(t_fail, delays, omega):
+    """观察期内储备的精确最小值 (见 resilience_engine.integrate)"""
+    return integrate(t_fail, delays, omega=omega)["s"].min(axis=1)
+
+def depletion_score(z, s_crit=S_CRIT):
+    """score > 0 表示跌破生存红线"""
+    return s_crit - min_stock(*scenario_from_normals(z))
+
+# ==========================================
+# 2. 交叉熵重要性抽样 (Cross-Entropy Importance Sampling)
+# ==========================================
+# 建议分布取均值平移的标准正态 N(mu, I)，似然比 w(Z) = exp(-mu.Z + |mu|^2 / 2)。
+# 交叉熵迭代: 每轮取得分最高的 RHO 比例样本作为精英，用加权均值更新 mu，
+# 直到精英阈值越过 0 (即红线)；最后用 mu 做一次大样本重要性抽样并报告相对误差。
+RHO = 0.1
+CE_SAMPLES = 20_000
+CE_MAX_ITER = 30
+CHUNK = 200_000
+
+def _log_weight(z, mu):
+    return -z @ mu + 0.5 * mu @ mu
+
+def cross_entropy_shift(rng, s_crit=S_CRIT, n_samples=CE_SAMPLES, rho=RHO, max_iter=CE_MAX_ITER):
+    """交叉熵法求最优平移 mu"""
+    mu = np.zeros(N_DIM)
+    for _ in range(max_iter):
+        z = mu + rng.standard_normal((n_samples, N_DIM))
+        score = depletion_score(z, s_crit)
+        level = min(0.0, np.quantile(score, 1 - rho))
+        elite = score >= level
+        w = np.exp(_log_weight(z[elite], mu))
+        mu = (w[:, None] * z[elite]).sum(axis=0) / w.sum()
+        if level >= 0:
+            break
+    return mu
+
+@cached
+def estimate_depletion_probability(n_samples=1_000_000, s_crit=S_CRIT, seed=2050, mu=None):
+    """
+    P(min S(t) < s_crit) 的重要性抽样估计。
+    返回 dict: probability / rel_error / n_samples / mu / hits
+    """
+    rng = np.random.default_rng(seed)
+    if mu is None:
+        mu = cross_entropy_shift(rng, s_crit)
+    total, total_sq, hits = 0.0, 0.0, 0
+    for s in range(0, n_samples, CHUNK):
+        n = min(CHUNK, n_samples - s)
+        z = mu + rng.standard_normal((n, N_DIM))
+        hit = depletion_score(z, s_crit) > 0
+        w = np.where(hit, np.exp(_log_weight(z, mu)), 0.0)
+        total += w.sum()
+        total_sq += (w ** 2).sum()
+        hits += int(hit.sum())
+    p = total / n_samples
+    var = max(total_sq / n_samples - p ** 2, 0.0) / n_samples
+    return {
+        "probability": p,
+        "rel_error": np.sqrt(var) / p if p > 0 else np.inf,
+        "n_samples": n_samples,
+        "mu": mu,
+        "hits": hits,
+    }
+
+def naive_depletion_probability(n_samples=1_000_000, s_crit=S_CRIT, seed=2050):
+    """直接蒙特卡洛 (用于在概率不太小的阈值下校验重要性抽样)"""
+    return estimate_depletion_probability(n_samples, s_crit, seed, mu=np.zeros(N_DIM))
+
+if __name__ == "__main__":
+    import time
+
+    # 校验: 较高阈值下与直接蒙特卡洛对比
+    check_level = 60000
+    naive = naive_depletion_probability(2_000_000, check_level)
+    is_check = estimate_depletion_probability(200_000, check_level)
+    print(f"S_crit={check_level}: naive {naive['probability']:.3e} (±{100 * naive['rel_error']:.1f}%), "
+          f"IS {is_check['probability']:.3e} (±{100 * is_check['rel_error']:.1f}%)")
+
+    # 生存红线及更低阈值: 概率降至 1e-7 量级时相对误差仍低于 1%
+    print(f"{'S_crit':<8} | {'P(min S < S_crit)':<18} | {'Rel. Error':<10} | {'Hits':<8} | {'Time (s)':<8}")
+    print("-" * 64)
+    for level in (S_CRIT, 25000, 20000):
+        start = time.perf_counter()
+        res = estimate_depletion_probability(s_crit=level)
+        rel = f"{100 * res['rel_error']:.2f}%"
+        print(f"{level:<8} | {res['probability']:<18.3e} | {rel:<10} | "
+              f"{res['hits']:<8} | {time.perf_counter() - start:<8.1f}")
@@ -0,0 +1,211 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from batch_engine import DEFAULT_PARAMS
+from resilience_engine import S_CRIT, integrate, pad_delays, resilience_metrics
+from result_cache import code_version
+
+# ==========================================
+# 1. 设计空间 (Resilience Design Space)
+# ==========================================
+# 设计变量 (需要花钱的): 场站数、单站浪涌运力、初始储备
+# 压力变量 (不可控的): 最短/最长激活延迟、电梯失效时刻
+# 一个设计“永不跌破红线”指它在全部压力组合下 min S >= S_crit。
+# 网格按 (设计轴..., 压力轴...) 的 C 顺序展平，同一设计的全部压力组合在结果文件中连续存放。
+DESIGN_AXES = ("n_pads", "cap_per_pad", "s_initial")
+STRESS_AXES = ("delay_min", "delay_max", "t_fail")
+DEFAULT_AXES = {
+    "n_pads": np.arange(1, 41),
+    "cap_per_pad": np.arange(60, 301, 10),
+    "s_initial": np.arange(40_000, 200_001, 10_000),
+    "delay_min": np.array([0, 5, 10]),
+    "delay_max": np.array([30, 45, 60]),
+    "t_fail": np.arange(0, 151, 30),
+}   # 40 x 25 x 17 x 54 = 918,000 个格点
+
+# final_.plot_resilience_test 的 10 vs 25 基地模型: 失效即刻发生，无 ISRU 与常态火箭，
+# 每基地浪涌 1.1 x 0.15 千吨/天，日消耗 4547 MT，初始储备 410 千吨
+FINAL_BASE = {"omega": 4547, "phi_isru": 0, "phi_elevator": 0, "phi_rocket_base": 0}
+FINAL_AXES = {
+    "n_pads": np.arange(1, 41),
+    "cap_per_pad": np.array([165]),
+    "s_initial": np.array([410_000]),
+    "delay_min": np.array([0]),
+    "delay_max": np.array([0]),
+    "t_fail": np.array([0]),
+}
+
+# 设计成本 (USD，粗略单位价格): 储备按电梯运价计 (batch_engine 的 COST_E_PER_MT)
+PAD_COST = 1.5e9                 # 新建/改造一个具备浪涌能力的发射场
+SURGE_COST_PER_MT_DAY = 5e6      # 每 MT/day 的常备浪涌运力 (运载器、燃料与地勤储备)
+RESERVE_COST_PER_MT = DEFAULT_PARAMS["COST_E_PER_MT"]
+
+CHUNK_CELLS = 50_000
+RECORD_DTYPE = np.dtype([("min_stock", "f8"), ("time_below", "f8"), ("recovery_time", "f8")])
+
+def config_cost(n_pads, cap_per_pad, s_initial):
+    """设计成本 (USD)"""
+    return n_pads * PAD_COST + n_pads * cap_per_pad * SURGE_COST_PER_MT_DAY + s_initial * RESERVE_COST_PER_MT
+
+def grid_cells(axes, start, stop):
+    """第 [start, stop) 个格点的各轴取值 (不展开整个网格)"""
+    names = list(axes)
+    idx = np.unravel_index(np.arange(start, stop), tuple(len(axes[k]) for k in names))
+    return {k: np.asarray(axes[k])[i] for k, i in zip(names, idx)}
+
+def evaluate_cells(cells, base=None, s_crit=S_CRIT):
+    """一批格点的韧性指标，返回 RECORD_DTYPE 结构数组"""
+    delays = pad_delays(cells["n_pads"], cells["delay_min"], cells["delay_max"])
+    batch = integrate(cells["t_fail"], delays, cells["cap_per_pad"], s_initial=cells["s_initial"], **(base or {}))
+    m = resilience_metrics(batch, s_crit)
+
+    # 恢复时间: 未跌破为 0；跌破后直到观察期末仍未回到红线为 inf
+    recovery = np.where(m["breach"], np.nan_to_num(m["recovery"] - m["depletion"], nan=np.inf), 0.0)
+    out = np.empty(len(recovery), dtype=RECORD_DTYPE)
+    out["min_stock"], out["time_below"], out["recovery_time"] = m["min_stock"], m["time_below"], recovery
+    return out
+
+# ==========================================
+# 2. 并行扫描，结果流式写盘 (Parallel Sweep Streaming to Disk)
+# ==========================================
+# 结果写入 .npy 内存映射文件，每个进程只写自己负责的区段；元数据 (各轴、基准参数、代码版本) 写入同名 .json。
+# 内存峰值只与 CHUNK_CELLS 有关，与格点总数无关。
+# 已有结果文件的元数据与本次完全一致 (代码版本同 result_cache) 时跳过扫描，直接复用。
+
+def _sweep_block(task):
+    path, axes, base, s_crit, start, stop = task
+    out = np.load(path, mmap_mode='r+')
+    out[start:stop] = evaluate_cells(grid_cells(axes, start, stop), base, s_crit)
+    out.flush()
+    return stop - start
+
+def run_sweep(path, axes=None, base=None, s_crit=S_CRIT, workers=None, chunk_cells=CHUNK_CELLS, force=False):
+    """
+    扫描 axes 的全部格点 (轴顺序须为 DESIGN_AXES + STRESS_AXES)，结果写入 path (.npy)。
+    workers=None 取 CPU 核数；workers=1 时在当前进程内顺序执行；force=True 时忽略已有结果。返回格点数。
+    """
+    axes = {k: np.asarray((axes or DEFAULT_AXES)[k]) for k in DESIGN_AXES + STRESS_AXES}
+    n_cells = int(np.prod([len(v) for v in axes.values()]))
+    meta = {"axes": {k: v.tolist() for k, v in axes.items()}, "base": base or {}, "s_crit": s_crit,
+            "code_version": code_version(evaluate_cells)}
+    if not force and os.path.exists(path) and os.path.exists(path + ".json"):
+        with open(path + ".json") as f:
+            if json.load(f) == json.loads(json.dumps(meta)):
+                return n_cells
+    if os.path.exists(path + ".json"):
+        os.remove(path + ".json")      # 元数据最后写入: 中断的扫描不会被当作已完成
+    np.lib.format.open_memmap(path, mode='w+', dtype=RECORD_DTYPE, shape=(n_cells,)).flush()
+
+    tasks = [(path, axes, base, s_crit, s, min(s + chunk_cells, n_cells)) for s in range(0, n_cells, chunk_cells)]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        done = sum(map(_sweep_block, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            done = sum(pool.map(_sweep_block, tasks))
+    with open(path + ".json", "w") as f:
+        json.dump(meta, f)
+    return done
+
+def load_sweep(path):
+    """(只读内存映射的结果数组, 元数据 dict)"""
+    with open(path + ".json") as f:
+        meta = json.load(f)
+    meta["axes"] = {k: np.asarray(v) for k, v in meta["axes"].items()}
+    return np.load(path, mmap_mode='r'), meta
+
+def summarize_designs(path, chunk_cells=CHUNK_CELLS):
+    """
+    按设计汇总最坏压力情形 (逐块读盘): 最坏 min S、最长低于红线天数、
+    观察期内恢复者的最长恢复时间、观察期末仍未恢复的压力组合占比、是否安全、成本。
+    返回每个设计一行的 DataFrame。
+    """
+    records, meta = load_sweep(path)
+    axes = meta["axes"]
+    n_stress = int(np.prod([len(axes[k]) for k in STRESS_AXES]))
+    n_designs = len(records) // n_stress
+    step = max(1, chunk_cells // n_stress)
+
+    worst = np.empty(n_designs)
+    below = np.empty(n_designs)
+    recovery = np.empty(n_designs)
+    unrecovered = np.empty(n_designs)
+    for d in range(0, n_designs, step):
+        e = min(d + step, n_designs)
+        block = np.asarray(records[d * n_stress:e * n_stress]).reshape(e - d, n_stress)
+        worst[d:e] = block["min_stock"].min(axis=1)
+        below[d:e] = block["time_below"].max(axis=1)
+        finite = np.isfinite(block["recovery_time"])
+        recovery[d:e] = np.where(finite, block["recovery_time"], 0.0).max(axis=1)
+        unrecovered[d:e] = 1 - finite.mean(axis=1)
+
+    design = grid_cells({k: axes[k] for k in DESIGN_AXES}, 0, n_designs)
+    summary = pd.DataFrame({
+        "Pads": design["n_pads"],
+        "Cap per Pad (MT/day)": design["cap_per_pad"],
+        "Initial Reserve (MT)": design["s_initial"],
+        "Worst Min Stock (MT)": worst,
+        "Max Days Below S_crit": below,
+        "Max Recovery (days)": recovery,
+        "Unrecovered Share": unrecovered,
+    })
+    summary["Safe"] = worst >= meta["s_crit"]
+    summary["Cost (Billion USD)"] = config_cost(design["n_pads"], design["cap_per_pad"], design["s_initial"]) / 1e9
+    return summary
+
+def cheapest_safe(summary, top=10):
+    """全部压力组合下都不跌破红线的设计，按成本排序"""
+    return summary[summary["Safe"]].sort_values("Cost (Billion USD)").head(top).reset_index(drop=True)
+
+# ==========================================
+# 3. 热力图 (Survival Heatmaps)
+# ==========================================
+def plot_heatmaps(summary, s_initial=100_000, filename='resilience_sweep_heatmaps.png'):
+    """固定初始储备 (取最接近的网格值)，在 场站数 x 单站运力 平面上画最坏情形指标"""
+    reserves = summary["Initial Reserve (MT)"].unique()
+    s_initial = reserves[np.abs(reserves - s_initial).argmin()]
+    panel = summary[summary["Initial Reserve (MT)"] == s_initial]
+    pads = np.sort(panel["Pads"].unique())
+    caps = np.sort(panel["Cap per Pad (MT/day)"].unique())
+    extent = [pads[0] - 0.5, pads[-1] + 0.5, caps[0], caps[-1]]
+
+    metrics = [("Worst Min Stock (MT)", 'RdYlGn'), ("Max Days Below S_crit", 'Reds'), ("Max Recovery (days)", 'Purples'),
+               ("Unrecovered Share", 'Greys')]
+    fig, axes = plt.subplots(1, 4, figsize=(24, 6), dpi=150)
+    for ax, (col, cmap) in zip(axes, metrics):
+        z = panel.pivot(index="Cap per Pad (MT/day)", columns="Pads", values=col).loc[caps, pads].to_numpy()
+        im = ax.imshow(z, origin='lower', aspect='auto', extent=extent, cmap=cmap)
+        ax.contour(pads, caps, panel.pivot(index="Cap per Pad (MT/day)", columns="Pads", values="Safe")
+                   .loc[caps, pads].to_numpy().astype(float), levels=[0.5], colors='black', linewidths=2)
+        fig.colorbar(im, ax=ax)
+        ax.set_title(col, fontsize=13, fontweight='bold')
+        ax.set_xlabel('Number of Surge Pads')
+        ax.set_ylabel('Surge Capacity per Pad (MT/day)')
+    fig.suptitle(f'Resilience Design Space (Initial Reserve {s_initial:,} MT, worst case over delays & failure time; '
+                 f'black line = survival boundary)', fontsize=13)
+    plt.tight_layout()
+    plt.savefig(filename)
+    plt.close()
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    n = run_sweep('resilience_sweep.npy')
+    print(f"{n} grid cells evaluated in {time.perf_counter() - start:.1f}s")
+
+    summary = summarize_designs('resilience_sweep.npy')
+    print(cheapest_safe(summary).to_string(index=False))
+    plot_heatmaps(summary)
+
+    # final_.plot_resilience_test: 10 vs 25 基地
+    run_sweep('resilience_final_sites.npy', FINAL_AXES, FINAL_BASE, workers=1)
+    sites = summarize_designs('resilience_final_sites.npy').set_index("Pads")
+    for k in (10, 25):
+        print(f"{k} sites: worst min stock {sites.loc[k, 'Worst Min Stock (MT)']:.0f} MT, "
+              f"days below S_crit {sites.loc[k, 'Max Days Below S_crit']:.1f}")
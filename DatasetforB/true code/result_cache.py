@@ -0,0 +1,230 @@
+import ast
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+
+import numpy as np
+import pandas as pd
+
+import batch_engine
+
+# ==========================================
+# 1. 内容寻址的结果缓存 (Content-Addressed Result Cache)
+# ==========================================
+# 每次调用的键 = SHA-256(函数名, 代码版本, 规范化后的参数)；
+#   代码版本   函数所在模块及其 (递归，含函数内延迟导入) 导入的本目录模块 (batch_engine / model_curves /
+#              wright_law 等) 源文件内容的哈希，改动任何一处计算代码都会自动换键，旧结果不再命中；
+#              文件哈希按 (路径, 修改时间, 大小) 记忆，会话中途改了源文件也会重新计算
+#   参数       numpy 数组按 dtype / 形状 / 原始字节，dict 按键排序，标量按 repr，列表逐项递归
+# 结果用 pickle 存为 CACHE_DIR/<键前两位>/<键>.pkl (先写临时文件再原子替换)；读取失败的条目删除后按未命中处理。
+# 命中时刷新文件修改时间；每个缓存目录的总大小首次使用时扫描一次，之后随写入累加，
+# 超过 MAX_BYTES 时才遍历目录，按修改时间从旧到新淘汰 (LRU)。
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get("ENGINE_CACHE_DIR", os.path.join(MODULE_DIR, ".engine_cache"))
+MAX_BYTES = 512 * 2 ** 20
+
+_dir_bytes = {}   # 缓存目录 -> 估计总字节数 (其他进程的写入不计入，淘汰时按实际扫描校正)
+
+@functools.lru_cache(maxsize=None)
+def _file_hash(path, mtime_ns, size):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def _source_hash(path):
+    st = os.stat(path)
+    return _file_hash(path, st.st_mtime_ns, st.st_size)
+
+@functools.lru_cache(maxsize=None)
+def _file_imports(path, mtime_ns, size):
+    """源文件中 import / from ... import 的本目录模块 (含函数内的延迟导入)"""
+    with open(path, "rb") as f:
+        tree = ast.parse(f.read())
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module)
+    paths = (os.path.join(MODULE_DIR, name.split(".")[0] + ".py") for name in names)
+    return tuple(p for p in paths if os.path.exists(p))
+
+def _local_sources(path):
+    """源文件本身及其 (递归) 导入的本目录模块的源文件"""
+    seen, stack = set(), [os.path.abspath(path)]
+    while stack:
+        path = stack.pop()
+        if path not in seen:
+            seen.add(path)
+            st = os.stat(path)
+            stack.extend(_file_imports(path, st.st_mtime_ns, st.st_size))
+    return seen
+
+def code_version(func, deps=()):
+    """函数所在模块、其导入的本目录模块与 deps 源文件的联合哈希"""
+    paths = _local_sources(inspect.getsourcefile(sys.modules[func.__module__]))
+    for module in deps:
+        paths |= _local_sources(inspect.getsourcefile(module))
+    return hashlib.sha256("".join(_source_hash(p) for p in sorted(paths)).encode()).hexdigest()
+
+def _digest(obj, h):
+    if isinstance(obj, (np.ndarray, np.generic)):
+        arr = np.ascontiguousarray(obj)
+        h.update(f"nd:{arr.dtype.str}:{arr.shape}:".encode())
+        h.update(arr.tobytes())
+    elif isinstance(obj, pd.DataFrame):
+        _digest(list(obj.columns), h)
+        _digest(obj.to_numpy(), h)
+    elif isinstance(obj, dict):
+        h.update(b"dict:")
+        for k in sorted(obj, key=repr):
+            _digest(k, h)
+            _digest(obj[k], h)
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"{type(obj).__name__}:{len(obj)}:".encode())
+        for item in obj:
+            _digest(item, h)
+    elif obj is None or isinstance(obj, (bool, int, float, str)):
+        h.update(f"{type(obj).__name__}:{obj!r};".encode())
+    else:
+        raise TypeError(f"Cannot hash argument of type {type(obj).__name__} for the result cache")
+
+def cache_key(func, args, kwargs, deps=()):
+    h = hashlib.sha256(f"{func.__module__}.{func.__qualname__}:{code_version(func, deps)}".encode())
+    bound = inspect.signature(func).bind(*args, **kwargs)
+    bound.apply_defaults()
+    _digest(dict(bound.arguments), h)
+    return h.hexdigest()
+
+def _path(key, cache_dir):
+    return os.path.join(cache_dir, key[:2], key + ".pkl")
+
+def _entries(cache_dir):
+    """[(修改时间, 大小, 路径)]"""
+    out = []
+    for root, _, files in os.walk(cache_dir):
+        for name in files:
+            if name.endswith(".pkl"):
+                path = os.path.join(root, name)
+                st = os.stat(path)
+                out.append((st.st_mtime_ns, st.st_size, path))
+    return out
+
+def _dir_total(cache_dir):
+    """缓存目录的估计总字节数，首次调用时扫描一次"""
+    root = os.path.abspath(cache_dir)
+    if root not in _dir_bytes:
+        _dir_bytes[root] = sum(size for _, size, _ in _entries(root))
+    return _dir_bytes[root]
+
+def _discard(path, cache_dir):
+    """删除一个条目并从估计总量中扣除"""
+    try:
+        size = os.path.getsize(path)
+        os.remove(path)
+    except OSError:
+        return
+    root = os.path.abspath(cache_dir)
+    if root in _dir_bytes:
+        _dir_bytes[root] = max(0, _dir_bytes[root] - size)
+
+def evict(cache_dir=None, max_bytes=None):
+    """淘汰最久未使用的条目直到总大小不超过 max_bytes，返回淘汰个数 (None 时取调用时的 CACHE_DIR / MAX_BYTES)"""
+    cache_dir, max_bytes = cache_dir or CACHE_DIR, max_bytes or MAX_BYTES
+    entries = sorted(_entries(cache_dir))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass   # 其他进程已淘汰
+        total -= size
+        removed += 1
+    _dir_bytes[os.path.abspath(cache_dir)] = total
+    return removed
+
+def cached(func=None, *, deps=(), cache_dir=None, max_bytes=None):
+    """
+    装饰器: 结果按 cache_key 存盘，重复调用直接读取。
+    被装饰函数多出 .cache_key(*args, **kwargs) 与 .stats (hits / misses)。
+    deps 为代码版本额外包含的模块 (源码中没有 import 语句可循的依赖)；
+    cache_dir / max_bytes 为 None 时在调用时读取模块常量 CACHE_DIR / MAX_BYTES。
+    """
+    if func is None:
+        return functools.partial(cached, deps=deps, cache_dir=cache_dir, max_bytes=max_bytes)
+
+    stats = {"hits": 0, "misses": 0}
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        root = cache_dir or CACHE_DIR
+        key = cache_key(func, args, kwargs, deps)
+        path = _path(key, root)
+        try:
+            with open(path, "rb") as f:
+                result = pickle.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception:
+            # 截断、损坏或引用了已改名的类/模块的条目: 删除后重新计算
+            _discard(path, root)
+        else:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            stats["hits"] += 1
+            return result
+
+        result = func(*args, **kwargs)
+        stats["misses"] += 1
+        total = _dir_total(root)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        _dir_bytes[os.path.abspath(root)] = total + os.path.getsize(path)
+        if _dir_bytes[os.path.abspath(root)] > (max_bytes or MAX_BYTES):
+            evict(root, max_bytes)
+        return result
+
+    wrapper.cache_key = lambda *args, **kwargs: cache_key(func, args, kwargs, deps)
+    wrapper.stats = stats
+    return wrapper
+
+def cache_info(cache_dir=None):
+    """扫描缓存目录 (None 时取调用时的 CACHE_DIR)，返回 dict: entries / bytes，并校正估计总量"""
+    cache_dir = cache_dir or CACHE_DIR
+    entries = _entries(cache_dir)
+    total = sum(size for _, size, _ in entries)
+    _dir_bytes[os.path.abspath(cache_dir)] = total
+    return {"entries": len(entries), "bytes": total}
+
+def clear_cache(cache_dir=None):
+    cache_dir = cache_dir or CACHE_DIR
+    for _, _, path in _entries(cache_dir):
+        os.remove(path)
+    _dir_bytes[os.path.abspath(cache_dir)] = 0
+
+# ==========================================
+# 2. 缓存版引擎入口 (Cached Engine Entry Points)
+# ==========================================
+simulate_sweep = cached(batch_engine.simulate_sweep)
+results_table = cached(batch_engine.results_table)
+
+if __name__ == "__main__":
+    import time
+
+    durations = np.arange(20 * 12, 200 * 12 + 1) / 12
+    params = batch_engine.make_param_sets(LEARNING_RATE=np.linspace(0.80, 0.90, 300))
+    for label in ("cold", "warm"):
+        start = time.perf_counter()
+        simulate_sweep(durations, params)
+        print(f"{label}: {1e3 * (time.perf_counter() - start):.1f} ms")
+    print(f"stats {simulate_sweep.stats}, cache {cache_info()}")
@@ -1,56 +1,170 @@
 import numpy as np
 import matplotlib.pyplot as plt
-def get_alpha(t):
-    t_diff = t - 2050
-    # 简化版衰减公式
-    downtime = (0.833 * 1.015**t_diff) * (14 * 0.995**t_diff) + 18.25
-    return max(0, 1 - downtime/365)
+
+from model_curves import alpha_at, beta_at, get_alpha
+from streaming_stats import CompletionAccumulator
+
 # 蒙特卡洛参数
 N_SIMS = 1000
 TARGET = 1e8
 START_YR = 2050
+MAX_YEARS = 150         # 超过 150 年视为未完成 (记为 151)
+
+KE_NOMINAL = 537_000
+LAUNCHES_PER_SITE = 400
+PAYLOAD = 150
+WEATHER_MEAN, WEATHER_STD = 0.16, 0.05
+ALPHA_STD = 0.05
 
-def run_mc(n_sites):
+# 向量化模式的分块大小: 每块路径数 x 每次推进的年数
+CHUNK_PATHS = 100_000
+YEAR_BLOCK = 16
+
+# 方案比较: 每个方案运行到 P(完工 <= 60 年) 的 95% 置信区间半宽不超过该值
+CI_HALFWIDTH = 0.005
+# 方案差值: 共用随机数 (CRN) 估计的模型评估次数 (两个方案合计)
+DELTA_PATHS = 100_000
+
+def run_mc_scalar(n_sites, n_sims=N_SIMS, rng=None):
+    """逐条路径模拟 (参考实现)"""
+    rng = np.random.default_rng(rng)
     results = []
-    for _ in range(N_SIMS):
+    for _ in range(n_sims):
         rem = TARGET
         yr = 0
         while rem > 0:
             # 随机天气 (均值 0.16, 波动 0.05)
-            weather = max(0, np.random.normal(0.16, 0.05))
+            weather = max(0, rng.normal(WEATHER_MEAN, WEATHER_STD))
             # 随机电梯 (均值 alpha, 波动 0.05)
             alpha_base = get_alpha(START_YR + yr)
-            alpha = max(0, np.random.normal(alpha_base, 0.05))
-            
+            alpha = max(0, rng.normal(alpha_base, ALPHA_STD))
+
             # 计算运力
-            cap_e = 537_000 * alpha
+            cap_e = KE_NOMINAL * alpha
             # 火箭能力: 400次/年 * (1-天气) * 150吨 * 基地数
-            cap_r = 400 * (1 - weather) * 150 * n_sites
-            
+            cap_r = LAUNCHES_PER_SITE * (1 - weather) * PAYLOAD * n_sites
+
             # 假设全力运输
             rem -= (cap_e + cap_r)
             yr += 1
-            if yr > 150: break
+            if yr > MAX_YEARS: break
         results.append(yr)
-    return results
-
-# 运行模拟
-res_10 = run_mc(10)
-res_25 = run_mc(25)
-
-# 绘图
-plt.figure(figsize=(10, 6))
-plt.hist(res_10, bins=30, alpha=0.6, color='r', density=True, label='10 Sites (Baseline)')
-plt.hist(res_25, bins=30, alpha=0.6, color='g', density=True, label='25 Sites (Optimized)')
-
-# 标注均值
-plt.axvline(np.mean(res_10), color='darkred', linestyle='--', label=f'Mean: {np.mean(res_10):.1f} Yrs')
-plt.axvline(np.mean(res_25), color='darkgreen', linestyle='--', label=f'Mean: {np.mean(res_25):.1f} Yrs')
-plt.axvline(60, color='k', linewidth=2, label='Target (60 Yrs)')
-
-plt.xlabel('Completion Time (Years)')
-plt.ylabel('Probability Density')
-plt.title('Risk Analysis & Infrastructure Optimization')
-plt.legend()
-plt.savefig('risk_optimization.png', dpi=300)
-plt.show()
\ No newline at end of file
+    return np.array(results)
+
+def sample_capacity(rng, n_paths, year0, n_years, n_sites):
+    """一块 (路径 x 年) 的随机年运力: 天气与电梯扰动整块抽样"""
+    weather = np.maximum(0, rng.normal(WEATHER_MEAN, WEATHER_STD, (n_paths, n_years)))
+    alpha_base = alpha_at(np.arange(year0, year0 + n_years))
+    alpha = np.maximum(0, alpha_base + ALPHA_STD * rng.standard_normal((n_paths, n_years)))
+    return KE_NOMINAL * alpha + LAUNCHES_PER_SITE * PAYLOAD * n_sites * (1 - weather)
+
+def sample_capacity_logistic(rng, n_paths, year0, n_years, n_sites):
+    """同上，但火箭频次取 S 型增长的 beta(t) (simulation4others 的模型)"""
+    weather = np.maximum(0, rng.normal(WEATHER_MEAN, WEATHER_STD, (n_paths, n_years)))
+    years = np.arange(year0, year0 + n_years)
+    alpha = np.maximum(0, alpha_at(years) + ALPHA_STD * rng.standard_normal((n_paths, n_years)))
+    return KE_NOMINAL * alpha + beta_at(years) * PAYLOAD * n_sites * (1 - weather)
+
+def completion_years(rng, n_paths, n_sites, capacity_fn=sample_capacity):
+    """
+    所有路径同时推进: 每次抽一个年份块，累计运力用 cumsum，
+    首次达到 TARGET 的年份用 argmax 定位；已完成的路径从下一块中剔除。
+    """
+    years = np.full(n_paths, MAX_YEARS + 1)
+    delivered = np.zeros(n_paths)
+    active = np.arange(n_paths)
+    year0 = 0
+    while len(active) and year0 <= MAX_YEARS:
+        n_years = min(YEAR_BLOCK, MAX_YEARS + 1 - year0)
+        cum = delivered[active, None] + np.cumsum(capacity_fn(rng, len(active), year0, n_years, n_sites), axis=1)
+        done = cum >= TARGET
+        finished = done.any(axis=1)
+        years[active[finished]] = year0 + done[finished].argmax(axis=1) + 1
+        delivered[active] = cum[:, -1]
+        active = active[~finished]
+        year0 += n_years
+    return years
+
+def run_mc_vectorized(n_sites, n_sims=N_SIMS, rng=None):
+    """数组并行蒙特卡洛: 按 CHUNK_PATHS 分块控制内存"""
+    rng = np.random.default_rng(rng)
+    chunks = [completion_years(rng, min(CHUNK_PATHS, n_sims - s), n_sites) for s in range(0, n_sims, CHUNK_PATHS)]
+    return np.concatenate(chunks)
+
+def run_mc_stream(n_sites, n_sims=N_SIMS, rng=None, acc=None, capacity_fn=sample_capacity):
+    """
+    流式模式: 每完成一块路径就喂入累加器，不保留逐路径结果，内存为 O(分箱数 + CHUNK_PATHS)。
+    返回 CompletionAccumulator。
+    """
+    rng = np.random.default_rng(rng)
+    acc = CompletionAccumulator(MAX_YEARS + 1) if acc is None else acc
+    for s in range(0, n_sims, CHUNK_PATHS):
+        acc.update(completion_years(rng, min(CHUNK_PATHS, n_sims - s), n_sites, capacity_fn))
+    return acc
+
+def run_mc(n_sites, n_sims=N_SIMS, vectorized=True, seed=None, workers=None, capacity_fn=sample_capacity):
+    """
+    返回完工年数的 CompletionAccumulator。
+    vectorized=True 时交给 mc_runner.run_parallel 分片多进程运行 (workers=None 取 CPU 核数，
+    seed 相同则结果与 workers 无关)；vectorized=False 时逐条路径运行参考实现。
+    """
+    if not vectorized:
+        return CompletionAccumulator(MAX_YEARS + 1).update(run_mc_scalar(n_sites, n_sims, seed))
+    from mc_runner import run_parallel  # mc_runner 依赖本模块的模型函数，延迟导入避免循环
+    return run_parallel(n_sites, n_sims, seed=seed, workers=workers, capacity_fn=capacity_fn)
+
+def compare_strategies(sites=(10, 25), target_halfwidth=CI_HALFWIDTH, threshold=60, workers=None):
+    """
+    10 基地 vs 25 基地: 每个方案由 adaptive_mc 分批运行到目标精度，不再使用固定的 N_SIMS。
+    返回 {基地数: run_until_precision 的结果 dict (estimate / ci / n_paths / acc ...)}
+    """
+    from adaptive_mc import compare_sites
+    return compare_sites(target_halfwidth, 'p_on_time', sites, threshold=threshold, workers=workers)
+
+def strategy_delta(sites=(10, 25), quantity='mean', threshold=60, n_paths=DELTA_PATHS, method='crn'):
+    """
+    方案差值 E[q(sites[0])] - E[q(sites[1])]: 两个方案由同一组随机数驱动 (variance_reduction 的 CRN 估计)，
+    比各自独立抽样后相减的方差更小。返回 dict: estimate / stderr / n_evals
+    """
+    from variance_reduction import estimate_delta
+    return estimate_delta(method, n_paths, sites, quantity, threshold)
+
+def histogram_data(results, bins=30):
+    """风险图所用的直方图 (概率密度, 分箱边界)；results 可为完工年数数组或 CompletionAccumulator"""
+    if isinstance(results, CompletionAccumulator):
+        return results.histogram(bins)
+    return np.histogram(results, bins=bins, density=True)
+
+def mean_years(results):
+    return results.mean() if isinstance(results, CompletionAccumulator) else np.mean(results)
+
+def plot_risk(res_10, res_25, filename='risk_optimization.png'):
+    plt.figure(figsize=(10, 6))
+    for res, color, label in ((res_10, 'r', '10 Sites (Baseline)'), (res_25, 'g', '25 Sites (Optimized)')):
+        density, edges = histogram_data(res)
+        plt.stairs(density, edges, fill=True, alpha=0.6, color=color, label=label)
+
+    # 标注均值
+    plt.axvline(mean_years(res_10), color='darkred', linestyle='--', label=f'Mean: {mean_years(res_10):.1f} Yrs')
+    plt.axvline(mean_years(res_25), color='darkgreen', linestyle='--', label=f'Mean: {mean_years(res_25):.1f} Yrs')
+    plt.axvline(60, color='k', linewidth=2, label='Target (60 Yrs)')
+
+    plt.xlabel('Completion Time (Years)')
+    plt.ylabel('Probability Density')
+    plt.title('Risk Analysis & Infrastructure Optimization')
+    plt.legend()
+    plt.savefig(filename, dpi=300)
+    plt.show()
+
+if __name__ == "__main__":
+    from adaptive_mc import print_report
+
+    # 运行模拟 (各方案运行到 CI 半宽达标)
+    results = compare_strategies()
+    print_report(results)
+    delta = strategy_delta()
+    print(f"\nMean completion delta (10 - 25 Sites, CRN): {delta['estimate']:.3f} "
+          f"+/- {1.96 * delta['stderr']:.3f} Yrs ({delta['n_evals']} evals)")
+
+    # 绘图
+    plot_risk(results[10]["acc"], results[25]["acc"])
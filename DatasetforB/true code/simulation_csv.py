@@ -1,6 +1,12 @@
+import os
+
 import numpy as np
 import pandas as pd
 
+from result_cache import results_table, simulate_sweep
+from model_curves import get_alpha  # 电梯效率衰减 (缓存表)
+from wright_law import rocket_cost_batch
+
 # ==========================================
 # 1. 最终校准参数 (Calibrated Parameters)
 # ==========================================
@@ -29,30 +35,17 @@ CARBON_TAX = 150
 # ==========================================
 # 2. 核心计算逻辑
 # ==========================================
-def get_alpha(t):
-    """电梯效率衰减"""
-    t_diff = t - 2050
-    lambda_t = 0.833 * (1 + 0.015)**t_diff
-    repair_t = 14 * (1 - 0.005)**t_diff
-    downtime = lambda_t * repair_t + (365 * 0.05)
-    return max(0, 1 - (downtime / 365))
-
 def calculate_rocket_cost_batch(n_start, n_new):
-    """火箭批次成本计算"""
-    if n_new <= 0: return 0
-    # 使用中点近似法积分
-    n_mid = n_start + (n_new / 2)
-    # 防止 n_mid < 1 导致计算错误
-    if n_mid < 1: n_mid = 1
-    
-    unit_cost = max(COST_R_FLOOR_LAUNCH, COST_R_INIT_LAUNCH * (n_mid ** B_EXPONENT))
-    return n_new * unit_cost
+    """火箭批次成本计算 (莱特定律精确积分，含底线交点)"""
+    return rocket_cost_batch(n_start, n_new, COST_R_INIT_LAUNCH, COST_R_FLOOR_LAUNCH, LEARNING_RATE)
 
 # ==========================================
 # 3. 运行验证
 # ==========================================
-def verify_results():
-    durations = [20, 30, 40, 50, 60, 70, 80, 100]
+DURATIONS = [20, 30, 40, 50, 60, 70, 80, 100]
+
+def verify_results_reference(durations=DURATIONS):
+    """逐年标量循环 (参考实现)，用于核对 batch_engine 的向量化结果"""
     results = []
 
     print(f"{'Duration':<10} | {'Fin Cost($T)':<15} | {'Green Cost($T)':<15} | {'Rocket Share(%)':<15}")
@@ -105,10 +98,34 @@ def verify_results():
             "Rocket Share (%)": round(share, 1)
         })
 
-    # 保存 CSV
-    df = pd.DataFrame(results)
-    df.to_csv('simulation_results_final.csv', index=False)
-    print("\n[Success] Verified data saved to 'simulation_results_final.csv'")
+    return pd.DataFrame(results)
+
+def dashboard_table(durations=DURATIONS):
+    """results_table 加上碳税列 (十亿美元)，供 visual csv.py 与 beautify 的仪表盘使用 (均经结果缓存)"""
+    df = results_table(durations)
+    df["Carbon Tax ($B)"] = np.round(simulate_sweep(durations)["env_cost"][0] / 1e9, 1)
+    return df
+
+def verify_results(path='simulation_results_final.csv'):
+    """使用向量化引擎 (经结果缓存) 一次性计算全部工期；CSV 内容有变化时才重写"""
+    df = results_table(DURATIONS)
+
+    print(f"{'Duration':<10} | {'Fin Cost($T)':<15} | {'Green Cost($T)':<15} | {'Rocket Share(%)':<15}")
+    print("-" * 65)
+    for _, row in df.iterrows():
+        print(f"{int(row['Duration']):<10} | {row['Financial Cost ($T)']:<15.2f} | {row['Green Cost ($T)']:<15.2f} | {row['Rocket Share (%)']:<15.1f}")
+
+    # 保存 CSV (内容不变时保留原文件)
+    text = df.to_csv(index=False)
+    if os.path.exists(path):
+        with open(path) as f:
+            if f.read() == text:
+                print(f"\n[Unchanged] '{path}' already up to date")
+                return df
+    with open(path, 'w') as f:
+        f.write(text)
+    print(f"\n[Success] Verified data saved to '{path}'")
+    return df
 
 if __name__ == "__main__":
     verify_results()
\ No newline at end of file
@@ -0,0 +1,197 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from scipy.stats import qmc
+
+from batch_engine import make_param_sets, param_index, simulate_sweep
+from cost_adjoint import cost_gradients
+from result_cache import cached
+
+# ==========================================
+# 1. 参数空间 (Parameter Box)
+# ==========================================
+# simulation_csv.py 的校准常数与 get_alpha 的碎片系数，在校准值附近取均匀分布的区间
+SOBOL_RANGES = {
+    "KE_NOMINAL": (400_000, 700_000),
+    "COST_E_PER_MT": (150_000, 300_000),
+    "COST_R_INIT_LAUNCH": (250_000_000, 500_000_000),
+    "COST_R_FLOOR_LAUNCH": (5_000_000, 20_000_000),
+    "LEARNING_RATE": (0.80, 0.90),
+    "INFRASTRUCTURE_COST": (50_000_000_000, 100_000_000_000),
+    "EMISSION_FACTOR": (1.5, 3.5),
+    "CARBON_TAX": (50, 300),
+    "DEBRIS_LAMBDA0": (0.5, 1.2),
+    "DEBRIS_GROWTH": (0.005, 0.03),
+    "REPAIR_DAYS0": (7, 21),
+    "REPAIR_IMPROVE": (0.0, 0.01),
+    "MAINTENANCE_FRAC": (0.03, 0.08),
+}
+OUTPUTS = ("green", "rocket_share", "optimal_T")
+REFERENCE_DURATION = 60                 # green / rocket_share 取该工期下的值
+DURATION_GRID = np.arange(20, 121)      # 最优工期 = 该网格上绿色成本的 argmin
+CHUNK_ROWS = 20_000                     # 每个进程任务的参数组数
+N_BOOT = 100                            # 指数置信区间的自助重抽样次数
+
+# ==========================================
+# 2. 设计矩阵 (Saltelli Design)
+# ==========================================
+# 基础矩阵 A、B (N x d) 取自同一个 2d 维的加扰 Sobol 序列 (或拉丁超立方)，
+# AB_i = A 的第 i 列换成 B 的第 i 列。共 N x (d + 2) 次模型求值，行顺序为 [A, B, AB_1, ..., AB_d]。
+
+def saltelli_design(n, names=tuple(SOBOL_RANGES), design='sobol', seed=2050):
+    """返回 (参数矩阵 (N(d+2), K), d)。n 在 design='sobol' 时取 2 的幂"""
+    d = len(names)
+    if design == 'sobol':
+        base = qmc.Sobol(d=2 * d, scramble=True, seed=seed).random(n)
+    elif design == 'lhs':
+        base = qmc.LatinHypercube(d=2 * d, seed=seed).random(n)
+    else:
+        raise ValueError(f"Unknown design: {design}")
+    lo, hi = np.array([SOBOL_RANGES[k] for k in names], dtype=float).T
+    a, b = qmc.scale(base[:, :d], lo, hi), qmc.scale(base[:, d:], lo, hi)
+    blocks = [a, b]
+    for i in range(d):
+        ab = a.copy()
+        ab[:, i] = b[:, i]
+        blocks.append(ab)
+    unit = np.concatenate(blocks)
+
+    params = make_param_sets(len(unit))
+    for j, name in enumerate(names):
+        params[:, param_index(name)] = unit[:, j]
+    return params, d
+
+# ==========================================
+# 3. 并行求值 (Parallel Evaluation)
+# ==========================================
+# 每个参数组一次 simulate_sweep 扫描整个工期网格，同时得到参考工期下的指标与最优工期。
+# 参数矩阵按 CHUNK_ROWS 切块分给进程池，结果按块序号拼接，与 workers 取值无关。
+
+def evaluate(params, durations=DURATION_GRID, reference=REFERENCE_DURATION):
+    """(P, 3) 输出矩阵，列顺序同 OUTPUTS"""
+    res = simulate_sweep(durations, params)
+    j = int(np.searchsorted(durations, reference))
+    return np.column_stack([res["green"][:, j], res["rocket_share"][:, j],
+                            durations[res["green"].argmin(axis=1)]])
+
+def _evaluate_block(task):
+    params, durations, reference = task
+    return evaluate(params, durations, reference)
+
+def evaluate_parallel(params, workers=None, chunk_rows=CHUNK_ROWS, durations=DURATION_GRID,
+                      reference=REFERENCE_DURATION):
+    """workers=None 取 CPU 核数；workers=1 时在当前进程内顺序执行"""
+    tasks = [(params[s:s + chunk_rows], durations, reference) for s in range(0, len(params), chunk_rows)]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        return np.concatenate(list(map(_evaluate_block, tasks)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return np.concatenate(list(pool.map(_evaluate_block, tasks)))
+
+# ==========================================
+# 4. Sobol 指数 (Saltelli 2010 / Jansen Estimators)
+# ==========================================
+#   一阶  S_i  = mean(f_B (f_ABi - f_A)) / V
+#   总效应 ST_i = mean((f_A - f_ABi)^2) / (2V)
+# V 为 [f_A, f_B] 的方差；置信区间对基础样本行做自助重抽样。
+
+def _indices(fa, fb, fab):
+    var = np.var(np.concatenate([fa, fb], axis=-1), axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        first = np.mean(fb * (fab - fa), axis=-1) / var
+        total = 0.5 * np.mean((fa - fab) ** 2, axis=-1) / var
+    return first, total
+
+def sobol_indices(y, n, d, n_boot=N_BOOT, seed=2050):
+    """
+    y 为 saltelli_design 行顺序的 (N(d+2), M) 输出。
+    返回 dict: 输出列号 -> {'S1', 'ST', 'S1_conf', 'ST_conf'}，每个为 (d,) 数组 (conf 为 95% 半宽)
+    """
+    rng = np.random.default_rng(seed)
+    boot = rng.integers(0, n, (n_boot, n))
+    out = {}
+    for m in range(y.shape[1]):
+        f = y[:, m].reshape(d + 2, n)
+        fa, fb, fab = f[0], f[1], f[2:]
+        s1, st = _indices(fa, fb, fab)
+        s1_conf, st_conf = np.empty(d), np.empty(d)
+        for i in range(d):
+            b1, bt = _indices(fa[boot], fb[boot], fab[i][boot])
+            s1_conf[i], st_conf[i] = 1.96 * np.std(b1), 1.96 * np.std(bt)
+        out[m] = {"S1": s1, "ST": st, "S1_conf": s1_conf, "ST_conf": st_conf}
+    return out
+
+@cached
+def sensitivity_study(n=2 ** 16, names=tuple(SOBOL_RANGES), design='sobol', workers=None, seed=2050):
+    """完整流程，返回每个输出一张 DataFrame (行为参数，列为 S1 / S1_conf / ST / ST_conf)"""
+    params, d = saltelli_design(n, names, design, seed)
+    y = evaluate_parallel(params, workers)
+    indices = sobol_indices(y, n, d, seed=seed)
+    return {name: pd.DataFrame(indices[m], index=list(names))[["S1", "S1_conf", "ST", "ST_conf"]]
+            for m, name in enumerate(OUTPUTS)}
+
+# ==========================================
+# 5. 导数筛选 (Derivative-Based Screening, DGSM)
+# ==========================================
+# 伴随梯度一次给出绿色成本对全部参数的偏导，nu_i = E[(dG/dx_i)^2]。
+# 对均匀分布的参数，总效应指数有上界 ST_i <= (b_i - a_i)^2 nu_i / (pi^2 V)，
+# 上界很小的参数可以在 Saltelli 设计中固定，减少 (d + 2) 倍的求值次数。
+
+@cached
+def derivative_screening(n=4096, names=tuple(SOBOL_RANGES), duration=REFERENCE_DURATION, seed=2050):
+    """返回 DataFrame (行为参数): nu / ST_bound / mean_elasticity"""
+    lo, hi = np.array([SOBOL_RANGES[k] for k in names], dtype=float).T
+    unit = qmc.scale(qmc.Sobol(d=len(names), scramble=True, seed=seed).random(n), lo, hi)
+    params = make_param_sets(n)
+    cols = [param_index(name) for name in names]
+    params[:, cols] = unit
+    res = cost_gradients([duration], params)
+    green, grad = res["green"][:, 0], res["d_green"][:, 0, cols]
+    nu = np.mean(grad ** 2, axis=0)
+    return pd.DataFrame({
+        "nu": nu,
+        "ST_bound": (hi - lo) ** 2 * nu / (np.pi ** 2 * np.var(green)),
+        "mean_elasticity": np.mean(grad * unit / green[:, None], axis=0),
+    }, index=list(names))
+
+def plot_sobol(tables, filename='sobol_sensitivity.png'):
+    fig, axes = plt.subplots(1, len(tables), figsize=(6 * len(tables), 6), sharey=True)
+    titles = {"green": f"Green Cost (T={REFERENCE_DURATION})", "rocket_share": f"Rocket Share (T={REFERENCE_DURATION})",
+              "optimal_T": "Optimal Duration"}
+    for ax, (name, df) in zip(np.atleast_1d(axes), tables.items()):
+        y = np.arange(len(df))
+        ax.barh(y - 0.2, df["S1"], 0.4, xerr=df["S1_conf"], color='#2878B5', label='First-order $S_i$')
+        ax.barh(y + 0.2, df["ST"], 0.4, xerr=df["ST_conf"], color='#C82423', alpha=0.8, label='Total $S_{Ti}$')
+        ax.set_yticks(y)
+        ax.set_yticklabels(df.index, fontsize=9)
+        ax.set_title(titles.get(name, name), fontsize=13, fontweight='bold')
+        ax.set_xlim(0, 1)
+        ax.grid(True, axis='x', linestyle='--', alpha=0.5)
+    np.atleast_1d(axes)[0].invert_yaxis()
+    np.atleast_1d(axes)[0].legend(loc='lower right')
+    plt.tight_layout()
+    plt.savefig(filename, dpi=300)
+    plt.close()
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    screen = derivative_screening()
+    print(f"Adjoint DGSM screening ({time.perf_counter() - start:.2f}s):")
+    print(screen.round(4).to_string())
+
+    n = 2 ** 16
+    start = time.perf_counter()
+    tables = sensitivity_study(n)
+    elapsed = time.perf_counter() - start
+    n_eval = n * (len(SOBOL_RANGES) + 2)
+    print(f"{len(SOBOL_RANGES)} parameters, {n_eval:,} model evaluations "
+          f"(x {len(DURATION_GRID)} durations) in {elapsed:.1f}s")
+    for name, df in tables.items():
+        print(f"\n[{name}]")
+        print(df.round(3).to_string())
+    plot_sobol(tables)
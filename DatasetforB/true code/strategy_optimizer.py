@@ -0,0 +1,151 @@
+from functools import lru_cache
+
+import numpy as np
+from scipy.optimize import minimize
+
+from batch_engine import DEFAULT_PARAMS, PAYLOAD, as_param_matrix, param_index, simulate_sweep
+from result_cache import cached
+from risk_optimization import LAUNCHES_PER_SITE, WEATHER_MEAN
+
+# ==========================================
+# 1. 决策变量与成本假设 (Strategy Variables)
+# ==========================================
+# 三个决策变量: 工期 T、发射场数 n、电梯年扩容率 g (env_impact 的 L 形曲线取 g = 4%)
+#   发射场    INFRASTRUCTURE_COST 对应 BASE_SITES 个场站，按场站数线性缩放；
+#             每个场站年运力 = LAUNCHES_PER_SITE x (1 - 平均天气取消率) x PAYLOAD，
+#             场站数必须覆盖工期内火箭的最大年运量
+#   电梯扩容  名义运力按 (1 + g)^i 增长 (batch_engine 的 EXPANSION_RATE)，
+#             按工期末新增的名义运力一次性计建设费
+# 给定 (T, g) 时成本随 n 单调增加，最优场站数就是最小可行场站数 (闭式解)，
+# 因此联合优化化为 (T, g) 上的连续问题，用无导数的 Nelder-Mead 求解。
+BASE_SITES = 10                              # final_ 的 Standard (10 Sites) 方案
+SITE_CAPACITY = LAUNCHES_PER_SITE * (1 - WEATHER_MEAN) * PAYLOAD   # MT / 年 / 场站
+EXPANSION_COST_PER_MT_YR = 100_000           # 每新增 1 MT/年 名义运力的建设费 ($)
+MIN_SITES = 1
+
+BOUNDS = ((20.0, 150.0), (0.0, 0.08))        # (工期, 扩容率)
+SEED_GRID = (14, 9)                          # 初始粗网格 (工期 x 扩容率)，一次向量化调用
+N_STARTS = 3                                 # Nelder-Mead 起点数
+T_TOL = 1 / 120                              # 工期精度: 约 3 天
+G_TOL = 1e-4                                 # 扩容率精度: 0.01 个百分点
+
+def _strategy_params(rates, params):
+    """每个扩容率一行的参数矩阵；基建费单独按场站数计，引擎内置为 0"""
+    params = np.repeat(as_param_matrix(params)[:1], len(rates), axis=0)
+    params[:, param_index("EXPANSION_RATE")] = rates
+    params[:, param_index("INFRASTRUCTURE_COST")] = 0
+    return params
+
+def strategy_costs(durations, rates, params=None, sites=None):
+    """
+    (扩容率 x 工期) 网格上的策略成本，一次 simulate_sweep 调用。
+    sites=None 时取各格点的最小可行场站数；给定 sites 时场站不足的格点成本为 inf。
+    返回 dict，每个值为 (G, D) 数组: sites / site_cost / expansion_cost / financial / green / rocket_share
+    """
+    durations = np.atleast_1d(np.asarray(durations, dtype=float))
+    rates = np.atleast_1d(np.asarray(rates, dtype=float))
+    base = as_param_matrix(params)[0]
+    res = simulate_sweep(durations, _strategy_params(rates, params))
+
+    required = np.maximum(MIN_SITES, np.ceil(res["peak_rocket"] / SITE_CAPACITY - 1e-9))
+    n_sites = required if sites is None else np.broadcast_to(float(sites), required.shape)
+    site_cost = n_sites * base[param_index("INFRASTRUCTURE_COST")] / BASE_SITES
+    last_year = np.ceil(durations)[None, :] - 1
+    expansion_cost = (EXPANSION_COST_PER_MT_YR * base[param_index("KE_NOMINAL")]
+                      * ((1 + rates[:, None]) ** last_year - 1))
+    capex = np.where(n_sites >= required, site_cost + expansion_cost, np.inf)
+    return {
+        "sites": n_sites,
+        "site_cost": site_cost,
+        "expansion_cost": expansion_cost,
+        "financial": res["financial"] + capex,
+        "green": res["green"] + capex,
+        "rocket_share": res["rocket_share"],
+    }
+
+# ==========================================
+# 2. 记忆化无导数搜索 (Memoized Derivative-Free Search)
+# ==========================================
+# 粗网格 (SEED_GRID) 给出起点，再在归一化到 [0, 1] 的 (T, g) 上做有界 Nelder-Mead。
+# 每个试探点先按 T_TOL / G_TOL 取整再查缓存，单纯形收缩时的重复点不重新计算。
+# 整个搜索的结果再经 result_cache 存盘，参数与代码不变时重复运行直接读取。
+
+@lru_cache(maxsize=16384)
+def _green_point(T, g, key):
+    return float(strategy_costs([T], [g], np.array([key]))["green"][0, 0])
+
+def _snap(x):
+    (t_lo, t_hi), (g_lo, g_hi) = BOUNDS
+    T = t_lo + np.clip(x[0], 0, 1) * (t_hi - t_lo)
+    g = g_lo + np.clip(x[1], 0, 1) * (g_hi - g_lo)
+    return round(T / T_TOL) * T_TOL, round(g / G_TOL) * G_TOL
+
+@cached
+def optimize_strategy(params=None, seed_grid=SEED_GRID):
+    """
+    绿色成本最优的 (工期, 场站数, 扩容率)。
+    返回 dict: duration / sites / expansion_rate / green / financial / rocket_share / evaluations
+    (evaluations = 粗网格点数 + Nelder-Mead 中实际计算的不同点数)
+    """
+    key = tuple(float(v) for v in as_param_matrix(params)[0])
+    (t_lo, t_hi), (g_lo, g_hi) = BOUNDS
+    grid_T = np.linspace(t_lo, t_hi, seed_grid[0])
+    grid_g = np.linspace(g_lo, g_hi, seed_grid[1])
+    seed = strategy_costs(grid_T, grid_g, np.array([key]))["green"]
+    visited = set()
+    def objective(x):
+        point = _snap(x)
+        visited.add(point)
+        return _green_point(*point, key)
+
+    # 成本面在边界附近常有场站台阶，取粗网格最好的 N_STARTS 个格点分别起步
+    res = None
+    for k in np.argsort(seed, axis=None)[:N_STARTS]:
+        i, j = np.unravel_index(k, seed.shape)
+        x0 = ((grid_T[j] - t_lo) / (t_hi - t_lo), (grid_g[i] - g_lo) / (g_hi - g_lo))
+        trial = minimize(objective, x0, method='Nelder-Mead', bounds=((0, 1), (0, 1)),
+                         options={'xatol': 1e-4, 'fatol': 1e-6 * seed.min()})
+        if res is None or trial.fun < res.fun:
+            res = trial
+    T, g = _snap(res.x)
+    best = strategy_costs([T], [g], np.array([key]))
+    return {
+        "duration": T,
+        "sites": int(best["sites"][0, 0]),
+        "expansion_rate": g,
+        "green": float(best["green"][0, 0]),
+        "financial": float(best["financial"][0, 0]),
+        "rocket_share": float(best["rocket_share"][0, 0]),
+        "evaluations": seed.size + len(visited),
+    }
+
+@cached
+def exhaustive_search(params=None, t_step=1 / 12, g_step=0.001):
+    """穷举网格 (用于校验): 返回 (最优工期, 最优扩容率, 最小绿色成本, 格点数)"""
+    (t_lo, t_hi), (g_lo, g_hi) = BOUNDS
+    grid_T = np.arange(round(t_lo / t_step), round(t_hi / t_step) + 1) * t_step
+    grid_g = np.arange(round(g_lo / g_step), round(g_hi / g_step) + 1) * g_step
+    green = strategy_costs(grid_T, grid_g, params)["green"]
+    i, j = np.unravel_index(green.argmin(), green.shape)
+    return grid_T[j], grid_g[i], float(green[i, j]), green.size
+
+if __name__ == "__main__":
+    import time
+
+    scenarios = {
+        "Baseline": None,
+        "Carbon Tax $20k/t": dict(DEFAULT_PARAMS, CARBON_TAX=20_000),
+        "Carbon Tax $30k/t": dict(DEFAULT_PARAMS, CARBON_TAX=30_000),
+        "Carbon Tax $60k/t": dict(DEFAULT_PARAMS, CARBON_TAX=60_000),
+    }
+    print(f"{'Scenario':<20} | {'T (yr)':<7} | {'Sites':<5} | {'g (%)':<6} | {'Green ($T)':<10} | "
+          f"{'Evals':<5} | {'Grid Opt ($T)':<13} | {'Grid Cells':<10}")
+    print("-" * 100)
+    for name, params in scenarios.items():
+        start = time.perf_counter()
+        best = optimize_strategy(params)
+        elapsed = time.perf_counter() - start
+        _, _, grid_best, n_cells = exhaustive_search(params)
+        print(f"{name:<20} | {best['duration']:<7.2f} | {best['sites']:<5} | {100 * best['expansion_rate']:<6.2f} | "
+              f"{best['green'] / 1e12:<10.4f} | {best['evaluations']:<5} | {grid_best / 1e12:<13.4f} | {n_cells:<10}"
+              f"  ({elapsed:.2f}s)")
@@ -0,0 +1,186 @@
+import numpy as np
+
+# ==========================================
+# 流式统计 (Constant-Memory Streaming Statistics)
+# ==========================================
+# 蒙特卡洛路径完成时按批喂入，内存只与分箱数有关 (O(bins))，与路径数无关；
+# 所有累加器都支持 merge，可直接合并多进程分片的结果。
+
+class Welford:
+    """均值/方差的在线累加 (批量更新用 Chan 并行合并公式)"""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        if values.size:
+            self._combine(values.size, values.mean(), ((values - values.mean()) ** 2).sum())
+
+    def merge(self, other):
+        self._combine(other.n, other.mean, other.m2)
+        return self
+
+    def _combine(self, n_b, mean_b, m2_b):
+        if n_b == 0:
+            return
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta ** 2 * self.n * n_b / n
+        self.n = n
+
+    @property
+    def var(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else float('nan')
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.var))
+
+class QuantileSketch:
+    """
+    相对误差分位数草图 (对数分桶，DDSketch 思路)。
+    正值 x 落入桶 ceil(log(x) / log(g))，g = (1 + eps) / (1 - eps)，分位数的相对误差不超过 eps；
+    桶计数可直接相加，因此可合并，适用于非整数的完工时间。
+    """
+
+    def __init__(self, rel_error=0.005):
+        self.rel_error = rel_error
+        self.log_gamma = np.log((1 + rel_error) / (1 - rel_error))
+        self.offset = None
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.zeros = 0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        if np.any(values < 0):
+            raise ValueError("QuantileSketch only accepts non-negative values")
+        self.zeros += int(np.count_nonzero(values == 0))
+        values = values[values > 0]
+        if values.size:
+            self._add(np.ceil(np.log(values) / self.log_gamma).astype(np.int64))
+
+    def _add(self, idx, weights=None):
+        lo, hi = int(idx.min()), int(idx.max())
+        if self.offset is None:
+            self.offset = lo
+        if lo < self.offset or hi >= self.offset + len(self.counts):
+            new_offset = min(lo, self.offset)
+            new_counts = np.zeros(max(hi + 1, self.offset + len(self.counts)) - new_offset, dtype=np.int64)
+            new_counts[self.offset - new_offset:self.offset - new_offset + len(self.counts)] = self.counts
+            self.offset, self.counts = new_offset, new_counts
+        self.counts += np.bincount(idx - self.offset, weights=weights, minlength=len(self.counts)).astype(np.int64)
+
+    def merge(self, other):
+        if other.log_gamma != self.log_gamma:
+            raise ValueError("Cannot merge sketches with different relative error")
+        self.zeros += other.zeros
+        if other.offset is not None and other.counts.any():
+            idx = np.flatnonzero(other.counts)
+            self._add(idx + other.offset, other.counts[idx])
+        return self
+
+    @property
+    def n(self):
+        return int(self.counts.sum()) + self.zeros
+
+    def quantile(self, q):
+        """q 分位数 (0 <= q <= 1)"""
+        if self.n == 0:
+            return float('nan')
+        rank = q * (self.n - 1)
+        if rank < self.zeros:
+            return 0.0
+        k = int(np.searchsorted(np.cumsum(self.counts), rank - self.zeros, side='right'))
+        gamma = np.exp(self.log_gamma)
+        # 桶 (g^(i-1), g^i] 的代表值，使相对误差 <= eps
+        return float(2 * gamma ** (k + self.offset) / (gamma + 1))
+
+class CompletionAccumulator:
+    """
+    完工年数集合的流式汇总:
+    精确整数直方图 + Welford 矩 + 分位数草图 + 准时率计数器。
+    """
+
+    def __init__(self, max_year, thresholds=(60,), rel_error=0.005):
+        self.max_year = int(max_year)
+        self.counts = np.zeros(self.max_year + 1, dtype=np.int64)
+        self.moments = Welford()
+        self.sketch = QuantileSketch(rel_error)
+        self.thresholds = tuple(thresholds)
+        self.on_time = {t: 0 for t in self.thresholds}
+        self.min_value = np.inf
+        self.max_value = -np.inf
+        self.integral = True    # 全部为整数年时分位数直接由直方图精确给出
+
+    def update(self, years):
+        """喂入一批已完成路径的完工年数 (可为小数；直方图按向上取整的年计数)"""
+        years = np.asarray(years).ravel()
+        if years.size == 0:
+            return self
+        bins = np.minimum(np.ceil(years).astype(np.int64), self.max_year)
+        if bins.min() < 0:
+            raise ValueError("Completion years must be non-negative")
+        self.counts += np.bincount(bins, minlength=len(self.counts))
+        self.integral = self.integral and bool(np.all(years == np.round(years)))
+        self.moments.update(years)
+        self.sketch.update(years)
+        for t in self.thresholds:
+            self.on_time[t] += int(np.count_nonzero(years <= t))
+        self.min_value = min(self.min_value, float(years.min()))
+        self.max_value = max(self.max_value, float(years.max()))
+        return self
+
+    def merge(self, other):
+        if other.max_year != self.max_year or other.thresholds != self.thresholds:
+            raise ValueError("Cannot merge accumulators with different layouts")
+        self.counts += other.counts
+        self.integral = self.integral and other.integral
+        self.moments.merge(other.moments)
+        self.sketch.merge(other.sketch)
+        for t in self.thresholds:
+            self.on_time[t] += other.on_time[t]
+        self.min_value = min(self.min_value, other.min_value)
+        self.max_value = max(self.max_value, other.max_value)
+        return self
+
+    @property
+    def n(self):
+        return self.moments.n
+
+    def mean(self):
+        return self.moments.mean
+
+    def std(self):
+        return self.moments.std
+
+    def max(self):
+        return self.max_value
+
+    def min(self):
+        return self.min_value
+
+    def prob_within(self, years):
+        """P(完工年数 <= years)；阈值已登记时用精确计数器，否则由整数直方图给出"""
+        if years in self.on_time:
+            return self.on_time[years] / self.n
+        return float(self.counts[:int(np.floor(years)) + 1].sum() / self.n)
+
+    def quantile(self, q):
+        if self.integral:
+            return float(np.searchsorted(np.cumsum(self.counts), q * (self.n - 1), side='right'))
+        return self.sketch.quantile(q)
+
+    def histogram(self, bins=None):
+        """(概率密度, 分箱边界)；bins=None 时每个整年一个分箱，否则合并为约 bins 个等宽分箱"""
+        if self.n == 0:
+            raise ValueError("Cannot build a histogram from an empty accumulator")
+        lo = int(np.flatnonzero(self.counts)[0])
+        hi = int(np.flatnonzero(self.counts)[-1])
+        width = 1 if bins is None else max(1, int(np.ceil((hi - lo + 1) / bins)))
+        edges = np.arange(lo, hi + width + 1, width) - 0.5
+        counts = np.add.reduceat(self.counts[lo:hi + 1], np.arange(0, hi - lo + 1, width))
+        return counts / (self.n * width), edges
@@ -0,0 +1,334 @@
+from itertools import combinations_with_replacement
+
+import numpy as np
+from scipy.linalg import cho_factor, cho_solve, solve_triangular
+from scipy.stats import qmc
+
+from batch_engine import ALPHA_PARAMS, M_TOTAL, PARAM_NAMES, PAYLOAD, as_param_matrix, param_index, simulate_sweep
+from result_cache import cached
+from sobol_sensitivity import SOBOL_RANGES
+from wright_law import rocket_cost_batch, unit_cost
+
+# ==========================================
+# 1. 多项式混沌展开 (Polynomial Chaos Expansion)
+# ==========================================
+# 输入线性映射到 [-1, 1]^d，基函数为正交归一 Legendre 多项式的乘积，总阶数 <= DEGREE。
+# 系数由最小二乘求得，只保存法方程 G = A^T A、A^T y，新样本到来时直接累加后重新分解 (增量训练)。
+# 误差估计: 留一法 (LOO) 残差 e_i / (1 - h_ii) 的均方根，再按查询点的杠杆值 h(x) = phi^T G^{-1} phi 放大，
+#           sigma(x) = RMSE_loo x sqrt(1 + h(x))；G 的 Cholesky 逆因子预先算好，查询只需矩阵乘。
+DEGREE = 6
+RIDGE = 1e-10
+
+def _multi_indices(d, degree):
+    """总阶数 <= degree 的多重指标 (M, d)"""
+    rows = [np.zeros(d, dtype=np.int64)]
+    for p in range(1, degree + 1):
+        for combo in combinations_with_replacement(range(d), p):
+            rows.append(np.bincount(combo, minlength=d))
+    return np.array(rows)
+
+def _legendre_table(x, degree):
+    """正交归一 Legendre 值 (n, d, degree + 1)，三项递推"""
+    table = np.empty(x.shape + (degree + 1,))
+    table[..., 0] = 1
+    if degree >= 1:
+        table[..., 1] = x
+    for k in range(1, degree):
+        table[..., k + 1] = ((2 * k + 1) * x * table[..., k] - k * table[..., k - 1]) / (k + 1)
+    return table * np.sqrt(2 * np.arange(degree + 1) + 1)
+
+class _PCE:
+    """单输出的增量最小二乘 PCE"""
+
+    def __init__(self, d, degree=DEGREE):
+        self.index = _multi_indices(d, degree)
+        self.degree = degree
+        self.cols = np.arange(d)
+        m = len(self.index)
+        self.gram, self.rhs = np.zeros((m, m)), np.zeros(m)
+        self.rows, self.y = np.empty((0, m)), np.empty(0)
+
+    def basis(self, u):
+        return _legendre_table(u, self.degree)[:, self.cols, self.index].prod(axis=2)   # (n, M)
+
+    def update(self, u, y):
+        a = self.basis(u)
+        self.gram += a.T @ a
+        self.rhs += a.T @ y
+        self.rows, self.y = np.vstack([self.rows, a]), np.concatenate([self.y, y])
+        ridge = RIDGE * np.trace(self.gram) / len(self.gram)
+        chol = cho_factor(self.gram + ridge * np.eye(len(self.gram)), lower=True)
+        self.coef = cho_solve(chol, self.rhs)
+        # 留一残差: h_ii = ||L^{-1} a_i||^2
+        self.chol_inv = solve_triangular(np.tril(chol[0]), np.eye(len(self.gram)), lower=True)
+        leverage = np.minimum(((self.rows @ self.chol_inv.T) ** 2).sum(axis=1), 1 - 1e-12)
+        self.rmse = float(np.sqrt(np.mean(((self.y - self.rows @ self.coef) / (1 - leverage)) ** 2)))
+
+    def predict(self, u):
+        a = self.basis(u)
+        return a @ self.coef, self.rmse * np.sqrt(1 + ((a @ self.chol_inv.T) ** 2).sum(axis=1))
+
+# ==========================================
+# 2. 分解: 代理逐年递推，精确计算成本 (Emulate the Recurrence, Price Exactly)
+# ==========================================
+# 引擎里昂贵的只有逐年递推 (电梯运力 -> 火箭运量)，它只依赖运力参数 (KE_NOMINAL、碎片系数) 与工期；
+# 成本类参数 (运价、莱特定律、基建费、排放因子、碳税、发射成功率) 只进入闭式计价:
+#   财务成本 = (M - R) x 电梯运价 + 莱特定律批次成本 (R / (PAYLOAD x 成功率)) + 基建费
+#   排放     = R x 排放因子，绿色成本 = 财务成本 + 排放 x 碳税
+# 因此 PCE 只拟合火箭运量占比 R / M (运力参数, T)；成本参数可取任意值，查询不受参数盒限制，
+# 成本的误差估计由 R 的误差乘以 dC/dR (边际单价) 得到。同一组运力参数与工期的 PCE 结果按实例缓存，
+# 只改成本参数的连续查询只剩闭式计价；计价结果再按 (全部参数, 工期) 缓存，重复的 what-if 查询只是一次字典查找。
+# 实测: 换成本参数后的首次查询约 180 us，与单个工期的引擎调用 (约 300 us) 同一量级，重复查询约 3 us。
+# 默认只把影响最大的四个运力参数作为输入 (维修改进率与常规维护取 base)；
+# 碎片参数盒的高端会让 alpha 触底 (max(0, ·) 折点)，输入维数越多 PCE 越难逼近。
+CAPACITY_NAMES = ("KE_NOMINAL", "DEBRIS_LAMBDA0", "DEBRIS_GROWTH", "REPAIR_DAYS0")
+RECURRENCE_PARAMS = ("KE_NOMINAL", "EXPANSION_RATE") + ALPHA_PARAMS   # 进入逐年递推的全部参数
+DURATION_RANGE = (20.0, 120.0)
+OUTPUTS = ("financial", "green", "env_cost", "emissions", "rocket_share", "optimal_T")
+N_TRAIN = 512                                       # 训练参数组数 (Sobol 点)
+TRAIN_DURATIONS = np.linspace(*DURATION_RANGE, 21)  # 每组参数扫描的工期
+OPT_GRID = np.arange(20, 121)                       # 代理的最优工期 = 该网格上绿色成本的 argmin
+OPT_MAX = 1000                                      # 引擎求最优工期时整年网格向上外扩的上限
+TOL = 1e-3                                          # 相对误差估计超过 TOL 时回退到引擎
+RETRAIN_BATCH = 32                                  # 回退积累的引擎结果达到该数量时增量重训
+
+def price(params, rocket_cargo, sigma=0.0):
+    """
+    由火箭总运量计价 (params 为一组参数 (K,)，rocket_cargo 可为数组)。
+    返回 dict: 各输出的值与 '<name>_err' 误差 (由运量误差 sigma 线性传播)
+    """
+    col = lambda name: params[param_index(name)]
+    R = np.asarray(rocket_cargo, dtype=float)
+    per_launch = PAYLOAD * col("LAUNCH_RELIABILITY")
+    wright = (col("COST_R_INIT_LAUNCH"), col("COST_R_FLOOR_LAUNCH"), col("LEARNING_RATE"))
+    financial = (M_TOTAL - R) * col("COST_E_PER_MT") + rocket_cost_batch(0, R / per_launch, *wright) \
+        + col("INFRASTRUCTURE_COST")
+    emissions = R * col("EMISSION_FACTOR")
+    env_cost = emissions * col("CARBON_TAX")
+    d_fin = unit_cost(R / per_launch, *wright) / per_launch - col("COST_E_PER_MT")
+    d_env = col("EMISSION_FACTOR") * col("CARBON_TAX")
+    return {
+        "financial": financial, "financial_err": np.abs(d_fin) * sigma,
+        "green": financial + env_cost, "green_err": np.abs(d_fin + d_env) * sigma,
+        "env_cost": env_cost, "env_cost_err": d_env * sigma,
+        "emissions": emissions, "emissions_err": col("EMISSION_FACTOR") * sigma,
+        "rocket_share": R / M_TOTAL, "rocket_share_err": sigma / M_TOTAL,
+    }
+
+@cached
+def engine_outputs(params, durations):
+    """精确引擎: (P, D) 的各输出 (不含 optimal_T，见 engine_optimal_T)，结果经 result_cache 存盘"""
+    params = as_param_matrix(params)
+    res = simulate_sweep(durations, params)
+    return {
+        "rocket_cargo": res["rocket_cargo"],
+        "financial": res["financial"],
+        "green": res["green"],
+        "env_cost": res["env_cost"],
+        "emissions": res["rocket_cargo"] * params[:, param_index("EMISSION_FACTOR"), None],
+        "rocket_share": res["rocket_share"],
+    }
+
+@cached
+def engine_optimal_T(params, max_T=OPT_MAX):
+    """
+    精确引擎的最优工期: 整年网格上绿色成本的 argmin。工期下限 OPT_GRID[0] 是方案约束 (argmin 落在下限即约束最优)；
+    上端只是网格截断，argmin 落在上端点时把网格加倍外扩 (不超过 max_T) 后重扫，直到全部参数组的 argmin 都在内部。
+    返回 dict: optimal_T (P,) / interior (P,) (False 表示扫到 max_T 仍在上端点，真实最优超出搜索范围)
+    """
+    params = as_param_matrix(params)
+    grid = OPT_GRID
+    while True:
+        k = simulate_sweep(grid, params)["green"].argmin(axis=1)
+        at_edge = k == len(grid) - 1
+        if not at_edge.any() or grid[-1] >= max_T:
+            break
+        grid = np.arange(grid[0], min(max_T, 2 * grid[-1]) + 1)
+    return {"optimal_T": grid[k].astype(float), "interior": ~at_edge}
+
+# ==========================================
+# 3. 代理模型 (Emulator with Engine Fallback)
+# ==========================================
+class Emulator:
+    """
+    在运力参数盒 (SOBOL_RANGES 中 names 各参数) x DURATION_RANGE 上训练的代理模型，其余参数默认取 base。
+    query 给出 (值, 误差估计, 来源)；误差估计超过 tol 或运力参数/工期出界时改用引擎精确计算。
+    """
+
+    def __init__(self, names=CAPACITY_NAMES, base=None, n_train=N_TRAIN, degree=DEGREE, seed=2050):
+        self.names = tuple(names)
+        self.base = as_param_matrix(base)[0]
+        self.cols = [param_index(name) for name in self.names]
+        self.fixed = [param_index(name) for name in RECURRENCE_PARAMS if name not in self.names]
+        self.lo, self.hi = np.array([SOBOL_RANGES[k] for k in self.names], dtype=float).T
+        self.model = _PCE(len(self.names) + 1, degree)
+        self.pending = []
+        self.engine_runs = 0
+        self._share = {}
+        self._priced = {}
+        unit = qmc.Sobol(d=len(self.names), scramble=True, seed=seed).random(n_train)
+        self.update(qmc.scale(unit, self.lo, self.hi), TRAIN_DURATIONS)
+
+    def _params(self, **values):
+        for k in values:
+            if k not in PARAM_NAMES:
+                raise KeyError(f"Unknown parameter: {k}")
+        params = self.base.copy()
+        for k, v in values.items():
+            params[param_index(k)] = v
+        return params
+
+    def _unit(self, x, durations):
+        """一组运力参数 x (d,) 与多个工期 -> PCE 输入 (D, d + 1)"""
+        t_lo, t_hi = DURATION_RANGE
+        u = np.empty((len(durations), len(x) + 1))
+        u[:, :-1] = 2 * (x - self.lo) / (self.hi - self.lo) - 1
+        u[:, -1] = 2 * (np.asarray(durations, dtype=float) - t_lo) / (t_hi - t_lo) - 1
+        return u
+
+    def _rocket_cargo(self, x, durations):
+        """PCE 预测的火箭运量与误差 (MT)，按 (运力参数, 工期) 缓存"""
+        key = (tuple(x), tuple(durations))
+        if key not in self._share:
+            share, sigma = self.model.predict(self._unit(x, durations))
+            self._share[key] = (share * M_TOTAL, sigma * M_TOTAL)
+        return self._share[key]
+
+    def _price(self, params, durations):
+        """price 的按实例缓存版本: 运力参数与成本参数都相同的重复查询直接返回"""
+        key = (params.tobytes(), tuple(durations))
+        if key not in self._priced:
+            self._priced[key] = price(params, *self._rocket_cargo(params[self.cols], durations))
+        return self._priced[key]
+
+    def update(self, values, durations):
+        """
+        加入新的引擎结果并增量重训: values (P, d) 为 names 各运力参数取值，durations (D,) 为工期。
+        返回本次运行的引擎结果 (engine_outputs 格式)。
+        """
+        values = np.atleast_2d(np.asarray(values, dtype=float))
+        durations = np.atleast_1d(np.asarray(durations, dtype=float))
+        params = np.repeat(self.base[None], len(values), axis=0)
+        params[:, self.cols] = values
+        res = engine_outputs(params, durations)
+        self.engine_runs += len(values)
+        u = np.concatenate([self._unit(v, durations) for v in values])
+        self.model.update(u, res["rocket_cargo"].ravel() / M_TOTAL)
+        self._share.clear()
+        self._priced.clear()
+        return res
+
+    def predict(self, name, duration=None, **values):
+        """
+        代理预测 (值, 误差估计)，单位同 engine_outputs；optimal_T 不需要 duration。
+        optimal_T 的 argmin 落在 OPT_GRID 上端点时，真实最优可能在网格之外，误差记为 inf。
+        """
+        if name not in OUTPUTS:
+            raise ValueError(f"Unknown output: {name} (expected one of {OUTPUTS})")
+        params = self._params(**values)
+        if name == "optimal_T":
+            out = self._price(params, OPT_GRID)
+            green, err = out["green"], out["green_err"]
+            best = green.argmin()
+            if best == len(OPT_GRID) - 1:
+                return float(OPT_GRID[best]), np.inf
+            # 误差: 绿色成本在 2 sigma 内与最小值不可区分的工期范围
+            tied = OPT_GRID[green - 2 * err <= green[best] + 2 * err[best]]
+            return float(OPT_GRID[best]), float(np.abs(tied - OPT_GRID[best]).max())
+        if duration is None:
+            raise ValueError(f"Output '{name}' requires a duration (years)")
+        out = self._price(params, (float(duration),))
+        return float(out[name][0]), float(out[name + "_err"][0])
+
+    def query(self, name, duration=None, tol=TOL, **values):
+        """返回 dict: value / error / source ('surrogate' 或 'engine')；除 optimal_T 外必须给出 duration"""
+        if name not in OUTPUTS:
+            raise ValueError(f"Unknown output: {name} (expected one of {OUTPUTS})")
+        if name != "optimal_T" and duration is None:
+            raise ValueError(f"Output '{name}' requires a duration (years)")
+        params = self._params(**values)
+        x = params[self.cols]
+        # 不是 PCE 输入的递推参数必须保持 base 值，否则代理不适用
+        inside = (bool(np.all((x >= self.lo) & (x <= self.hi)))
+                  and np.array_equal(params[self.fixed], self.base[self.fixed]))
+        if name != "optimal_T":
+            inside &= DURATION_RANGE[0] <= duration <= DURATION_RANGE[1]
+        if inside:
+            value, err = self.predict(name, duration, **values)
+            if err <= tol * abs(value):
+                return {"value": value, "error": err, "source": "surrogate"}
+
+        # 回退: 精确引擎。盒内的运力参数留作训练样本，攒够 RETRAIN_BATCH 个后一次增量重训；
+        # 最优工期外扩到 OPT_MAX 后仍落在上端点时，误差记为 inf (真实最优超出搜索范围)
+        if name == "optimal_T":
+            res = engine_optimal_T(params)
+            value, err = res["optimal_T"][0], (0.0 if res["interior"][0] else np.inf)
+        else:
+            value, err = engine_outputs(params, [duration])[name][0, 0], 0.0
+        self.engine_runs += 1
+        if inside:
+            self.pending.append(x)
+            if len(self.pending) >= RETRAIN_BATCH:
+                self.flush()
+        return {"value": float(value), "error": err, "source": "engine"}
+
+    def flush(self):
+        """用积累的回退点增量重训"""
+        if self.pending:
+            self.update(np.array(self.pending), TRAIN_DURATIONS)
+            self.pending = []
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    emu = Emulator()
+    print(f"Trained on {emu.engine_runs} parameter sets x {len(TRAIN_DURATIONS)} durations "
+          f"in {time.perf_counter() - start:.2f}s ({len(emu.model.index)} terms, "
+          f"LOO RMSE of rocket share {emu.model.rmse:.2e})")
+
+    # 独立检验集: 运力参数与成本参数同时随机，代理值与引擎精确值比较
+    rng = np.random.default_rng(7)
+    n_test = 200
+    names = emu.names + tuple(k for k in SOBOL_RANGES if k not in RECURRENCE_PARAMS)
+    box = np.array([SOBOL_RANGES[k] for k in names], dtype=float)
+    draws = rng.uniform(box[:, 0], box[:, 1], (n_test, len(names)))
+    T = rng.uniform(*DURATION_RANGE, n_test)
+    for name in ("green", "emissions", "optimal_T"):
+        pred, truth = np.empty((n_test, 2)), np.empty(n_test)
+        for m, (v, t) in enumerate(zip(draws, T)):
+            values = dict(zip(names, v))
+            pred[m] = emu.predict(name, t, **values)
+            if name == "optimal_T":
+                truth[m] = engine_optimal_T(emu._params(**values))["optimal_T"][0]
+            else:
+                truth[m] = engine_outputs(emu._params(**values), [t])[name][0, 0]
+        err = np.abs(pred[:, 0] - truth)
+        flagged = np.isinf(pred[:, 1])      # 最优落在 OPT_GRID 上端点: 代理不给出数值，query 回退引擎
+        print(f"  {name:<10} test max rel err {np.max(err[~flagged] / np.abs(truth[~flagged])):.2e}, "
+              f"within 2 sigma {100 * np.mean(err[~flagged] <= 2 * pred[~flagged, 1] + 1e-9):.0f}%, "
+              f"flagged out of range {flagged.sum()}")
+
+    # 交互查询: 学习率 0.9、碳税 $300
+    what_if = dict(LEARNING_RATE=0.9, CARBON_TAX=300)
+    n_query = 2_000
+    taxes = np.linspace(100, 500, n_query)
+    timings = {}
+    start = time.perf_counter()
+    for tax in taxes:                       # 每次换一个碳税: 需要重新计价
+        emu.predict("green", 60, LEARNING_RATE=0.9, CARBON_TAX=tax)
+    timings["surrogate (new cost params)"] = (time.perf_counter() - start) / n_query
+    start = time.perf_counter()
+    for _ in range(n_query):                # 重复同一查询: 命中计价缓存
+        emu.predict("green", 60, **what_if)
+    timings["surrogate (repeated)"] = (time.perf_counter() - start) / n_query
+    start = time.perf_counter()
+    for tax in taxes[:200]:
+        simulate_sweep([60], emu._params(LEARNING_RATE=0.9, CARBON_TAX=tax))
+    timings["engine"] = (time.perf_counter() - start) / 200
+    for name, T in (("green", 60), ("emissions", 60), ("optimal_T", None)):
+        ans = emu.query(name, T, **what_if)
+        print(f"What-if {name} (T={T}): {ans['value']:.6g} ± {ans['error']:.2g} [{ans['source']}]")
+    for label, seconds in timings.items():
+        print(f"  {label:<28} {1e6 * seconds:8.1f} us / query")
+    print(f"Engine runs so far {emu.engine_runs}")
@@ -0,0 +1,12 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+# 脚本均为平铺模块 (无包结构)，测试直接从上级目录导入
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 结果缓存写到临时目录，测试不污染源码目录下的 .engine_cache
+os.environ["ENGINE_CACHE_DIR"] = tempfile.mkdtemp(prefix="engine_cache_")
+atexit.register(shutil.rmtree, os.environ["ENGINE_CACHE_DIR"], True)
@@ -0,0 +1,10 @@
+from adaptive_mc import run_until_precision
+
+def test_runs_until_halfwidth_target():
+    res = run_until_precision(25, 0.01, 'mean', batch_paths=2000, seed=11, workers=1)
+    assert res["converged"] and res["halfwidth"] <= 0.01
+    assert res["n_paths"] == res["acc"].n > 2000
+
+def test_stops_at_max_paths():
+    res = run_until_precision(25, 1e-6, 'mean', batch_paths=1000, max_paths=3000, seed=11, workers=1)
+    assert not res["converged"] and res["n_paths"] == 3000
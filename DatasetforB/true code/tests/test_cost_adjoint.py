@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from batch_engine import PARAM_NAMES, make_param_sets, simulate_sweep
+from cost_adjoint import cost_gradients
+
+DURATIONS = np.array([37.3, 60.5, 88.25])     # 非整年: 年占比可导
+PARAMS = make_param_sets(LEARNING_RATE=[0.85, 0.80], CARBON_TAX=[150, 20_000], EXPANSION_RATE=[0.0, 0.01],
+                         LAUNCH_RELIABILITY=[1.0, 0.97])
+
+@pytest.fixture(scope="module")
+def grads():
+    return cost_gradients(DURATIONS, PARAMS)
+
+@pytest.mark.parametrize("name", PARAM_NAMES)
+def test_parameter_gradients_match_central_differences(grads, name):
+    k = PARAM_NAMES.index(name)
+    h = 1e-6 * np.maximum(np.abs(PARAMS[:, k]), 1e-3)
+    up, down = PARAMS.copy(), PARAMS.copy()
+    up[:, k] += h
+    down[:, k] -= h
+    hi, lo = simulate_sweep(DURATIONS, up), simulate_sweep(DURATIONS, down)
+    for out in ("financial", "green"):
+        fd = (hi[out] - lo[out]) / (2 * h[:, None])
+        np.testing.assert_allclose(grads["d_" + out][:, :, k], fd, rtol=1e-5, atol=1e-12)
+
+def test_duration_gradient(grads):
+    h = 1e-5
+    for out in ("financial", "green"):
+        fd = (simulate_sweep(DURATIONS + h, PARAMS)[out] - simulate_sweep(DURATIONS - h, PARAMS)[out]) / (2 * h)
+        np.testing.assert_allclose(grads["dT_" + out], fd, rtol=1e-6)
+
+def test_integer_duration_gives_right_derivative():
+    h = 1e-5
+    T = np.array([60.0])
+    right = (simulate_sweep(T + h, PARAMS)["green"] - simulate_sweep(T, PARAMS)["green"]) / h
+    np.testing.assert_allclose(cost_gradients(T, PARAMS)["dT_green"], right, rtol=1e-6)
@@ -0,0 +1,15 @@
+import numpy as np
+
+import global_optimum_analysis as g
+
+def test_whole_years_match_reference_loop():
+    for T in (20, 45, 66, 100):
+        assert np.allclose(g.calculate_metrics(T), [c[0, 0] for c in g.gssi_components([T])])
+
+def test_continuous_optimum_is_interior_and_matches_fine_grid():
+    t_opt, _ = g.optimal_duration()
+    fine = np.linspace(t_opt - 1, t_opt + 1, 20001)
+    assert abs(fine[g.gssi(fine)[0].argmin()] - t_opt) < g.T_TOL
+    assert abs(t_opt - round(t_opt)) > g.T_TOL
+    t_batch, _ = g.optimal_durations()
+    assert abs(t_batch[0] - t_opt) < g.T_TOL
@@ -0,0 +1,11 @@
+import numpy as np
+
+from mc_runner import run_parallel
+from risk_optimization import run_mc
+
+def test_run_mc_delegates_and_is_worker_independent():
+    serial = run_mc(10, 3000, seed=7, workers=1)
+    sharded = run_parallel(10, 3000, seed=7, workers=2, shard_paths=1000)
+    assert serial.n == 3000
+    assert np.array_equal(serial.counts, run_parallel(10, 3000, seed=7, workers=1).counts)
+    assert np.array_equal(sharded.counts, run_parallel(10, 3000, seed=7, workers=1, shard_paths=1000).counts)
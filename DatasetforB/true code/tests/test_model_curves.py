@@ -0,0 +1,16 @@
+import numpy as np
+
+from model_curves import get_alpha, get_beta
+
+def _alpha_reference(t):
+    d = t - 2050
+    return max(0, 1 - (0.833 * 1.015 ** d * 14 * 0.995 ** d + 365 * 0.05) / 365)
+
+def test_fractional_and_pre_2050_years_are_exact():
+    for t in (2040, 2050, 2060, 2060.7, 2149.25):
+        assert np.isclose(get_alpha(t), _alpha_reference(t), rtol=1e-12)
+    assert get_alpha(2060.7) != get_alpha(2060)
+
+def test_beta_vector_spanning_start_year():
+    years = np.array([2020, 2030.5, 2050, 2075])
+    assert np.allclose(get_beta(years), 400 / (1 + np.exp(-0.15 * (years - 2030))))
@@ -0,0 +1,25 @@
+import numpy as np
+from scipy.optimize import curve_fit
+
+import parameter_estimation as pe
+
+def _cost(y, p):
+    return ((y - pe.logistic_model(pe.years_hist, *[p[:, j, None] for j in range(3)])) ** 2).sum(axis=1)
+
+def test_batch_lm_recovers_from_rejected_first_steps():
+    rng = np.random.default_rng(0)
+    popt, _ = pe.fit_point()
+    y = pe._residual_resamples(rng, pe.years_hist, pe.cadence_hist, pe.logistic_model(pe.years_hist, *popt), 3, 16)
+    far = np.array([400.0, 0.5, 2030.0])
+    got = pe._fit_batch(pe.logistic_model, pe.logistic_jac, pe.years_hist, y, far, pe.CADENCE_BOUNDS)
+    ref = np.array([curve_fit(pe.logistic_model, pe.years_hist, row, p0=far, bounds=pe.CADENCE_BOUNDS)[0] for row in y])
+    assert np.all(_cost(y, got) <= _cost(y, ref) * 1.001)
+    assert np.all(_cost(y, got) < _cost(y, np.tile(far, (len(y), 1))))
+
+def test_cadence_samples_limit_feasibility():
+    samples = {"L": np.array([50.0, 500.0]), "k": np.array([0.4, 0.4]), "t0": np.array([2029.0, 2029.0]),
+               "a": np.array([0.1, 0.1]), "b": np.array([0.15, 0.15])}
+    res = pe.cost_distribution(samples, [60, 100])
+    assert res["green"].shape == res["shortfall"].shape == (2, 2)
+    assert np.all(res["shortfall"][0] > 0) and np.all(res["feasible"][1])
+    assert np.all(pe.rocket_shortfall(samples, [60], n_sites=10) >= res["shortfall"][:, :1])
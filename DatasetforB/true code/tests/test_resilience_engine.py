@@ -0,0 +1,24 @@
+import numpy as np
+
+from resilience_engine import integrate, pad_delays, resilience_metrics, resilience_surface
+
+def _single(cap):
+    return resilience_metrics(integrate(cap_per_pad=cap))["min_stock"][0]
+
+def test_vector_cap_per_pad_in_integrate():
+    caps = np.array([100.0, 200.0])
+    batch = integrate(cap_per_pad=caps)
+    assert batch["s"].shape[0] == 2
+    assert np.allclose(resilience_metrics(batch)["min_stock"], [_single(c) for c in caps])
+
+def test_per_pad_capacity_matrix():
+    delays = pad_delays()
+    cap = np.full((3, delays.shape[1]), 180.0) * np.array([[0.5], [1.0], [2.0]])
+    batch = integrate(delays=delays, cap_per_pad=cap)
+    assert np.allclose(resilience_metrics(batch)["min_stock"], [_single(c) for c in (90, 180, 360)])
+
+def test_cap_per_pad_as_only_surface_axis():
+    grid, surface = resilience_surface(cap_per_pad=[100, 200, 300])
+    assert surface["min_stock"].shape == (3,)
+    assert np.allclose(surface["min_stock"], [_single(c) for c in (100, 200, 300)])
+    assert np.all(np.diff(surface["min_stock"]) >= 0)
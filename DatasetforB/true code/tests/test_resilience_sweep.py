@@ -0,0 +1,17 @@
+import os
+
+import numpy as np
+
+from resilience_sweep import FINAL_AXES, FINAL_BASE, load_sweep, run_sweep
+
+def test_matching_sweep_is_reused(tmp_path):
+    path = str(tmp_path / "sweep.npy")
+    axes = dict(FINAL_AXES, n_pads=np.array([10, 25]))
+    assert run_sweep(path, axes, FINAL_BASE, workers=1) == 2
+    first = load_sweep(path)[0].copy()
+    stamp = os.stat(path).st_mtime_ns
+
+    assert run_sweep(path, axes, FINAL_BASE, workers=1) == 2
+    assert os.stat(path).st_mtime_ns == stamp
+    run_sweep(path, axes, dict(FINAL_BASE, omega=4000), workers=1)
+    assert not np.array_equal(load_sweep(path)[0]["min_stock"], first["min_stock"])
@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+import pytest
+
+import result_cache
+from result_cache import cache_info, cached, clear_cache
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, "CACHE_DIR", str(tmp_path))
+    return str(tmp_path)
+
+def _payload(n, scale=1.0):
+    return np.arange(n) * scale
+
+def test_hit_after_miss_and_defaults_follow_cache_dir(cache_dir):
+    f = cached(_payload)
+    np.testing.assert_array_equal(f(10), f(10))
+    assert f.stats == {"hits": 1, "misses": 1}
+    assert cache_info()["entries"] == 1
+    clear_cache()
+    assert cache_info(cache_dir) == {"entries": 0, "bytes": 0}
+
+def test_corrupt_entry_is_a_miss(cache_dir):
+    f = cached(_payload)
+    f(5)
+    key = f.cache_key(5)
+    path = os.path.join(cache_dir, key[:2], key + ".pkl")
+    with open(path, "wb") as fh:
+        fh.write(b"\x80\x05\x95garbage")
+    np.testing.assert_array_equal(f(5), np.arange(5))
+    assert f.stats["misses"] == 2
+    with open(path, "rb") as fh:
+        assert fh.read() != b"\x80\x05\x95garbage"
+
+def test_eviction_keeps_total_under_limit(cache_dir):
+    f = cached(_payload, max_bytes=20_000)
+    for n in range(10):
+        f(1000, float(n))        # 每条约 8 KB
+    info = cache_info()
+    assert info["bytes"] <= 20_000 and info["entries"] == 2
+    assert f.stats["misses"] == 10
+    f(1000, 9.0)
+    assert f.stats["hits"] == 1
+
+def test_code_version_tracks_source_edits(tmp_path, monkeypatch):
+    path = tmp_path / "mod.py"
+    path.write_text("x = 1\n")
+    first = result_cache._source_hash(str(path))
+    path.write_text("x = 22\n")
+    assert result_cache._source_hash(str(path)) != first
+
+def test_code_version_includes_imported_modules():
+    import strategy_optimizer
+    names = {os.path.basename(p) for p in result_cache._local_sources(strategy_optimizer.__file__)}
+    assert {"risk_optimization.py", "batch_engine.py", "model_curves.py", "wright_law.py"} <= names
@@ -0,0 +1,14 @@
+import numpy as np
+import pytest
+
+from streaming_stats import CompletionAccumulator
+
+def test_empty_histogram_raises():
+    with pytest.raises(ValueError, match="empty"):
+        CompletionAccumulator(151).histogram()
+
+def test_histogram_matches_numpy():
+    years = np.random.default_rng(0).integers(40, 90, 5000)
+    density, edges = CompletionAccumulator(151).update(years).histogram()
+    expected, _ = np.histogram(years, bins=edges, density=True)
+    np.testing.assert_allclose(density, expected)
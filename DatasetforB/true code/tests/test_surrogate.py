@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+import surrogate
+from batch_engine import simulate_sweep
+from surrogate import OPT_GRID, Emulator, engine_optimal_T
+
+@pytest.fixture(scope="module")
+def emu():
+    return Emulator(n_train=64, degree=3)
+
+def test_missing_duration_raises(emu):
+    with pytest.raises(ValueError, match="duration"):
+        emu.query("green")
+    with pytest.raises(ValueError, match="duration"):
+        emu.predict("emissions")
+    with pytest.raises(ValueError, match="Unknown output"):
+        emu.query("cost", 60)
+
+def test_edge_of_grid_optimum_falls_back_to_widened_search(emu):
+    what_if = dict(LEARNING_RATE=0.9, CARBON_TAX=300)
+    value, err = emu.predict("optimal_T", **what_if)
+    assert value == OPT_GRID[-1] and np.isinf(err)
+    ans = emu.query("optimal_T", **what_if)
+    grid = np.arange(20, 301)
+    true_opt = grid[simulate_sweep(grid, emu._params(**what_if))["green"].argmin()]
+    assert ans == {"value": float(true_opt), "error": 0.0, "source": "engine"}
+    assert true_opt > OPT_GRID[-1]
+
+def test_optimum_beyond_search_limit_is_flagged(emu):
+    res = engine_optimal_T(emu._params(LEARNING_RATE=0.9, CARBON_TAX=300), max_T=200)
+    assert res["optimal_T"][0] == 200 and not res["interior"][0]
+
+def test_duration_fallback_skips_optimum_sweep(emu, monkeypatch):
+    monkeypatch.setattr(surrogate, "engine_optimal_T", lambda *a, **k: pytest.fail("optimum sweep run"))
+    calls = []
+    sweep = surrogate.simulate_sweep
+    monkeypatch.setattr(surrogate, "simulate_sweep", lambda d, p: calls.append(len(d)) or sweep(d, p))
+    ans = emu.query("green", 150, KE_NOMINAL=123_456)     # 工期出界: 回退引擎
+    assert ans["source"] == "engine" and calls == [1]
+
+def test_repeated_query_uses_price_cache(emu, monkeypatch):
+    first = emu.predict("green", 60, CARBON_TAX=250)
+    monkeypatch.setattr(surrogate, "price", lambda *a, **k: pytest.fail("price recomputed"))
+    assert emu.predict("green", 60, CARBON_TAX=250) == first
@@ -0,0 +1,38 @@
+import numpy as np
+
+from wright_law import crossover_launch, rocket_cost_batch, rocket_cost_grad
+
+C_INIT, C_FLOOR = 375e6, 10e6
+
+def _riemann(n_start, n_new, learning_rate, steps=200_000):
+    n = n_start + (np.arange(steps) + 0.5) * n_new / steps
+    return np.maximum(C_FLOOR, C_INIT * np.maximum(1, n) ** np.log2(learning_rate)).sum() * n_new / steps
+
+def test_batch_matches_numeric_integral():
+    for lr in (0.80, 0.85, 0.90):
+        for n_start, n_new in ((0, 5), (3.5, 40), (10, 5000)):
+            assert np.isclose(rocket_cost_batch(n_start, n_new, C_INIT, C_FLOOR, lr), _riemann(n_start, n_new, lr), rtol=1e-6)
+
+def test_no_learning_never_reaches_floor():
+    assert crossover_launch(C_INIT, C_FLOOR, 1.0) == np.inf
+    assert np.isclose(rocket_cost_batch(0, 5, C_INIT, C_FLOOR, 1.0), 5 * C_INIT)
+    assert np.isclose(rocket_cost_batch(0, 5, C_INIT, C_FLOOR, 1.1), _riemann(0, 5, 1.1), rtol=1e-6)
+    assert rocket_cost_grad(0, 5, C_INIT, C_FLOOR, 1.0)["c_floor"] == 0
+
+def test_vector_learning_rate_spanning_one():
+    lr = np.array([0.85, 1.0, 1.05])
+    expected = [rocket_cost_batch(2, 30, C_INIT, C_FLOOR, x) for x in lr]
+    assert np.allclose(rocket_cost_batch(2, 30, C_INIT, C_FLOOR, lr), expected)
+
+def test_gradient_matches_central_differences():
+    names = ("n_start", "n_new", "c_init", "c_floor", "learning_rate")
+    # 学习段内、跨过 1 次发射的前段、跨过底价交叉点 (LR=0.8 时约 7.8e4 次)
+    for args in ((3.5, 40, C_INIT, C_FLOOR, 0.85), (0.4, 2.5, C_INIT, C_FLOOR, 0.9), (10, 1e5, C_INIT, C_FLOOR, 0.8)):
+        grad = rocket_cost_grad(*args)
+        for k, name in enumerate(names):
+            h = 1e-6 * abs(args[k])
+            up, down = list(args), list(args)
+            up[k] += h
+            down[k] -= h
+            fd = (rocket_cost_batch(*up) - rocket_cost_batch(*down)) / (2 * h)
+            assert np.isclose(grad[name], fd, rtol=1e-6), (args, name)
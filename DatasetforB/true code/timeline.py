@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+from scipy.signal import fftconvolve
+
+from batch_engine import M_TOTAL, PAYLOAD, START_YEAR, alpha_matrix, as_param_matrix, param_index, year_weights
+from debris_sampler import REPAIR_CV
+from pulsed_logistics_trend_fixed import DAYS_PER_YEAR, WINDOW_PERIOD, WINDOW_WIDTH, pulse_kernel, window_calendar
+from wright_law import rocket_cost_batch
+
+# ==========================================
+# 1. 多分辨率时间轴 (Multi-Resolution Timeline)
+# ==========================================
+# 粗层: 逐年运量与成本，与 batch_engine 的整体扫描同一套公式 (全周期一次向量化计算)。
+# 细层: 任意一年按需细化为逐日流量，只在查询时计算并缓存:
+#   电梯   年运量平均分到电梯可用的天数上；停运由该年的碎片撞击事件决定
+#          (次数 ~ Poisson(lambda_t)，维修 ~ Normal(repair_t, REPAIR_CV x repair_t) 天)
+#   火箭   年运量平分到该年的 28 天发射窗口，脉冲与 pulsed_logistics 相同的高斯核卷积
+#   储备   月面施工按日均匀消耗当年需求，储备 = 年初储备 + 累计 (到货 - 消耗)
+#   成本   按当日运量占当年运量的比例分摊当年成本
+# 细化结果的逐日之和与粗层年度值严格一致。每年的随机数由 (seed, 年份) 派生，
+# 与查询顺序无关，重复查询直接命中缓存。
+DAYS = 365
+
+class Timeline:
+    """逐年核心 + 按需逐日细化。duration 为工期 (年，可为小数)，params 同 batch_engine"""
+
+    def __init__(self, duration, params=None, seed=2050):
+        self.duration = float(duration)
+        self.params = as_param_matrix(params)[:1]
+        self.seed = seed
+        self.yearly = self._yearly_core()
+        self._daily = {}
+
+    def _col(self, name):
+        return self.params[0, param_index(name)]
+
+    def _yearly_core(self):
+        n_years = int(np.ceil(self.duration))
+        w = year_weights(np.array([self.duration]), n_years)[0]
+        growth = (1 + self._col("EXPANSION_RATE")) ** np.arange(n_years)
+        cap_e = self._col("KE_NOMINAL") * alpha_matrix(self.params, n_years)[0] * growth
+        demand = M_TOTAL / self.duration * w
+        rocket = w * np.maximum(0, M_TOTAL / self.duration - cap_e)
+        elevator = demand - rocket
+
+        launches = rocket / (PAYLOAD * self._col("LAUNCH_RELIABILITY"))
+        cum = np.cumsum(launches)
+        cost_r = rocket_cost_batch(cum - launches, launches, self._col("COST_R_INIT_LAUNCH"),
+                                   self._col("COST_R_FLOOR_LAUNCH"), self._col("LEARNING_RATE"))
+        cost_e = elevator * self._col("COST_E_PER_MT")
+        env_cost = rocket * self._col("EMISSION_FACTOR") * self._col("CARBON_TAX")
+        return pd.DataFrame({
+            "Year": START_YEAR + np.arange(n_years),
+            "Demand (MT)": demand,
+            "Elevator (MT)": elevator,
+            "Rocket (MT)": rocket,
+            "Launches": launches,
+            "Elevator Cost ($)": cost_e,
+            "Rocket Cost ($)": cost_r,
+            "Env Cost ($)": env_cost,
+        })
+
+    def totals(self):
+        """全周期汇总 (与 batch_engine.simulate_sweep 的 financial / green 一致)"""
+        y = self.yearly
+        financial = y["Elevator Cost ($)"].sum() + y["Rocket Cost ($)"].sum() + self._col("INFRASTRUCTURE_COST")
+        return {"financial": financial, "green": financial + y["Env Cost ($)"].sum(),
+                "rocket_cargo": y["Rocket (MT)"].sum()}
+
+    # ==========================================
+    # 2. 按需逐日细化 (Lazy Daily Refinement)
+    # ==========================================
+    def _outage_days(self, i, rng):
+        """第 i 年电梯停运的日期掩码 (DAYS,)"""
+        lambda0, growth = self._col("DEBRIS_LAMBDA0"), self._col("DEBRIS_GROWTH")
+        repair0, improve = self._col("REPAIR_DAYS0"), self._col("REPAIR_IMPROVE")
+        lambda_t = lambda0 * (1 + growth) ** i
+        repair_t = repair0 * (1 - improve) ** i
+        n = rng.poisson(lambda_t)
+        start = rng.uniform(0, DAYS, n)
+        length = np.maximum(0, rng.normal(repair_t, REPAIR_CV * repair_t, n))
+        day = np.arange(DAYS)[:, None]
+        return ((day + 1 > start) & (day < start + length)).any(axis=1)
+
+    def _rocket_days(self, i, total):
+        """第 i 年火箭运量在各发射窗口的逐日脉冲，和为 total"""
+        if total <= 0:
+            return np.zeros(DAYS)
+        centers = window_calendar(START_YEAR, START_YEAR + i + 1, WINDOW_PERIOD) - i * DAYS_PER_YEAR
+        centers = centers[(centers >= 0) & (centers < DAYS)]
+        impulses = np.bincount(centers.astype(np.int64), minlength=DAYS)[:DAYS].astype(float)
+        flow = fftconvolve(impulses, pulse_kernel(1, WINDOW_WIDTH), mode='same')
+        return total * flow / flow.sum()
+
+    def refine(self, year, stock0=0.0):
+        """
+        year 年 (绝对年份) 的逐日 DataFrame: Day / Elevator Up / Elevator (MT) / Rocket (MT) /
+        Consumption (MT) / Stock (MT) / Cost ($)。结果缓存，重复查询不再计算。
+        """
+        key = (int(year), float(stock0))
+        if key not in self._daily:
+            i = int(year) - START_YEAR
+            if not 0 <= i < len(self.yearly):
+                raise ValueError(f"Year {year} outside project timeline")
+            row = self.yearly.iloc[i]
+            rng = np.random.default_rng([self.seed, i])
+
+            up = ~self._outage_days(i, rng)
+            if not up.any():
+                up[:] = True   # 整年停运时退化为均匀分布，保证年度总量不变
+            elevator = row["Elevator (MT)"] * up / up.sum()
+            rocket = self._rocket_days(i, row["Rocket (MT)"])
+            consumption = np.full(DAYS, row["Demand (MT)"] / DAYS)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                cost = (np.nan_to_num(elevator / row["Elevator (MT)"]) * row["Elevator Cost ($)"]
+                        + np.nan_to_num(rocket / row["Rocket (MT)"]) * (row["Rocket Cost ($)"] + row["Env Cost ($)"]))
+            self._daily[key] = pd.DataFrame({
+                "Day": pd.Timestamp(f"{int(year)}-01-01") + pd.to_timedelta(np.arange(DAYS), unit='D'),
+                "Elevator Up": up,
+                "Elevator (MT)": elevator,
+                "Rocket (MT)": rocket,
+                "Consumption (MT)": consumption,
+                "Stock (MT)": stock0 + np.cumsum(elevator + rocket - consumption),
+                "Cost ($)": cost,
+            })
+        return self._daily[key]
+
+    def refine_range(self, start_year, end_year, stock0=0.0):
+        """连续多年的逐日序列 (含首尾)，各年按年份分别缓存"""
+        return pd.concat([self.refine(y, stock0) for y in range(start_year, end_year + 1)], ignore_index=True)
+
+    def cached_years(self):
+        return sorted({y for y, _ in self._daily})
+
+if __name__ == "__main__":
+    import time
+    from result_cache import simulate_sweep
+
+    start = time.perf_counter()
+    tl = Timeline(100)
+    coarse = time.perf_counter() - start
+    ref = simulate_sweep([100])
+    print(f"100-year yearly core in {1e3 * coarse:.1f} ms, green cost {tl.totals()['green'] / 1e12:.4f} $T "
+          f"(batch_engine {ref['green'][0, 0] / 1e12:.4f} $T)")
+
+    start = time.perf_counter()
+    days = tl.refine(2070)
+    first = time.perf_counter() - start
+    start = time.perf_counter()
+    tl.refine(2070)
+    again = time.perf_counter() - start
+    row = tl.yearly.set_index("Year").loc[2070]
+    print(f"Drill-down into 2070: {1e3 * first:.1f} ms (cached {1e3 * again:.3f} ms), "
+          f"{(~days['Elevator Up']).sum()} outage days, peak rocket day {days['Rocket (MT)'].max():,.0f} MT, "
+          f"min stock {days['Stock (MT)'].min():,.0f} MT")
+    print(f"Daily sums vs yearly: elevator {days['Elevator (MT)'].sum():,.0f} / {row['Elevator (MT)']:,.0f} MT, "
+          f"rocket {days['Rocket (MT)'].sum():,.0f} / {row['Rocket (MT)']:,.0f} MT")
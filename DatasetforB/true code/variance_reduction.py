@@ -0,0 +1,127 @@
+import numpy as np
+from scipy.stats import norm, qmc
+
+from risk_optimization import (ALPHA_STD, KE_NOMINAL, LAUNCHES_PER_SITE, MAX_YEARS, PAYLOAD, TARGET,
+                               WEATHER_MEAN, WEATHER_STD)
+from model_curves import alpha_at
+
+# ==========================================
+# 方差缩减 (Variance Reduction for Scenario Deltas)
+# ==========================================
+# 每条路径由 (年份 x 2) 个标准正态数驱动: 电梯 alpha 扰动与天气扰动。
+# 把抽样与模型分开后，可以在情景之间共用随机数 (CRN)、使用对偶变量 (Z, -Z)、
+# 或用加扰 Sobol 序列经 norm.ppf 变换代替伪随机数 (RQMC)。
+# 目标是 10 基地与 25 基地之差的估计，报告相对独立抽样的方差缩减倍数。
+# risk_optimization.strategy_delta 用 CRN 估计方案差值。
+# 实测 (1e5 次评估，10 vs 25 基地平均完工年数之差): VRF 约 1.7 (CRN)、2.6 (对偶)、3.4 (Sobol)，
+# 远低于 10-100 倍的目标；完工年数取整带来的舍入噪声不随两情景相关，这些方法都无法消除。
+N_YEARS = MAX_YEARS + 1
+CHUNK_PATHS = 20_000
+SOBOL_CHUNK = 2 ** 14     # Sobol 点按 2 的幂分块生成，保持序列的平衡性
+DEFAULT_SEED = 2050
+METHODS = ('independent', 'crn', 'antithetic', 'crn_antithetic', 'sobol')
+
+def completion_from_normals(z_alpha, z_weather, n_sites):
+    """给定 (路径 x 年) 的标准正态数，返回完工年数 (与 risk_optimization 同一模型)"""
+    alpha = np.maximum(0, alpha_at(np.arange(z_alpha.shape[1])) + ALPHA_STD * z_alpha)
+    weather = np.maximum(0, WEATHER_MEAN + WEATHER_STD * z_weather)
+    cap = KE_NOMINAL * alpha + LAUNCHES_PER_SITE * PAYLOAD * n_sites * (1 - weather)
+    done = np.cumsum(cap, axis=1) >= TARGET
+    return np.where(done.any(axis=1), done.argmax(axis=1) + 1, MAX_YEARS + 1)
+
+def _quantity(years, quantity, threshold):
+    if quantity == 'mean':
+        return years.astype(float)
+    if quantity == 'p_on_time':
+        return (years <= threshold).astype(float)
+    raise ValueError(f"Unknown quantity: {quantity}")
+
+def _normals(rng, n):
+    z = rng.standard_normal((n, 2 * N_YEARS))
+    return z[:, :N_YEARS], z[:, N_YEARS:]
+
+def _delta_samples(method, n_paths, sites, quantity, threshold, rng):
+    """返回独立同分布的 '差值样本' (各方法的样本单元不同: 路径、对偶对)"""
+    a, b = sites
+    f = lambda z_a, z_w, s: _quantity(completion_from_normals(z_a, z_w, s), quantity, threshold)
+    out = []
+    for s in range(0, n_paths, CHUNK_PATHS):
+        n = min(CHUNK_PATHS, n_paths - s)
+        if method == 'independent':
+            # 两个情景各用 n/2 条独立路径，差值样本 = f_a - f_b (两条独立路径)
+            z1, z2 = _normals(rng, n // 2), _normals(rng, n // 2)
+            out.append(f(*z1, a) - f(*z2, b))
+        elif method == 'crn':
+            # 共用随机数: 同一组正态数驱动两个情景，每条路径在两个情景下各算一次
+            z = _normals(rng, n // 2)
+            out.append(f(*z, a) - f(*z, b))
+        elif method == 'antithetic':
+            # 对偶变量: (Z, -Z) 成对，两个情景各自独立抽样
+            z1, z2 = _normals(rng, n // 4), _normals(rng, n // 4)
+            da = (f(*z1, a) + f(-z1[0], -z1[1], a)) / 2
+            db = (f(*z2, b) + f(-z2[0], -z2[1], b)) / 2
+            out.append(da - db)
+        elif method == 'crn_antithetic':
+            z = _normals(rng, n // 4)
+            d1 = f(*z, a) - f(*z, b)
+            d2 = f(-z[0], -z[1], a) - f(-z[0], -z[1], b)
+            out.append((d1 + d2) / 2)
+        else:
+            raise ValueError(f"Unknown method: {method}")
+    return np.concatenate(out)
+
+def _sobol_delta(n_paths, sites, quantity, threshold, rng, n_replicates):
+    """加扰 Sobol (RQMC) + 共用随机数: 每个独立加扰给出一个估计，用重复间方差估计误差"""
+    a, b = sites
+    m = max(1, int(np.log2(max(2, n_paths // (2 * n_replicates)))))
+    estimates = []
+    for _ in range(n_replicates):
+        sampler = qmc.Sobol(d=2 * N_YEARS, scramble=True, seed=rng)
+        total = 0.0
+        chunk = min(2 ** m, SOBOL_CHUNK)
+        for _ in range(2 ** m // chunk):
+            u = sampler.random(chunk)
+            z = norm.ppf(np.clip(u, 1e-12, 1 - 1e-12))
+            z_a, z_w = z[:, :N_YEARS], z[:, N_YEARS:]
+            total += (_quantity(completion_from_normals(z_a, z_w, a), quantity, threshold)
+                      - _quantity(completion_from_normals(z_a, z_w, b), quantity, threshold)).sum()
+        estimates.append(total / 2 ** m)
+    estimates = np.array(estimates)
+    return estimates.mean(), estimates.std(ddof=1) / np.sqrt(n_replicates), 2 * n_replicates * 2 ** m
+
+def estimate_delta(method='crn', n_paths=100_000, sites=(10, 25), quantity='mean', threshold=60,
+                   seed=DEFAULT_SEED, n_replicates=16):
+    """
+    估计 E[q(情景 a)] - E[q(情景 b)]，n_paths 为总模型评估次数 (两个情景合计)。
+    返回 dict: estimate / stderr / n_evals
+    """
+    rng = np.random.default_rng(seed)
+    if method == 'sobol':
+        value, stderr, n_evals = _sobol_delta(n_paths, sites, quantity, threshold, rng, n_replicates)
+        return {"estimate": value, "stderr": stderr, "n_evals": n_evals}
+    d = _delta_samples(method, n_paths, sites, quantity, threshold, rng)
+    evals_per_sample = {'independent': 2, 'crn': 2, 'antithetic': 4, 'crn_antithetic': 4}[method]
+    return {"estimate": d.mean(), "stderr": d.std(ddof=1) / np.sqrt(len(d)), "n_evals": evals_per_sample * len(d)}
+
+def variance_reduction_report(n_paths=100_000, sites=(10, 25), quantity='mean', threshold=60, seed=DEFAULT_SEED):
+    """
+    各方法在相同评估预算下的差值估计与方差缩减倍数
+    VRF = (独立抽样的方差 x 评估次数) / (本方法的方差 x 评估次数)
+    """
+    results = {m: estimate_delta(m, n_paths, sites, quantity, threshold, seed) for m in METHODS}
+    base = results['independent']["stderr"] ** 2 * results['independent']["n_evals"]
+    for res in results.values():
+        work_var = res["stderr"] ** 2 * res["n_evals"]
+        res["vrf"] = base / work_var if work_var > 0 else np.inf
+
+    label = "Delta Mean (Yrs)" if quantity == 'mean' else f"Delta P(<= {threshold})"
+    print(f"{'Method':<16} | {label:<18} | {'Std Error':<10} | {'Evals':<9} | {'VRF':<8}")
+    print("-" * 72)
+    for method, res in results.items():
+        print(f"{method:<16} | {res['estimate']:<18.5f} | {res['stderr']:<10.2e} | {res['n_evals']:<9} | {res['vrf']:<8.1f}")
+    return results
+
+if __name__ == "__main__":
+    variance_reduction_report(quantity='mean')
+    print()
+    variance_reduction_report(quantity='p_on_time', threshold=58, sites=(25, 20))
@@ -1,16 +1,10 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-# 1. Reconstruct the final calibrated data (Single Source of Truth)
-data = {
-    "Duration": [20, 30, 40, 50, 60, 70, 80, 100],
-    "Financial Cost ($T)": [15.10, 15.67, 16.22, 16.75, 17.26, 17.75, 18.23, 19.15],
-    "Green Cost ($T)": [15.14, 15.71, 16.25, 16.77, 17.28, 17.78, 18.26, 19.17],
-    "Rocket Share (%)": [90.2, 85.3, 80.4, 75.6, 70.8, 66.0, 61.3, 51.9],
-    "Carbon Tax ($B)": [33.8, 32.0, 30.2, 28.3, 26.5, 24.8, 23.0, 19.5]
-}
-df = pd.DataFrame(data)
+from simulation_csv import dashboard_table
+
+# 1. Load the calibrated engine results (served from the on-disk result cache after the first run)
+df = dashboard_table()
 
 # Set visual style
 plt.style.use('seaborn-v0_8-whitegrid')
@@ -69,10 +63,12 @@ for container in ax3.containers:
     ax3.bar_label(container, fmt='$%.1fB', padding=3)
 
 # Highlight 60y bar
-bars.patches[4].set_color('#2ca02c') # 60 years is index 4
-bars.patches[4].set_edgecolor('black')
-bars.patches[4].set_linewidth(2)
-ax3.annotate("Optimal Balance", xy=(4, 26.5), xytext=(4, 30),
+idx_60 = int(df.index[df["Duration"] == 60][0])
+tax_60 = df.loc[idx_60, "Carbon Tax ($B)"]
+bars.patches[idx_60].set_color('#2ca02c')
+bars.patches[idx_60].set_edgecolor('black')
+bars.patches[idx_60].set_linewidth(2)
+ax3.annotate("Optimal Balance", xy=(idx_60, tax_60), xytext=(idx_60, tax_60 + 3.5),
              arrowprops=dict(facecolor='black', arrowstyle='->'), ha='center')
 
 plt.tight_layout()
@@ -0,0 +1,106 @@
+import numpy as np
+
+# ==========================================
+# 莱特定律精确批次成本 (Exact Wright's Law Batch Cost)
+# ==========================================
+# 单次发射成本 c(n) = max(C_floor, C_init * max(1, n)^b)，b = log2(学习率) (学习率 < 1 时为负)
+# 一批发射 [n_start, n_start + n_new] 的成本为 c(n) 的精确积分，分三段:
+#   [0, 1]      首发单价 C_init
+#   [1, n*]     幂律段 C_init * n^b
+#   [n*, +inf)  底线段 C_floor，n* 为幂律与底线的解析交点 (学习率 >= 1 时 n* = inf，没有底线段)
+# 各段闭式求和，与批次大小无关，单次发射和十年批量的计算量相同。
+
+def crossover_launch(c_init, c_floor, learning_rate):
+    """
+    底线接管的累计发射次数 n* (C_init * n*^b = C_floor)；底线不低于首发价时返回 1。
+    学习率 >= 1 (b >= 0) 时单价不再下降，永远达不到更低的底线，返回 inf。
+    """
+    c_init, c_floor, learning_rate = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (c_init, c_floor, learning_rate)))
+    b = np.log2(learning_rate)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        n_star = np.where(b < 0, np.exp(np.log(c_floor / c_init) / np.where(b < 0, b, -1.0)), np.inf)
+    return np.where(c_floor < c_init, np.maximum(1.0, n_star), 1.0)[()]
+
+def _power_integral(lo, hi, e):
+    """∫_lo^hi n^(e-1) dn，lo >= 1；e 趋于 0 时退化为 log(hi/lo)，用 log1p/expm1 避免相消误差"""
+    log_ratio = np.log1p((hi - lo) / lo)
+    small = np.abs(e) < 1e-12
+    e_safe = np.where(small, 1.0, e)
+    return np.where(small, log_ratio, lo ** e * np.expm1(e * log_ratio) / e_safe)
+
+def rocket_cost_batch(n_start, n_new, c_init, c_floor, learning_rate):
+    """
+    批次成本: 从累计第 n_start 次起再发射 n_new 次的精确总成本。
+    所有参数可为标量或可广播数组 (逐元素计算，类似 ufunc)；n_new <= 0 的元素成本为 0。
+    """
+    n_start, n_new, c_init, c_floor, learning_rate = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (n_start, n_new, c_init, c_floor, learning_rate)))
+    a = np.maximum(n_start, 0)
+    z = a + np.maximum(n_new, 0)
+    n_star = crossover_launch(c_init, c_floor, learning_rate)
+    e = np.log2(learning_rate) + 1
+
+    # 首发段 [0, 1]，按 max(C_init, C_floor) 计价
+    head = np.maximum(0, np.minimum(z, 1) - np.minimum(a, 1)) * np.maximum(c_init, c_floor)
+
+    # 幂律段 [1, n*]
+    lo = np.clip(a, 1, n_star)
+    hi = np.clip(z, 1, n_star)
+    power = np.where(hi > lo, c_init * _power_integral(lo, np.maximum(hi, lo), e), 0)
+
+    # 底线段 [n*, +inf)；C_floor = 0 时 n* 为无穷大，该段为 0
+    with np.errstate(invalid='ignore'):
+        floor = np.where(z > n_star, (z - np.maximum(a, n_star)) * c_floor, 0)
+
+    return (head + power + floor)[()]
+
+def unit_cost(n, c_init, c_floor, learning_rate):
+    """第 n 次发射的边际单价 c(n)"""
+    n = np.asarray(n, dtype=float)
+    return np.maximum(c_floor, c_init * np.maximum(1, n) ** np.log2(learning_rate))[()]
+
+# ==========================================
+# 批次成本的解析偏导 (Exact Partial Derivatives)
+# ==========================================
+# 积分上下限对 n_new / n_start 的偏导即边际单价 c(n)；幂律段与底线段在 n* 处连续 (C_init n*^b = C_floor)，
+# n* 随参数移动带来的项相互抵消，因此各参数的偏导只需对被积函数求导:
+#   d/dC_init  = 首发段长度 [C_init >= C_floor] + ∫ n^b dn (幂律段)
+#   d/dC_floor = 首发段长度 [C_floor > C_init] + 底线段长度
+#   d/d学习率  = C_init ∫ n^b ln n dn / (学习率 ln 2)
+# 和 rocket_cost_batch 一样，在两段交界 (n = 1 或 n = n*) 处取右导数。
+
+def _log_power_integral(x, e):
+    """∫_1^x n^(e-1) ln n dn (x >= 1)；e 趋于 0 时为 (ln x)^2 / 2"""
+    log_x = np.log(x)
+    small = np.abs(e) < 1e-12
+    e_safe = np.where(small, 1.0, e)
+    return np.where(small, log_x ** 2 / 2, (x ** e_safe * (e_safe * log_x - 1) + 1) / e_safe ** 2)
+
+def rocket_cost_grad(n_start, n_new, c_init, c_floor, learning_rate):
+    """
+    rocket_cost_batch 对各参数的偏导，返回 dict:
+    n_start / n_new / c_init / c_floor / learning_rate (形状同广播后的输入；n_new <= 0 的元素为 0)
+    """
+    n_start, n_new, c_init, c_floor, learning_rate = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (n_start, n_new, c_init, c_floor, learning_rate)))
+    a = np.maximum(n_start, 0)
+    z = a + np.maximum(n_new, 0)
+    n_star = crossover_launch(c_init, c_floor, learning_rate)
+    e = np.log2(learning_rate) + 1
+    head_len = np.maximum(0, np.minimum(z, 1) - np.minimum(a, 1))
+    lo = np.clip(a, 1, n_star)
+    hi = np.clip(z, 1, n_star)
+    active = hi > lo
+    hi = np.maximum(hi, lo)
+    with np.errstate(invalid='ignore'):
+        floor_len = np.where(z > n_star, z - np.maximum(a, n_star), 0)
+    c_end = np.where(n_new > 0, unit_cost(z, c_init, c_floor, learning_rate), 0)
+    c_start = np.where(n_new > 0, unit_cost(a, c_init, c_floor, learning_rate), 0)
+    d_lr = c_init * (_log_power_integral(hi, e) - _log_power_integral(lo, e)) / (learning_rate * np.log(2))
+    return {
+        "n_start": (c_end - c_start)[()],
+        "n_new": c_end[()],
+        "c_init": (head_len * (c_init >= c_floor) + np.where(active, _power_integral(lo, hi, e), 0))[()],
+        "c_floor": (head_len * (c_floor > c_init) + floor_len)[()],
+        "learning_rate": np.where(active, d_lr, 0)[()],
+    }